@@ -1,650 +1,1595 @@
-import warnings
-warnings.filterwarnings('ignore')
-
-import numpy as np
-import pandas as pd
-import joblib
-import json
-from pathlib import Path
-import xgboost as xgb
-import traceback
-
-OPTIMAL_THRESHOLD = 0.60
-
-def display_section(title):
-    print("\n" + "=" * 80)
-    print(f" {title} ".center(80, "="))
-    print("=" * 80)
-
-display_section("🚀 LOADING TRAINED MODELS AND ARTIFACTS")
-
-MODEL_DIR = Path("./models")
-REPORTS_DIR = Path("./models")
-
-if not MODEL_DIR.exists():
-    print(f"❌ Model directory not found: {MODEL_DIR}")
-    raise FileNotFoundError(f"Model directory does not exist: {MODEL_DIR}")
-
-base_features_order_28 = []
-original_features_order_27 = []
-one_hot_region_order = []
-final_35_features_order = []
-fair_30_features_order = []
-
-feature_scaler = None
-label_encoders = None
-income_model = None
-model_region_aware = None
-model_fair_xgb = None
-
-expected_features_region = 0
-expected_features_fair = 0
-
-try:
-    scaler_path = MODEL_DIR / "feature_scaler.pkl"
-    if scaler_path.exists():
-        feature_scaler = joblib.load(scaler_path)
-        n_scaler_features = getattr(feature_scaler, 'n_features_in_', 0)
-        print(f"✅ Feature scaler loaded (expects {n_scaler_features} features)")
-        if n_scaler_features != 27:
-            print(f"❌ ERROR: Scaler expects {n_scaler_features} features, but pipeline logic requires it to expect 27.")
-            raise ValueError(f"Scaler expects {n_scaler_features} features, required 27.")
-    else:
-        print(f"❌ Feature scaler not found")
-        raise FileNotFoundError("Feature scaler not found")
-
-    encoder_path = MODEL_DIR / "label_encoders.pkl"
-    if encoder_path.exists():
-        label_encoders = joblib.load(encoder_path)
-        print("✅ Label encoders loaded")
-    else:
-        print(f"❌ Label encoders not found")
-        raise FileNotFoundError("Label encoders not found")
-
-    feature_config_path = MODEL_DIR / "feature_names.json"
-    if feature_config_path.exists():
-        with open(feature_config_path, "r") as f:
-            feature_config = json.load(f)
-
-        original_features_order_27 = feature_config.get('all_features', [])
-        print(f"🔧 Loaded {len(original_features_order_27)} original features from JSON for scaler.")
-        if len(original_features_order_27) != 27:
-            print(f"❌ ERROR: Expected 27 original features in JSON ('all_features' key), found {len(original_features_order_27)}.")
-            raise ValueError("Incorrect number of original features for scaler in feature_names.json.")
-
-        base_features_order_28 = original_features_order_27 + ['verified_income_from_ivl']
-        print(f"✅ Base feature list constructed ({len(base_features_order_28)} features including IVL).")
-    else:
-        print(f"❌ ERROR: Feature config 'feature_names.json' is required but not found in {MODEL_DIR}")
-        raise FileNotFoundError("Feature config 'feature_names.json' is required but not found")
-
-    try:
-        region_classes = label_encoders['region'].classes_
-        one_hot_region_order = [f'region_{label_encoders["region"].transform([cls])[0]}' for cls in region_classes]
-        if len(one_hot_region_order) != 5:
-            print(f"⚠️ Warning: Expected 5 regions, found {len(one_hot_region_order)} in label encoder: {region_classes}. Using inferred order: {one_hot_region_order}.")
-        else:
-            print(f"🔧 One-hot region order inferred: {one_hot_region_order}")
-    except KeyError:
-        print(f"❌ ERROR: 'region' not found in label_encoders.pkl.")
-        raise
-    except Exception as e:
-        print(f"❌ ERROR: Could not determine one-hot region order: {e}.")
-        raise
-
-    final_35_features_order = base_features_order_28 + ['region_encoded', 'employment_type_encoded'] + one_hot_region_order
-    print(f"🔧 Final feature order defined ({len(final_35_features_order)} features for Region-Aware model)")
-
-    fair_30_features_order = base_features_order_28 + ['region_encoded', 'employment_type_encoded']
-    print(f"🔧 Final feature order defined ({len(fair_30_features_order)} features for Fair XGBoost model)")
-
-    income_model_path = MODEL_DIR / "income_verification_model.pkl"
-    if income_model_path.exists():
-        try:
-            income_model = joblib.load(income_model_path)
-            print(f"✅ Income verification model loaded (RF-{getattr(income_model, 'n_estimators', 'N/A')})")
-        except Exception as e:
-            income_model = None
-            print(f"⚠️ Income model error: {str(e)}")
-    else:
-        income_model = None
-        print("⚠️ Income verification model not found (optional)")
-
-    xgb_region_path = MODEL_DIR / "xgb_region_aware.pkl"
-    fair_xgb_path = MODEL_DIR / "fair_xgb.pkl"
-
-    if xgb_region_path.exists():
-        try:
-            model_region_aware = joblib.load(xgb_region_path)
-            if isinstance(model_region_aware, xgb.XGBModel):
-                expected_features_region = model_region_aware.get_booster().num_features()
-            else:
-                expected_features_region = getattr(model_region_aware, 'n_features_in_', 0)
-
-            if expected_features_region != 35:
-                print(f"❌ ERROR: Loaded Region-Aware model expects {expected_features_region} features, but pipeline is built for 35.")
-                model_region_aware = None
-            else:
-                print(f"✅ Region-Aware XGBoost loaded (PRIMARY - {expected_features_region} features)")
-        except Exception as e:
-            print(f"⚠️ Region-aware error: {str(e)}")
-            model_region_aware = None
-    else:
-        print(f"❌ Region-Aware XGBoost (xgb_region_aware.pkl) not found. This is the primary model.")
-
-    if fair_xgb_path.exists():
-        try:
-            model_fair_xgb = joblib.load(fair_xgb_path)
-            if isinstance(model_fair_xgb, xgb.XGBModel):
-                expected_features_fair = model_fair_xgb.get_booster().num_features()
-            else:
-                expected_features_fair = getattr(model_fair_xgb, 'n_features_in_', 0)
-            
-            if expected_features_fair != 30:
-                print(f"⚠️ Warning: Loaded Fair XGBoost model expects {expected_features_fair} features, but pipeline is built for 30. Disabling model.")
-                model_fair_xgb = None
-            else:
-                print(f"✅ Fair XGBoost loaded (COMPARISON - {expected_features_fair} features)")
-        except Exception as e:
-            print(f"⚠️ Fair XGB error: {str(e)}")
-            model_fair_xgb = None
-    else:
-        print(f"⚠️ Fair XGBoost (fair_xgb.pkl) not found. Will not be used for comparison.")
-
-    if model_region_aware is None:
-        print(f"❌ FATAL: The primary model (xgb_region_aware.pkl) failed to load. Predictions cannot proceed.")
-        raise FileNotFoundError("Primary prediction model 'xgb_region_aware.pkl' not found or failed to load correctly")
-
-    print("\n" + "🎉 ALL MODELS LOADED SUCCESSFULLY".center(80, " "))
-    print(f"   Primary Model: {'✅ Region-Aware XGBoost' if model_region_aware else '❌ Not Loaded'}")
-    print(f"   Comparison Model: {'✅ Fair XGBoost' if model_fair_xgb else '❌ Not Loaded'}")
-    print(f"   Income Verification: {'✅ Available' if income_model else '❌ Not Available'}")
-    print(f"   Threshold: {OPTIMAL_THRESHOLD} (Optimized)")
-
-except Exception as e:
-    print(f"❌ Error during artifact loading: {str(e)}")
-    print(traceback.format_exc())
-    raise
-
-display_section("📋 CATEGORICAL MAPPINGS & TEST DATA")
-
-GENDER_MAP = {1: ('Male', 'M'), 2: ('Female', 'F')}
-CASTE_GROUP_MAP = {1: 'General', 2: 'OBC', 3: 'SC', 4: 'ST', 5: 'Other'}
-REGION_MAP = {1: 'North', 2: 'South', 3: 'East', 4: 'West', 5: 'Central'}
-EMPLOYMENT_TYPE_MAP = {1: 'Salaried', 2: 'Self-Employed', 3: 'Unemployed', 4: 'Student', 5: 'Agriculture'}
-VERIFICATION_MAP = {1: True, 2: False}
-
-REGION_NAME_TO_CODE = {v: k for k, v in REGION_MAP.items()}
-EMPLOYMENT_NAME_TO_CODE = {v: k for k, v in EMPLOYMENT_TYPE_MAP.items()}
-GENDER_NAME_TO_CODE = {v[0]: k for k, v in GENDER_MAP.items()}
-CASTE_NAME_TO_CODE = {v: k for k, v in CASTE_GROUP_MAP.items()}
-
-TEST_APPLICANT_JSON_GOOD = {
-    "applicant_id": "APP-001",
-    "age": 35,
-    "gender_code": 1,
-    "caste_code": 1,
-    "region_code": 2,
-    "employment_code": 1,
-    "monthly_income": 80000,
-    "income_stability": 0.8,
-    "avg_balance": 150000,
-    "savings_ratio": 0.3,
-    "expense_income_ratio": 0.4,
-    "utility_payment_score": 95,
-    "rent_payment_score": 100,
-    "upi_transactions": 120,
-    "upi_avg_amount": 800,
-    "mobile_recharge_freq": 2,
-    "digital_wallet_usage": 70,
-    "merchant_diversity": 0.8,
-    "credit_lines": 3,
-    "credit_tenure_months": 48,
-    "missed_payments": 1000,
-    "avg_days_past_due": 0,
-    "credit_utilization": 0.25,
-    "consent_given": 1,
-    "document_verified": 1
-}
-
-TEST_APPLICANT_JSON_BAD = {
-    "applicant_id": "APP-002",
-    "age": 24,
-    "gender_code": 2,
-    "caste_code": 3,
-    "region_code": 1,
-    "employment_code": 2,
-    "monthly_income": 25000,
-    "income_stability": 0.3,
-    "avg_balance": 5000,
-    "savings_ratio": 0.05,
-    "expense_income_ratio": 0.8,
-    "utility_payment_score": 60,
-    "rent_payment_score": 70,
-    "upi_transactions": 30,
-    "upi_avg_amount": 250,
-    "mobile_recharge_freq": 4,
-    "digital_wallet_usage": 40,
-    "merchant_diversity": 0.3,
-    "credit_lines": 1,
-    "credit_tenure_months": 10,
-    "missed_payments": 3,
-    "avg_days_past_due": 15,
-    "credit_utilization": 0.95,
-    "consent_given": 1,
-    "document_verified": 1
-}
-
-print("✅ Mappings and Test Applicants defined")
-
-display_section("🔧 DEFINING TRANSFORMATION FUNCTIONS")
-
-def convert_user_inputs_to_features(user_inputs):
-    features = {}
-
-    features['age'] = user_inputs['age']
-
-    features['declared_income'] = user_inputs['monthly_income'] * 12
-
-    features['verified_income'] = user_inputs['monthly_income'] * 12 * 0.95
-    features['income_stability'] = user_inputs['income_stability']
-
-    features['avg_balance'] = user_inputs['avg_balance']
-    features['savings_ratio'] = user_inputs['savings_ratio']
-    features['debt_to_income_ratio'] = user_inputs['expense_income_ratio']
-    features['loan_emi_ratio'] = user_inputs['expense_income_ratio'] * 0.3
-
-    features['utility_payment_timeliness'] = user_inputs['utility_payment_score'] / 100
-    features['rent_payment_timeliness'] = user_inputs['rent_payment_score'] / 100
-
-    features['mobile_recharge_freq'] = user_inputs['mobile_recharge_freq']
-    features['mobile_recharge_var'] = user_inputs['mobile_recharge_freq'] * 0.2
-    features['upi_txn_count'] = user_inputs['upi_transactions']
-    features['upi_avg_txn_size'] = user_inputs['upi_avg_amount']
-    features['merchant_diversity_score'] = user_inputs['merchant_diversity']
-    features['digital_wallet_usage'] = user_inputs['digital_wallet_usage'] / 100
-    features['app_finance_ratio'] = (user_inputs['digital_wallet_usage'] / 100) * 0.7
-    features['sim_change_freq'] = 0.1
-    features['battery_pattern_score'] = 0.5
-
-    features['past_loans_count'] = user_inputs['credit_lines']
-    features['missed_payments'] = user_inputs['missed_payments']
-    features['avg_days_past_due'] = user_inputs['avg_days_past_due']
-    features['credit_utilization_ratio'] = user_inputs['credit_utilization']
-    features['credit_lines_active'] = user_inputs['credit_lines']
-    features['credit_tenure_months'] = user_inputs['credit_tenure_months']
-
-    features['consent_given'] = int(user_inputs['consent_given'])
-    features['document_verified'] = int(user_inputs['document_verified'])
-
-    features['verified_income_from_ivl'] = features['verified_income']
-    ivl_status = "Using default estimate"
-
-    if income_model is not None:
-        try:
-            ivl_input_features = [
-                'utility_payment_timeliness', 'rent_payment_timeliness',
-                'upi_txn_count', 'upi_avg_txn_size', 'avg_balance',
-                'mobile_recharge_freq', 'digital_wallet_usage',
-                'merchant_diversity_score', 'savings_ratio', 'age'
-            ]
-            raw_27_for_ivl_scaling = pd.DataFrame([{f: features.get(f, 0) for f in original_features_order_27}])
-            scaled_27_for_ivl = feature_scaler.transform(raw_27_for_ivl_scaling)
-            ivl_indices = [original_features_order_27.index(f) for f in ivl_input_features if f in original_features_order_27]
-            ivl_scaled_input = scaled_27_for_ivl[:, ivl_indices]
-            ivl_scaled_df = pd.DataFrame(ivl_scaled_input, columns=ivl_input_features)
-
-            predicted_ivl = float(income_model.predict(ivl_scaled_df)[0])
-            features['verified_income_from_ivl'] = predicted_ivl
-            ivl_status = f"✅ IVL Model used. Predicted income: ₹{predicted_ivl:.0f}"
-
-        except Exception as e:
-            if "'DecisionTreeRegressor' object has no attribute 'monotonic_cst'" in str(e):
-                ivl_status = "⚠️ IVL Model failed to load (monotonic_cst attribute missing). Using default estimate."
-            else:
-                ivl_status = f"⚠️ Failed to use IVL Model: {e}. Using default estimate."
-            pass
-    
-    print(f"   IVL Status: {ivl_status}")
-    
-    return features, ivl_status
-
-print("✅ Transformation functions defined")
-
-def _run_single_prediction(model, model_name, expected_features, feature_vector, threshold):
-    
-    if feature_vector.shape[1] != expected_features:
-        error_msg = f"FATAL: Final feature shape {feature_vector.shape[1]} does not match loaded model expectation {expected_features} for model '{model_name}'."
-        print(f"❌ {error_msg}")
-        raise ValueError(error_msg)
-
-    pred_proba = model.predict_proba(feature_vector)[0]
-    default_probability = float(pred_proba[1])
-    approval_probability = float(pred_proba[0])
-    is_approved = default_probability < threshold
-    credit_score = int(300 + (approval_probability * 550))
-
-    if credit_score >= 750:
-        risk_category, risk_color = "Excellent", "#27ae60"
-    elif credit_score >= 700:
-        risk_category, risk_color = "Good", "#3498db"
-    elif credit_score >= 650:
-        risk_category, risk_color = "Fair", "#f39c12"
-    elif credit_score >= 600:
-        risk_category, risk_color = "Poor", "#e67e22"
-    else:
-        risk_category, risk_color = "Very Poor", "#e74c3c"
-
-    return {
-        "model": model_name,
-        "score": credit_score,
-        "approved": bool(is_approved),
-        "default_risk": float(default_probability),
-        "approval_probability": float(approval_probability),
-        "risk_category": risk_category,
-        "risk_color": risk_color,
-        "feature_shape": list(feature_vector.shape),
-        "error": None
-    }
-
-def run_multi_model_prediction(applicant_json_data, threshold=OPTIMAL_THRESHOLD):
-    print(f"\n🔮 PROCESSING PREDICTION FOR APPLICANT: {applicant_json_data.get('applicant_id', 'N/A')}")
-    
-    all_predictions = {}
-    recommendations = []
-    positive_factors_list = []
-    negative_factors_list = []
-    final_decision = {}
-    
-    try:
-        print("Step 1: Parsing Applicant JSON...")
-        user_inputs = applicant_json_data.copy()
-        
-        user_inputs['gender_display'], user_inputs['gender_char'] = GENDER_MAP[user_inputs['gender_code']]
-        user_inputs['caste_group'] = CASTE_GROUP_MAP[user_inputs['caste_code']]
-        user_inputs['region'] = REGION_MAP[user_inputs['region_code']]
-        user_inputs['employment_type'] = EMPLOYMENT_TYPE_MAP[user_inputs['employment_code']]
-        user_inputs['consent_given'] = bool(int(user_inputs.get('consent_given', 1)))
-        user_inputs['document_verified'] = bool(int(user_inputs.get('document_verified', 1)))
-        
-        applicant_profile_display = {
-            "age": user_inputs['age'],
-            "gender": user_inputs['gender_display'],
-            "region": user_inputs['region'],
-            "employment": user_inputs['employment_type'],
-            "monthly_income": user_inputs['monthly_income']
-        }
-        print(f"✅ Applicant Profile: {applicant_profile_display}")
-
-        print("Step 2: Converting user inputs to model features...")
-        base_features_dict, ivl_status = convert_user_inputs_to_features(user_inputs)
-        print(f"✅ Base feature engineering complete ({len(base_features_dict)} features)")
-
-        
-        print(f"Step 3: Running Model 1 (Region-Aware XGBoost)...")
-        if model_region_aware:
-            try:
-                region_str = user_inputs['region']
-                employment_str = user_inputs['employment_type']
-                region_encoded = label_encoders['region'].transform([region_str])[0]
-                employment_encoded = label_encoders['employment_type'].transform([employment_str])[0]
-                num_regions = len(label_encoders['region'].classes_)
-                one_hot_regions = np.zeros(num_regions)
-                if region_encoded < num_regions: one_hot_regions[region_encoded] = 1
-                
-                raw_27_for_scaling_list = [base_features_dict.get(f, 0) for f in original_features_order_27]
-                X_raw_27_for_scaling = np.array([raw_27_for_scaling_list])
-                X_scaled_27 = feature_scaler.transform(X_raw_27_for_scaling)
-
-                unscaled_ivl = np.array([[base_features_dict['verified_income_from_ivl']]])
-                unscaled_region_encoded = np.array([[region_encoded]])
-                unscaled_employment_encoded = np.array([[employment_encoded]])
-                unscaled_one_hot = np.array([one_hot_regions])
-
-                X_final_input_35 = np.concatenate([
-                    X_scaled_27, unscaled_ivl, unscaled_region_encoded,
-                    unscaled_employment_encoded, unscaled_one_hot
-                ], axis=1)
-
-                region_aware_result = _run_single_prediction(
-                    model_region_aware, "Region-Aware XGBoost",
-                    expected_features_region, X_final_input_35, threshold
-                )
-                all_predictions["Region-Aware XGBoost"] = region_aware_result
-                print(f"✅ Region-Aware Model Complete. Score: {region_aware_result['score']}")
-            
-            except Exception as e:
-                print(f"❌ Error running Region-Aware model: {e}")
-                all_predictions["Region-Aware XGBoost"] = {"model": "Region-Aware XGBoost", "error": str(e), "feature_shape": [1, 35]}
-        
-        
-        print(f"Step 4: Running Model 2 (Fair XGBoost)...")
-        if model_fair_xgb:
-            try:
-                region_str = user_inputs['region']
-                employment_str = user_inputs['employment_type']
-                region_encoded = label_encoders['region'].transform([region_str])[0]
-                employment_encoded = label_encoders['employment_type'].transform([employment_str])[0]
-
-                raw_27_for_scaling_list = [base_features_dict.get(f, 0) for f in original_features_order_27]
-                X_raw_27_for_scaling = np.array([raw_27_for_scaling_list])
-                X_scaled_27 = feature_scaler.transform(X_raw_27_for_scaling)
-
-                unscaled_ivl = np.array([[base_features_dict['verified_income_from_ivl']]])
-                unscaled_region_encoded = np.array([[region_encoded]])
-                unscaled_employment_encoded = np.array([[employment_encoded]])
-
-                X_final_input_30 = np.concatenate([
-                    X_scaled_27, unscaled_ivl, unscaled_region_encoded, unscaled_employment_encoded
-                ], axis=1)
-
-                fair_xgb_result = _run_single_prediction(
-                    model_fair_xgb, "Fair XGBoost",
-                    expected_features_fair, X_final_input_30, threshold
-                )
-                all_predictions["Fair XGBoost"] = fair_xgb_result
-                print(f"✅ Fair XGBoost Model Complete. Score: {fair_xgb_result['score']}")
-
-            except Exception as e:
-                print(f"❌ Error running Fair XGBoost model: {e}")
-                all_predictions["Fair XGBoost"] = {"model": "Fair XGBoost", "error": str(e), "feature_shape": [1, 30]}
-        else:
-            print(f"⚠️ Fair XGBoost model not loaded. Skipping.")
-
-            
-        print("\n" + "📊 PREDICTION RESULTS".center(80, " "))
-        
-        if "Region-Aware XGBoost" in all_predictions and all_predictions["Region-Aware XGBoost"]["error"] is None:
-            final_decision = all_predictions["Region-Aware XGBoost"]
-            
-            is_approved = final_decision['approved'] 
-            
-            print(f"   Credit Score: {final_decision['score']}")
-            print(f"   Risk: {final_decision['risk_category']}")
-            print(f"   Status: {'✅ APPROVED' if is_approved else '❌ REJECTED'}")
-            
-            display_features = base_features_dict.copy()
-            display_features['repayment_history_score'] = max(0, 100 - (user_inputs['missed_payments'] * 5 + user_inputs['avg_days_past_due'] * 0.5)) / 100
-            display_features['digital_payment_score'] = (
-                display_features.get('upi_txn_count', 0) / 100 * 0.4 + 
-                (display_features.get('upi_avg_txn_size', 0) / 10000) * 0.3 +
-                display_features.get('digital_wallet_usage', 0) * 0.3
-            )
-            
-            print("\n" + "🔍 SCORE FACTOR ANALYSIS".center(80, " "))
-            
-            print("\n   ✅ Positive Factors (Leveraging Your Score)")
-            pos_found = False
-            if display_features.get('repayment_history_score', 0) > 0.8:
-                factor_text = "Excellent payment history (few to no missed payments)"
-                positive_factors_list.append({"text": factor_text, "type": "positive"})
-                print(f"     • {factor_text}")
-                pos_found = True
-            if display_features.get('credit_utilization_ratio', 1) < 0.3:
-                factor_text = "Low credit utilization (using < 30% of available credit)"
-                positive_factors_list.append({"text": factor_text, "type": "positive"})
-                print(f"     • {factor_text}")
-                pos_found = True
-            if display_features.get('savings_ratio', 0) > 0.2:
-                factor_text = "Good savings ratio (saving > 20% of income)"
-                positive_factors_list.append({"text": factor_text, "type": "positive"})
-                print(f"     • {factor_text}")
-                pos_found = True
-            if display_features.get('digital_payment_score', 0) > 0.5:
-                factor_text = "Strong digital payment activity"
-                positive_factors_list.append({"text": factor_text, "type": "positive"})
-                print(f"     • {factor_text}")
-                pos_found = True
-            if display_features.get('income_stability', 0) > 0.5:
-                factor_text = "Stable income source"
-                positive_factors_list.append({"text": factor_text, "type": "positive"})
-                print(f"     • {factor_text}")
-                pos_found = True
-            if display_features.get('credit_tenure_months', 0) > 36:
-                factor_text = "Established credit history ( > 3 years)"
-                positive_factors_list.append({"text": factor_text, "type": "positive"})
-                print(f"     • {factor_text}")
-                pos_found = True
-            
-            if not pos_found:
-                print("     • No strong positive factors identified based on these rules.")
-
-            print("\n   ❌ Negative Factors (Degrading Your Score)")
-            neg_found = False
-            if display_features.get('missed_payments', 0) > 0:
-                factor_text = f"{int(display_features['missed_payments'])} missed payments recorded"
-                negative_factors_list.append({"text": factor_text, "type": "negative"})
-                print(f"     • {factor_text}")
-                neg_found = True
-            if display_features.get('credit_utilization_ratio', 0) > 0.7:
-                factor_text = "High credit utilization (using > 70% of available credit)"
-                negative_factors_list.append({"text": factor_text, "type": "negative"})
-                print(f"     • {factor_text}")
-                neg_found = True
-            if display_features.get('avg_days_past_due', 0) > 0:
-                factor_text = f"Accounts previously {int(display_features['avg_days_past_due'])} days past due"
-                negative_factors_list.append({"text": factor_text, "type": "negative"})
-                print(f"     • {factor_text}")
-                neg_found = True
-            if display_features.get('savings_ratio', 1) < 0.1:
-                factor_text = "Low savings ratio (saving < 10% of income)"
-                negative_factors_list.append({"text": factor_text, "type": "negative"})
-                print(f"     • {factor_text}")
-                neg_found = True
-            if display_features.get('credit_tenure_months', 100) < 12:
-                factor_text = "Limited credit history ( < 1 year)"
-                negative_factors_list.append({"text": factor_text, "type": "negative"})
-                print(f"     • {factor_text}")
-                neg_found = True
-                
-            if not neg_found:
-                print("     • No strong negative factors identified. Keep up the good work!")
-            
-            print("\n   Note: This is not an exhaustive list. Your score is calculated using a")
-            print("   comprehensive model. These are prominent factors identified by our analysis rules.")
-
-            print("\n" + "💡 RECOMMENDATIONS".center(80, " "))
-            if not is_approved:
-                recommendations.extend(["• Focus on improving payment history (make all payments on time)",
-                                        "• Reduce credit utilization ratio (ideally below 30%)"])
-                if display_features.get('savings_ratio', 1) < 0.15: recommendations.append("• Increase savings ratio and build an emergency fund")
-                if display_features.get('credit_tenure_months', 100) < 24: recommendations.append("• Continue building a positive credit history over time")
-            else:
-                recommendations.extend(["• Maintain your excellent payment discipline", "• Continue responsible credit usage"])
-                if display_features.get('credit_utilization_ratio', 0) > 0.3: recommendations.append("• Consider keeping credit utilization low (below 30%) for optimal score")
-                recommendations.append("• Monitor your credit report regularly for any inaccuracies")
-            
-            for rec in recommendations:
-                print(f"   {rec}")
-
-        else:
-            print("❌ Final decision could not be made. Primary model failed.")
-            final_decision = {"error": "Primary model failed to run"}
-            
-        model_predictions_list = [v for v in all_predictions.values() if v.get("error") is None]
-        approved_count = sum(1 for p in model_predictions_list if p['approved'])
-        total_count = len(model_predictions_list)
-        unanimous = total_count > 0 and (approved_count == 0 or approved_count == total_count)
-        
-        final_json_output = {
-            "success": True,
-            "applicant_profile": applicant_profile_display,
-            "final_decision": {
-                "approved": final_decision.get('approved', False),
-                "credit_score": final_decision.get('score', 0),
-                "risk_category": final_decision.get('risk_category', 'Error'),
-                "default_risk": final_decision.get('default_risk', 1.0),
-                "approval_probability": final_decision.get('approval_probability', 0.0),
-                "threshold": threshold
-            },
-            "model_predictions": model_predictions_list,
-            "consensus": {
-                "approved_count": approved_count,
-                "total_count": total_count,
-                "unanimous": unanimous
-            },
-            "positive_factors": positive_factors_list,
-            "negative_factors": negative_factors_list,
-            "recommendations": recommendations,
-            "all_predictions": all_predictions,
-            "colour": final_decision.get('risk_color'),
-            "name": user_inputs.get('applicant_id')
-        }
-        print(final_json_output)
-        return final_json_output
-        
-    except Exception as e:
-        print(f"❌ UNHANDLED ERROR in prediction pipeline: {e}")
-        print(traceback.format_exc())
-        return {
-            "success": False,
-            "error": str(e),
-            "traceback": traceback.format_exc(),
-            "applicant_profile": applicant_json_data
-        }
-
-class NumpyJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, np.bool_):
-            return bool(obj)
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super(NumpyJSONEncoder, self).default(obj)
-
-print("✅ Custom JSON Encoder defined")
-
-if __name__ == "__main__":
-
-    display_section("🚀 RUNNING PREDICTION ON 'GOOD' TEST APPLICANT")
-
-    try:
-        good_result = run_multi_model_prediction(TEST_APPLICANT_JSON_GOOD)
-        
-        print("\n--- Final JSON Output (Good Applicant) ---")
-        print(json.dumps(good_result, indent=2, cls=NumpyJSONEncoder))
-
-    except Exception as e:
-        print(f"❌ Execution failed for 'Good' applicant: {e}")
-        print(traceback.format_exc())
-
-    display_section("🚀 RUNNING PREDICTION ON 'BAD' TEST APPLICANT")
-
-    try:
-        bad_result = run_multi_model_prediction(TEST_APPLICANT_JSON_BAD)
-
-        print("\n--- Final JSON Output (Bad Applicant) ---")
-        print(json.dumps(bad_result, indent=2, cls=NumpyJSONEncoder))
-
-    except Exception as e:
-        print(f"❌ Execution failed for 'Bad' applicant: {e}")
-        print(traceback.format_exc())
-
-    display_section("✅ SYSTEM READY")
-    print(f"🎉 System Initialized and Ready for JSON!")
-    print(f"   ✅ Primary model loaded: {'Region-Aware XGBoost' if model_region_aware else 'N/A'}")
-    print(f"   ✅ Comparison model loaded: {'Fair XGBoost' if model_fair_xgb else 'N/A'}")
-    print(f"   ✅ Function run_multi_model_prediction(json_data) is ready.")
+import warnings
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import joblib
+import copy
+import hashlib
+import json
+import logging
+import os
+import operator
+import threading
+import time
+from pathlib import Path
+import xgboost as xgb
+import traceback
+
+from artifact_cache import (
+    SOURCE_ARTIFACTS, booster_iteration_range, encoder_classes_from_sklearn, file_sha256,
+    load_compiled_artifacts, scaler_params_from_sklearn
+)
+from delphi_ensemble import ENSEMBLE_ARTIFACT, DelphiEnsembleEngine
+from fairness_monitor import DECISION_APPROVED, DECISION_ERROR, DECISION_REJECTED, FairnessMonitor
+from inference_pool import run_isolated
+from log_config import get_logger
+from metrics import increment, observe, stage_timer
+from model_registry import ModelRegistry
+from score_cache import ScoringCache, feature_key
+from score_factors import FactorRuleEngine
+from tree_ensemble import CompiledTreeEnsemble
+
+logger = get_logger("model")
+
+OPTIMAL_THRESHOLD = 0.60
+INFERENCE_BACKEND = os.environ.get("CREDX_INFERENCE_BACKEND", "booster")
+XGB_NTHREAD = int(os.environ.get("CREDX_XGB_NTHREAD", "0"))
+USE_ARTIFACT_CACHE = os.environ.get("CREDX_ARTIFACT_CACHE", "1") != "0"
+EXPLAIN_APPROX = os.environ.get("CREDX_EXPLAIN_APPROX", "0") != "0"
+WHAT_IF_MAX_SCENARIOS = int(os.environ.get("CREDX_WHATIF_MAX_SCENARIOS", "2048"))
+SCORING_MODE = os.environ.get("CREDX_SCORING_MODE", "models")
+CONCURRENT_MODELS = os.environ.get("CREDX_CONCURRENT_MODELS", "0") != "0"
+
+def display_section(title):
+    logger.info(f" {title} ".center(80, "="))
+
+display_section("🚀 LOADING TRAINED MODELS AND ARTIFACTS")
+
+MODEL_DIR = Path("./models")
+REPORTS_DIR = Path("./models")
+INCOME_MODEL_PATH = MODEL_DIR / "income_verification_model.pkl"
+
+if not MODEL_DIR.exists():
+    logger.error(f"❌ Model directory not found: {MODEL_DIR}")
+    raise FileNotFoundError(f"Model directory does not exist: {MODEL_DIR}")
+
+GENDER_MAP = {1: ('Male', 'M'), 2: ('Female', 'F')}
+CASTE_GROUP_MAP = {1: 'General', 2: 'OBC', 3: 'SC', 4: 'ST', 5: 'Other'}
+REGION_MAP = {1: 'North', 2: 'South', 3: 'East', 4: 'West', 5: 'Central'}
+EMPLOYMENT_TYPE_MAP = {1: 'Salaried', 2: 'Self-Employed', 3: 'Unemployed', 4: 'Student', 5: 'Agriculture'}
+VERIFICATION_MAP = {1: True, 2: False}
+
+def _compile_code_lookup(code_map, classes):
+    lookup = np.full(max(code_map) + 1, -1, dtype=np.int64)
+    for code, name in code_map.items():
+        if name in classes:
+            lookup[code] = classes.index(name)
+    return lookup
+
+class BoosterInferenceEngine:
+
+    def __init__(self, model, nthread=None):
+        self.model = model
+        self.booster = model.get_booster()
+        nthread = XGB_NTHREAD if nthread is None else nthread
+        if nthread > 0:
+            self.booster.set_param({"nthread": nthread})
+        self.iteration_range = booster_iteration_range(self.booster)
+
+    def predict_default_proba(self, X):
+        if X.dtype != np.float32:
+            X = X.astype(np.float32)
+        return self.booster.inplace_predict(
+            X, iteration_range=self.iteration_range, validate_features=False
+        )
+
+    def predict_proba(self, X):
+        class_probs = self.predict_default_proba(X)
+        if class_probs.ndim == 2:
+            return class_probs
+        pred_proba = np.empty((class_probs.shape[0], 2), dtype=class_probs.dtype)
+        pred_proba[:, 0] = 1 - class_probs
+        pred_proba[:, 1] = class_probs
+        return pred_proba
+
+class CompiledForestEngine(BoosterInferenceEngine):
+    max_compiled_rows = 16
+
+    def __init__(self, model, nthread=None, forest=None):
+        super().__init__(model, nthread)
+        learner = json.loads(self.booster.save_config())["learner"]
+        objective = learner["objective"]["name"]
+        if objective != "binary:logistic":
+            raise ValueError(f"Compiled backend supports binary:logistic only, got '{objective}'")
+        base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+        self.base_margin = np.float32(-np.log(1.0 / base_score - 1.0))
+        self.forest = forest if forest is not None else CompiledTreeEnsemble.from_xgboost(self.booster, self.iteration_range)
+
+    def predict_default_proba(self, X):
+        if X.shape[0] > self.max_compiled_rows:
+            return super().predict_default_proba(X)
+        if X.dtype != np.float32:
+            X = X.astype(np.float32)
+        leaves = self.forest.leaf_values(X)
+        leaves[:, 0] += self.base_margin
+        margin = np.cumsum(leaves, axis=1, dtype=np.float32)[:, -1]
+        exp_neg_margin = np.exp(np.minimum(-margin, np.float32(88.7)).astype(np.float64)).astype(np.float32)
+        return np.float32(1) / (exp_neg_margin + np.float32(1))
+
+def _build_inference_engine(model, artifact_name, compiled_artifacts):
+    if model is None or INFERENCE_BACKEND == "sklearn":
+        return model
+    if isinstance(model, xgb.XGBModel) and INFERENCE_BACKEND == "compiled":
+        try:
+            forest = None
+            if compiled_artifacts is not None and artifact_name in compiled_artifacts["tree_stores"]:
+                forest = CompiledTreeEnsemble.load(compiled_artifacts["tree_stores"][artifact_name], mmap_mode="r")
+            return CompiledForestEngine(model, forest=forest)
+        except ValueError as e:
+            logger.warning(f"⚠️ Could not compile {type(model).__name__}: {e}. Using the Booster backend.")
+    if isinstance(model, xgb.XGBModel):
+        return BoosterInferenceEngine(model)
+    logger.warning(f"⚠️ {type(model).__name__} is not an XGBoost model. Falling back to predict_proba.")
+    return model
+
+IVL_STATUS_USED = "used"
+IVL_STATUS_DEFAULT = "default"
+IVL_STATUS_FALLBACK = "fallback"
+
+class IncomeVerificationEngine:
+    max_compiled_rows = 512
+
+    def __init__(self, model=None, forest=None):
+        self.model = model
+        self.forest = forest
+        self.backend = "compiled" if forest is not None else "sklearn"
+
+    @classmethod
+    def from_model(cls, model):
+        from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+        if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+            try:
+                return cls(model, CompiledTreeEnsemble.from_sklearn(model.estimators_))
+            except (AttributeError, ValueError) as e:
+                logger.warning(f"⚠️ Could not flatten income verification model: {e}. Using its predict().")
+        return cls(model)
+
+    def predict(self, X_ivl):
+        if self.forest is None or (self.model is not None and X_ivl.shape[0] > self.max_compiled_rows):
+            return self.model.predict(X_ivl).astype(float)
+        leaves = self.forest.leaf_values(np.asarray(X_ivl, dtype=np.float32))
+        return np.cumsum(leaves, axis=1)[:, -1] / self.forest.n_trees
+
+# Everything loaded from one model directory. Requests read MODEL_REGISTRY.active once and use that set throughout,
+# so a hot swap never mixes the scaler, encoders or boosters of two versions.
+class ModelSet:
+
+    def __init__(self, model_dir):
+        self.model_dir = Path(model_dir)
+        self.name = self.model_dir.name
+        self.version = None
+        self.loaded_at = time.time()
+
+        self.compiled_artifacts = None
+        self.feature_scaler = None
+        self.label_encoders = None
+        self.scaler_params = None
+        self.encoder_classes = None
+
+        self.original_features_order_27 = []
+        self.base_features_order_28 = []
+        self.one_hot_region_order = []
+        self.final_35_features_order = []
+        self.fair_30_features_order = []
+
+        self.model_region_aware = None
+        self.model_fair_xgb = None
+        self.expected_features_region = 0
+        self.expected_features_fair = 0
+        self.engine_region_aware = None
+        self.engine_fair_xgb = None
+        self.engine_delphi = None
+        self.expected_features_delphi = 0
+
+        self.income_model_path = self.model_dir / INCOME_MODEL_PATH.name
+        self._income_model = None
+        self._income_model_loaded = False
+        self._income_model_lock = threading.Lock()
+        self._income_engine = None
+        self._income_engine_loaded = False
+        self._income_engine_lock = threading.Lock()
+
+    def get_income_model(self):
+        if self._income_model_loaded:
+            return self._income_model
+        with self._income_model_lock:
+            if not self._income_model_loaded:
+                if self.income_model_path.exists():
+                    try:
+                        self._income_model = joblib.load(self.income_model_path)
+                        logger.info(f"✅ Income verification model loaded (RF-{getattr(self._income_model, 'n_estimators', 'N/A')})")
+                    except Exception as e:
+                        self._income_model = None
+                        logger.warning(f"⚠️ Income model error: {str(e)}")
+                self._income_model_loaded = True
+        return self._income_model
+
+    def get_income_engine(self):
+        if self._income_engine_loaded:
+            return self._income_engine
+        with self._income_engine_lock:
+            if not self._income_engine_loaded:
+                tree_stores = self.compiled_artifacts["tree_stores"] if self.compiled_artifacts is not None else {}
+                tree_store = tree_stores.get(self.income_model_path.name)
+                try:
+                    if tree_store is not None:
+                        self._income_engine = IncomeVerificationEngine(forest=CompiledTreeEnsemble.load(tree_store, mmap_mode="r"))
+                    elif self.get_income_model() is not None:
+                        self._income_engine = IncomeVerificationEngine.from_model(self.get_income_model())
+                    if self._income_engine is not None:
+                        logger.info(f"✅ Income verification engine ready ({self._income_engine.backend})")
+                except Exception as e:
+                    self._income_engine = None
+                    logger.warning(f"⚠️ Income verification engine error: {str(e)}")
+                self._income_engine_loaded = True
+        return self._income_engine
+
+    def scoring_models(self):
+        scoring_models = (
+            (self.engine_region_aware, "Region-Aware XGBoost", self.expected_features_region, 35),
+            (self.engine_fair_xgb, "Fair XGBoost", self.expected_features_fair, 30),
+        )
+        if SCORING_MODE == "ensemble":
+            scoring_models += ((self.engine_delphi, DELPHI_MODEL_NAME, self.expected_features_delphi, 30),)
+        return scoring_models
+
+    def feature_layout(self):
+        return (tuple(self.final_35_features_order), tuple(self.fair_30_features_order))
+
+    def describe(self):
+        description = {"name": self.name, "version": self.version, "model_dir": str(self.model_dir), "loaded_at": self.loaded_at}
+        if self.engine_delphi is not None:
+            description["ensemble"] = self.engine_delphi.describe()
+        return description
+
+DELPHI_MODEL_NAME = "Delphi Consensus Ensemble"
+
+def _load_delphi_ensemble(models):
+    ensemble_path = models.model_dir / ENSEMBLE_ARTIFACT
+    if not ensemble_path.exists():
+        logger.warning(f"⚠️ Delphi ensemble ({ENSEMBLE_ARTIFACT}) not found. Scoring with the XGBoost models only.")
+        return None
+    try:
+        engine = DelphiEnsembleEngine(joblib.load(ensemble_path), nthread=XGB_NTHREAD)
+        if engine.feature_order != models.fair_30_features_order:
+            raise ValueError("its feature order does not match the Fair XGBoost inputs")
+    except Exception as e:
+        logger.warning(f"⚠️ Delphi ensemble error: {str(e)}")
+        return None
+    models.expected_features_delphi = engine.n_features
+    logger.info(f"✅ Delphi Consensus Ensemble loaded ({len(engine.member_names)} members, "
+                f"{len(engine.linear_members)} fused into one matrix product)")
+    return engine
+
+def _model_version(model_dir, compiled_artifacts):
+    sources = dict(compiled_artifacts["manifest"]["sources"]) if compiled_artifacts is not None else {}
+    for name in SOURCE_ARTIFACTS:
+        if name not in sources and (model_dir / name).exists():
+            sources[name] = file_sha256(model_dir / name)
+    fingerprint = json.dumps({"sources": sources, "backend": INFERENCE_BACKEND, "xgboost": xgb.__version__}, sort_keys=True)
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+def load_model_set(model_dir):
+    models = ModelSet(model_dir)
+    model_dir = models.model_dir
+
+    try:
+        if USE_ARTIFACT_CACHE:
+            models.compiled_artifacts = load_compiled_artifacts(model_dir)
+            if models.compiled_artifacts is not None:
+                logger.info(f"✅ Compiled artifacts found in {model_dir / 'compiled'} (boosters: UBJSON, preprocessing: npz)")
+            else:
+                logger.warning(f"⚠️ No fresh compiled artifacts. Loading pickles (run `python artifact_cache.py` to speed up startup).")
+        compiled_artifacts = models.compiled_artifacts
+
+        if compiled_artifacts is not None:
+            models.scaler_params = compiled_artifacts["scaler"]
+            models.encoder_classes = compiled_artifacts["encoder_classes"]
+            n_scaler_features = models.scaler_params["n_features_in"]
+            logger.info(f"✅ Feature scaler parameters loaded (expects {n_scaler_features} features)")
+            if n_scaler_features != 27:
+                logger.error(f"❌ ERROR: Scaler expects {n_scaler_features} features, but pipeline logic requires it to expect 27.")
+                raise ValueError(f"Scaler expects {n_scaler_features} features, required 27.")
+            logger.info("✅ Label encoder classes loaded")
+        else:
+            scaler_path = model_dir / "feature_scaler.pkl"
+            if scaler_path.exists():
+                models.feature_scaler = joblib.load(scaler_path)
+                n_scaler_features = getattr(models.feature_scaler, 'n_features_in_', 0)
+                logger.info(f"✅ Feature scaler loaded (expects {n_scaler_features} features)")
+                if n_scaler_features != 27:
+                    logger.error(f"❌ ERROR: Scaler expects {n_scaler_features} features, but pipeline logic requires it to expect 27.")
+                    raise ValueError(f"Scaler expects {n_scaler_features} features, required 27.")
+                models.scaler_params = scaler_params_from_sklearn(models.feature_scaler)
+            else:
+                logger.error(f"❌ Feature scaler not found")
+                raise FileNotFoundError("Feature scaler not found")
+
+            encoder_path = model_dir / "label_encoders.pkl"
+            if encoder_path.exists():
+                models.label_encoders = joblib.load(encoder_path)
+                models.encoder_classes = encoder_classes_from_sklearn(models.label_encoders)
+                logger.info("✅ Label encoders loaded")
+            else:
+                logger.error(f"❌ Label encoders not found")
+                raise FileNotFoundError("Label encoders not found")
+
+        feature_config_path = model_dir / "feature_names.json"
+        if feature_config_path.exists():
+            with open(feature_config_path, "r") as f:
+                feature_config = json.load(f)
+
+            models.original_features_order_27 = feature_config.get('all_features', [])
+            logger.info(f"🔧 Loaded {len(models.original_features_order_27)} original features from JSON for scaler.")
+            if len(models.original_features_order_27) != 27:
+                logger.error(f"❌ ERROR: Expected 27 original features in JSON ('all_features' key), found {len(models.original_features_order_27)}.")
+                raise ValueError("Incorrect number of original features for scaler in feature_names.json.")
+
+            models.base_features_order_28 = models.original_features_order_27 + ['verified_income_from_ivl']
+            logger.info(f"✅ Base feature list constructed ({len(models.base_features_order_28)} features including IVL).")
+        else:
+            logger.error(f"❌ ERROR: Feature config 'feature_names.json' is required but not found in {model_dir}")
+            raise FileNotFoundError("Feature config 'feature_names.json' is required but not found")
+
+        try:
+            region_classes = models.encoder_classes['region']
+            models.one_hot_region_order = [f'region_{encoded}' for encoded, cls in enumerate(region_classes)]
+            if len(models.one_hot_region_order) != 5:
+                logger.warning(f"⚠️ Warning: Expected 5 regions, found {len(models.one_hot_region_order)} in label encoder: {region_classes}. Using inferred order: {models.one_hot_region_order}.")
+            else:
+                logger.info(f"🔧 One-hot region order inferred: {models.one_hot_region_order}")
+        except KeyError:
+            logger.error(f"❌ ERROR: 'region' not found in the label encoders.")
+            raise
+        except Exception as e:
+            logger.error(f"❌ ERROR: Could not determine one-hot region order: {e}.")
+            raise
+
+        models.final_35_features_order = models.base_features_order_28 + ['region_encoded', 'employment_type_encoded'] + models.one_hot_region_order
+        logger.info(f"🔧 Final feature order defined ({len(models.final_35_features_order)} features for Region-Aware model)")
+
+        models.fair_30_features_order = models.base_features_order_28 + ['region_encoded', 'employment_type_encoded']
+        logger.info(f"🔧 Final feature order defined ({len(models.fair_30_features_order)} features for Fair XGBoost model)")
+
+        if models.income_model_path.exists():
+            logger.info("✅ Income verification model found (loaded on first use)")
+        else:
+            logger.warning("⚠️ Income verification model not found (optional)")
+
+        xgb_region_path = model_dir / "xgb_region_aware.pkl"
+        fair_xgb_path = model_dir / "fair_xgb.pkl"
+        compiled_models = compiled_artifacts["models"] if compiled_artifacts is not None else {}
+
+        def _load_xgb_artifact(path):
+            if path.name in compiled_models:
+                return compiled_models[path.name]
+            return joblib.load(path)
+
+        if xgb_region_path.exists() or xgb_region_path.name in compiled_models:
+            try:
+                models.model_region_aware = _load_xgb_artifact(xgb_region_path)
+                if isinstance(models.model_region_aware, xgb.XGBModel):
+                    models.expected_features_region = models.model_region_aware.get_booster().num_features()
+                else:
+                    models.expected_features_region = getattr(models.model_region_aware, 'n_features_in_', 0)
+
+                if models.expected_features_region != 35:
+                    logger.error(f"❌ ERROR: Loaded Region-Aware model expects {models.expected_features_region} features, but pipeline is built for 35.")
+                    models.model_region_aware = None
+                else:
+                    logger.info(f"✅ Region-Aware XGBoost loaded (PRIMARY - {models.expected_features_region} features)")
+            except Exception as e:
+                logger.warning(f"⚠️ Region-aware error: {str(e)}")
+                models.model_region_aware = None
+        else:
+            logger.error(f"❌ Region-Aware XGBoost (xgb_region_aware.pkl) not found. This is the primary model.")
+
+        if fair_xgb_path.exists() or fair_xgb_path.name in compiled_models:
+            try:
+                models.model_fair_xgb = _load_xgb_artifact(fair_xgb_path)
+                if isinstance(models.model_fair_xgb, xgb.XGBModel):
+                    models.expected_features_fair = models.model_fair_xgb.get_booster().num_features()
+                else:
+                    models.expected_features_fair = getattr(models.model_fair_xgb, 'n_features_in_', 0)
+
+                if models.expected_features_fair != 30:
+                    logger.warning(f"⚠️ Warning: Loaded Fair XGBoost model expects {models.expected_features_fair} features, but pipeline is built for 30. Disabling model.")
+                    models.model_fair_xgb = None
+                else:
+                    logger.info(f"✅ Fair XGBoost loaded (COMPARISON - {models.expected_features_fair} features)")
+            except Exception as e:
+                logger.warning(f"⚠️ Fair XGB error: {str(e)}")
+                models.model_fair_xgb = None
+        else:
+            logger.warning(f"⚠️ Fair XGBoost (fair_xgb.pkl) not found. Will not be used for comparison.")
+
+        if models.model_region_aware is None:
+            logger.error(f"❌ FATAL: The primary model (xgb_region_aware.pkl) failed to load. Predictions cannot proceed.")
+            raise FileNotFoundError("Primary prediction model 'xgb_region_aware.pkl' not found or failed to load correctly")
+
+        logger.info("🎉 ALL MODELS LOADED SUCCESSFULLY".center(80, " "))
+        logger.info(f"   Primary Model: {'✅ Region-Aware XGBoost' if models.model_region_aware else '❌ Not Loaded'}")
+        logger.info(f"   Comparison Model: {'✅ Fair XGBoost' if models.model_fair_xgb else '❌ Not Loaded'}")
+        logger.info(f"   Income Verification: {'✅ Available (lazy)' if models.income_model_path.exists() else '❌ Not Available'}")
+        logger.info(f"   Threshold: {OPTIMAL_THRESHOLD} (Optimized)")
+
+    except Exception as e:
+        logger.exception(f"❌ Error during artifact loading from {model_dir}: {str(e)}")
+        raise
+
+    models.engine_region_aware = _build_inference_engine(models.model_region_aware, "xgb_region_aware.pkl", compiled_artifacts)
+    models.engine_fair_xgb = _build_inference_engine(models.model_fair_xgb, "fair_xgb.pkl", compiled_artifacts)
+    if SCORING_MODE == "ensemble":
+        models.engine_delphi = _load_delphi_ensemble(models)
+    logger.info(f"✅ Inference backend: {INFERENCE_BACKEND} (nthread={XGB_NTHREAD or 'xgboost default'})")
+
+    models.scaler_mean = models.scaler_params["mean"]
+    models.scaler_scale = models.scaler_params["scale"]
+    models.region_code_to_encoded = _compile_code_lookup(REGION_MAP, models.encoder_classes['region'])
+    models.employment_code_to_encoded = _compile_code_lookup(EMPLOYMENT_TYPE_MAP, models.encoder_classes['employment_type'])
+    models.num_regions = len(models.encoder_classes['region'])
+    models.version = _model_version(model_dir, compiled_artifacts)
+    return models
+
+BOOT_MODELS = load_model_set(MODEL_DIR)
+
+# The feature layout is fixed for the life of the process; model versions that change it are rejected
+original_features_order_27 = BOOT_MODELS.original_features_order_27
+base_features_order_28 = BOOT_MODELS.base_features_order_28
+one_hot_region_order = BOOT_MODELS.one_hot_region_order
+final_35_features_order = BOOT_MODELS.final_35_features_order
+fair_30_features_order = BOOT_MODELS.fair_30_features_order
+
+SCORE_CACHE = ScoringCache(MODEL_DIR)
+logger.info(f"✅ Model version {BOOT_MODELS.version} (score cache: {SCORE_CACHE.max_size if SCORE_CACHE.enabled else 'disabled'} entries)")
+
+def get_income_model():
+    return MODEL_REGISTRY.active.get_income_model()
+
+def get_income_engine():
+    return MODEL_REGISTRY.active.get_income_engine()
+
+display_section("📋 CATEGORICAL MAPPINGS & TEST DATA")
+
+REGION_NAME_TO_CODE = {v: k for k, v in REGION_MAP.items()}
+EMPLOYMENT_NAME_TO_CODE = {v: k for k, v in EMPLOYMENT_TYPE_MAP.items()}
+GENDER_NAME_TO_CODE = {v[0]: k for k, v in GENDER_MAP.items()}
+CASTE_NAME_TO_CODE = {v: k for k, v in CASTE_GROUP_MAP.items()}
+
+TEST_APPLICANT_JSON_GOOD = {
+    "applicant_id": "APP-001",
+    "age": 35,
+    "gender_code": 1,
+    "caste_code": 1,
+    "region_code": 2,
+    "employment_code": 1,
+    "monthly_income": 80000,
+    "income_stability": 0.8,
+    "avg_balance": 150000,
+    "savings_ratio": 0.3,
+    "expense_income_ratio": 0.4,
+    "utility_payment_score": 95,
+    "rent_payment_score": 100,
+    "upi_transactions": 120,
+    "upi_avg_amount": 800,
+    "mobile_recharge_freq": 2,
+    "digital_wallet_usage": 70,
+    "merchant_diversity": 0.8,
+    "credit_lines": 3,
+    "credit_tenure_months": 48,
+    "missed_payments": 1000,
+    "avg_days_past_due": 0,
+    "credit_utilization": 0.25,
+    "consent_given": 1,
+    "document_verified": 1
+}
+
+TEST_APPLICANT_JSON_BAD = {
+    "applicant_id": "APP-002",
+    "age": 24,
+    "gender_code": 2,
+    "caste_code": 3,
+    "region_code": 1,
+    "employment_code": 2,
+    "monthly_income": 25000,
+    "income_stability": 0.3,
+    "avg_balance": 5000,
+    "savings_ratio": 0.05,
+    "expense_income_ratio": 0.8,
+    "utility_payment_score": 60,
+    "rent_payment_score": 70,
+    "upi_transactions": 30,
+    "upi_avg_amount": 250,
+    "mobile_recharge_freq": 4,
+    "digital_wallet_usage": 40,
+    "merchant_diversity": 0.3,
+    "credit_lines": 1,
+    "credit_tenure_months": 10,
+    "missed_payments": 3,
+    "avg_days_past_due": 15,
+    "credit_utilization": 0.95,
+    "consent_given": 1,
+    "document_verified": 1
+}
+
+logger.info("✅ Mappings and Test Applicants defined")
+
+display_section("🔧 DEFINING TRANSFORMATION FUNCTIONS")
+
+def _to_int(value, _):
+    if isinstance(value, np.ndarray):
+        return np.trunc(value.astype(float))
+    return int(value)
+
+FEATURE_DERIVATIONS = [
+    ('age', 'age', ()),
+    ('declared_income', 'monthly_income', ((operator.mul, 12),)),
+    ('verified_income', 'monthly_income', ((operator.mul, 12), (operator.mul, 0.95))),
+    ('income_stability', 'income_stability', ()),
+    ('avg_balance', 'avg_balance', ()),
+    ('savings_ratio', 'savings_ratio', ()),
+    ('debt_to_income_ratio', 'expense_income_ratio', ()),
+    ('loan_emi_ratio', 'expense_income_ratio', ((operator.mul, 0.3),)),
+    ('utility_payment_timeliness', 'utility_payment_score', ((operator.truediv, 100),)),
+    ('rent_payment_timeliness', 'rent_payment_score', ((operator.truediv, 100),)),
+    ('mobile_recharge_freq', 'mobile_recharge_freq', ()),
+    ('mobile_recharge_var', 'mobile_recharge_freq', ((operator.mul, 0.2),)),
+    ('upi_txn_count', 'upi_transactions', ()),
+    ('upi_avg_txn_size', 'upi_avg_amount', ()),
+    ('merchant_diversity_score', 'merchant_diversity', ()),
+    ('digital_wallet_usage', 'digital_wallet_usage', ((operator.truediv, 100),)),
+    ('app_finance_ratio', 'digital_wallet_usage', ((operator.truediv, 100), (operator.mul, 0.7))),
+    ('past_loans_count', 'credit_lines', ()),
+    ('missed_payments', 'missed_payments', ()),
+    ('avg_days_past_due', 'avg_days_past_due', ()),
+    ('credit_utilization_ratio', 'credit_utilization', ()),
+    ('credit_lines_active', 'credit_lines', ()),
+    ('credit_tenure_months', 'credit_tenure_months', ()),
+    ('consent_given', 'consent_given', ((_to_int, None),)),
+    ('document_verified', 'document_verified', ((_to_int, None),)),
+]
+
+FEATURE_CONSTANTS = {
+    'sim_change_freq': 0.1,
+    'battery_pattern_score': 0.5,
+}
+
+IVL_INPUT_FEATURES = [
+    'utility_payment_timeliness', 'rent_payment_timeliness',
+    'upi_txn_count', 'upi_avg_txn_size', 'avg_balance',
+    'mobile_recharge_freq', 'digital_wallet_usage',
+    'merchant_diversity_score', 'savings_ratio', 'age'
+]
+
+def _compile_feature_plan():
+    column_index = {name: i for i, name in enumerate(base_features_order_28)}
+
+    input_plan = []
+    for feature_name, input_key, ops in FEATURE_DERIVATIONS:
+        if feature_name in column_index:
+            input_plan.append((column_index[feature_name], input_key, ops))
+
+    row_template = np.zeros((1, len(base_features_order_28)))
+    for feature_name, value in FEATURE_CONSTANTS.items():
+        if feature_name in column_index:
+            row_template[0, column_index[feature_name]] = value
+
+    input_keys = sorted({key for _, key, _ in input_plan})
+    matrix_plan = [(column, input_keys.index(key), ops) for column, key, ops in input_plan]
+
+    ivl_indices = [original_features_order_27.index(f) for f in IVL_INPUT_FEATURES if f in original_features_order_27]
+
+    return {
+        "column_index": column_index,
+        "input_plan": input_plan,
+        "input_keys": input_keys,
+        "matrix_plan": matrix_plan,
+        "row_template": row_template,
+        "ivl_column": column_index['verified_income_from_ivl'],
+        "default_income_column": column_index['verified_income'],
+        "ivl_indices": ivl_indices,
+    }
+
+FEATURE_PLAN = _compile_feature_plan()
+FEATURE_INDEX = FEATURE_PLAN["column_index"]
+_feature_buffers = threading.local()
+
+def _single_row_buffer():
+    buffer = getattr(_feature_buffers, "row", None)
+    if buffer is None:
+        buffer = FEATURE_PLAN["row_template"].copy()
+        _feature_buffers.row = buffer
+    return buffer
+
+def _apply_derivation(value, ops):
+    for op, operand in ops:
+        value = op(value, operand)
+    return value
+
+def _fill_feature_row(user_inputs, out):
+    row = out[0]
+    for column, input_key, ops in FEATURE_PLAN["input_plan"]:
+        row[column] = _apply_derivation(user_inputs[input_key], ops)
+    row[FEATURE_PLAN["ivl_column"]] = row[FEATURE_PLAN["default_income_column"]]
+    return out
+
+def _fill_feature_matrix(raw_inputs, out):
+    for column, input_position, ops in FEATURE_PLAN["matrix_plan"]:
+        out[:, column] = _apply_derivation(raw_inputs[:, input_position], ops)
+    out[:, FEATURE_PLAN["ivl_column"]] = out[:, FEATURE_PLAN["default_income_column"]]
+    return out
+
+def _new_feature_matrix(n_rows):
+    return np.repeat(FEATURE_PLAN["row_template"], n_rows, axis=0)
+
+def _scale_features(X_raw_27, models, out=None):
+    centered = X_raw_27 - models.scaler_mean
+    return np.divide(centered, models.scaler_scale, out=centered if out is None else out)
+
+def _encode_codes(lookup, codes, attribute):
+    codes = np.asarray(codes, dtype=np.int64)
+    encoded = lookup[np.clip(codes, 0, len(lookup) - 1)]
+    unseen = (codes < 0) | (codes >= len(lookup)) | (encoded < 0)
+    if unseen.any():
+        raise ValueError(f"{attribute} contains previously unseen codes: {np.unique(codes[unseen]).tolist()}")
+    return encoded
+
+def _apply_ivl(X_raw, X_scaled_27, path, models):
+    engine = models.get_income_engine()
+    if engine is None:
+        logger.debug("   IVL Status: Using default estimate")
+        return IVL_STATUS_DEFAULT
+
+    timer = stage_timer()
+    try:
+        X_raw[:, FEATURE_PLAN["ivl_column"]] = engine.predict(X_scaled_27[:, FEATURE_PLAN["ivl_indices"]])
+    except Exception as e:
+        increment("credx_ivl_fallbacks_total", (("path", path),), X_raw.shape[0])
+        logger.warning(f"⚠️ Failed to use IVL Model ({type(e).__name__}: {e}). Using default estimate.")
+        return IVL_STATUS_FALLBACK
+    timer.lap("ivl" if path == "single" else "batch_ivl")
+    logger.debug("   IVL Status: ✅ IVL Model used for %d applicants", X_raw.shape[0])
+    return IVL_STATUS_USED
+
+def convert_user_inputs_to_features(user_inputs, out=None, scaled_out=None, models=None):
+    models = MODEL_REGISTRY.active if models is None else models
+    if out is None:
+        out = _single_row_buffer()
+    X_raw = _fill_feature_row(user_inputs, out)
+    if scaled_out is None and models.get_income_engine() is None:
+        return X_raw, IVL_STATUS_DEFAULT
+
+    X_scaled_27 = _scale_features(X_raw[:, :27], models, out=None if scaled_out is None else scaled_out[:, :27])
+    return X_raw, _apply_ivl(X_raw, X_scaled_27, "single", models)
+
+logger.info(f"✅ Transformation functions defined (feature plan compiled: {len(FEATURE_PLAN['input_plan'])} input columns)")
+
+BATCH_CHUNK_SIZE = 4096
+
+RISK_BANDS = [
+    (750, "Excellent", "#27ae60"),
+    (700, "Good", "#3498db"),
+    (650, "Fair", "#f39c12"),
+    (600, "Poor", "#e67e22"),
+]
+LOWEST_RISK_BAND = ("Very Poor", "#e74c3c")
+
+def _risk_band(credit_score):
+    for min_score, risk_category, risk_color in RISK_BANDS:
+        if credit_score >= min_score:
+            return risk_category, risk_color
+    return LOWEST_RISK_BAND
+
+def _score_to_result(model_name, default_probability, approval_probability, threshold, feature_shape):
+    is_approved = default_probability < threshold
+    credit_score = int(300 + (approval_probability * 550))
+    risk_category, risk_color = _risk_band(credit_score)
+
+    return {
+        "model": model_name,
+        "score": credit_score,
+        "approved": bool(is_approved),
+        "default_risk": float(default_probability),
+        "approval_probability": float(approval_probability),
+        "risk_category": risk_category,
+        "risk_color": risk_color,
+        "feature_shape": list(feature_shape),
+        "error": None
+    }
+
+def _run_single_prediction(model, model_name, expected_features, feature_vector, threshold):
+
+    if feature_vector.shape[1] != expected_features:
+        error_msg = f"FATAL: Final feature shape {feature_vector.shape[1]} does not match loaded model expectation {expected_features} for model '{model_name}'."
+        logger.error(f"❌ {error_msg}")
+        raise ValueError(error_msg)
+
+    pred_proba = model.predict_proba(feature_vector)[0]
+    default_probability = float(pred_proba[1])
+    approval_probability = float(pred_proba[0])
+
+    return _score_to_result(model_name, default_probability, approval_probability, threshold, feature_vector.shape)
+
+def _timed_single_prediction(model, model_name, expected_features, feature_vector, threshold):
+    started_at = time.perf_counter()
+    try:
+        return _run_single_prediction(model, model_name, expected_features, feature_vector, threshold)
+    finally:
+        observe("model", time.perf_counter() - started_at, model_name)
+
+def _run_models_concurrently(scored_models, X_final_input_35, X_final_input_30, threshold):
+    # The last model (the Delphi ensemble when loaded) runs on the caller thread, so its own members can still use the pool
+    order = scored_models[-1:] + scored_models[:-1]
+    outcomes = run_isolated([
+        lambda model=model, model_name=model_name, expected_features=expected_features, width=width: _timed_single_prediction(
+            model, model_name, expected_features, X_final_input_35 if width == 35 else X_final_input_30, threshold
+        )
+        for model, model_name, expected_features, width in order
+    ])
+    return {model_name: outcome for (_, model_name, _, _), outcome in zip(order, outcomes)}
+
+def _run_batch_prediction(model, model_name, expected_features, feature_matrix, threshold):
+
+    if feature_matrix.shape[1] != expected_features:
+        error_msg = f"FATAL: Final feature shape {feature_matrix.shape[1]} does not match loaded model expectation {expected_features} for model '{model_name}'."
+        logger.error(f"❌ {error_msg}")
+        raise ValueError(error_msg)
+
+    pred_proba = model.predict_proba(feature_matrix)
+    row_shape = [1, feature_matrix.shape[1]]
+
+    return [
+        _score_to_result(model_name, float(p[1]), float(p[0]), threshold, row_shape)
+        for p in pred_proba
+    ]
+
+MODEL_COLUMN_PREFIXES = {"Region-Aware XGBoost": "region_aware", "Fair XGBoost": "fair"}
+if SCORING_MODE == "ensemble":
+    MODEL_COLUMN_PREFIXES[DELPHI_MODEL_NAME] = "delphi"
+MODEL_FEATURE_NAMES = {"Region-Aware XGBoost": final_35_features_order, "Fair XGBoost": fair_30_features_order}
+
+def _feature_contributions(model, X):
+    if isinstance(model, BoosterInferenceEngine):
+        booster, iteration_range = model.booster, model.iteration_range
+    else:
+        booster = model.get_booster()
+        iteration_range = booster_iteration_range(booster)
+    # Native TreeSHAP: one column per feature plus the bias, in log-odds of default
+    return booster.predict(
+        xgb.DMatrix(np.ascontiguousarray(X, dtype=np.float32)), pred_contribs=True,
+        approx_contribs=EXPLAIN_APPROX, iteration_range=iteration_range, validate_features=False
+    )
+
+def _explain_rows(model, model_name, X):
+    feature_names = MODEL_FEATURE_NAMES[model_name]
+    return [
+        {"base_value": row[-1], "contributions": dict(zip(feature_names, row[:-1]))}
+        for row in _feature_contributions(model, X).tolist()
+    ]
+
+def _explain_models(models, model_inputs, rows, batch_predictions):
+    explanations = [{} for _ in rows]
+    for model, model_name, _, width in models.scoring_models():
+        if not model or model_name not in MODEL_FEATURE_NAMES:
+            continue
+        ok = [j for j, row in enumerate(rows) if batch_predictions[row].get(model_name, {}).get("error") is None]
+        if not ok:
+            continue
+        try:
+            explained = _explain_rows(model, model_name, model_inputs[[rows[j] for j in ok], :width])
+        except Exception as e:
+            logger.error(f"❌ Error explaining {model_name}: {e}")
+            explained = [{"error": str(e)}] * len(ok)
+        for j, explanation in zip(ok, explained):
+            explanations[j][model_name] = explanation
+    return explanations
+
+FAIRNESS_CODE_KEYS = ('gender_code', 'caste_code', 'region_code', 'employment_code')
+FAIRNESS_MONITOR = FairnessMonitor(list(MODEL_COLUMN_PREFIXES), [
+    ("gender", {code: names[0] for code, names in GENDER_MAP.items()}),
+    ("caste", CASTE_GROUP_MAP),
+    ("region", REGION_MAP),
+    ("employment", EMPLOYMENT_TYPE_MAP),
+])
+
+def _fairness_decision(prediction):
+    if prediction is None or prediction.get("error") is not None:
+        return DECISION_ERROR
+    return DECISION_APPROVED if prediction["approved"] else DECISION_REJECTED
+
+def _record_fairness(user_inputs, all_predictions):
+    if FAIRNESS_MONITOR.enabled:
+        FAIRNESS_MONITOR.record(
+            tuple(user_inputs[key] for key in FAIRNESS_CODE_KEYS),
+            [_fairness_decision(all_predictions.get(name)) for name in FAIRNESS_MONITOR.models]
+        )
+
+def _record_fairness_batch(parsed, batch_predictions):
+    if FAIRNESS_MONITOR.enabled:
+        FAIRNESS_MONITOR.record_batch(
+            [[user_inputs[key] for key in FAIRNESS_CODE_KEYS] for _, user_inputs, _, _ in parsed],
+            [[_fairness_decision(p.get(name)) for name in FAIRNESS_MONITOR.models] for p in batch_predictions]
+        )
+
+def _shadow_sample(applicant_json_data, all_predictions, threshold):
+    primary = all_predictions.get("Region-Aware XGBoost")
+    if primary is not None and primary.get("error") is None and MODEL_REGISTRY.shadow_sampled():
+        MODEL_REGISTRY.shadow_enqueue([(applicant_json_data, threshold, primary["default_risk"], primary["approved"])])
+
+def _shadow_sample_batch(applicants, parsed, batch_predictions, threshold):
+    items = []
+    for row in MODEL_REGISTRY.shadow_rows(len(parsed)):
+        primary = batch_predictions[row].get("Region-Aware XGBoost")
+        if primary is not None and primary.get("error") is None:
+            items.append((applicants[parsed[row][0]], threshold, primary["default_risk"], primary["approved"]))
+    if items:
+        MODEL_REGISTRY.shadow_enqueue(items)
+
+def _model_row_buffer():
+    buffer = getattr(_feature_buffers, "model_row", None)
+    if buffer is None:
+        buffer = np.zeros((1, len(final_35_features_order)), dtype=np.float32)
+        _feature_buffers.model_row = buffer
+    return buffer
+
+def _build_model_inputs(X_raw, region_codes, employment_codes, models, out=None, prescaled=False):
+    n_rows = X_raw.shape[0]
+    if out is None:
+        out = np.zeros((n_rows, len(final_35_features_order)), dtype=np.float32)
+
+    region_encoded = _encode_codes(models.region_code_to_encoded, region_codes, 'region')
+    employment_encoded = _encode_codes(models.employment_code_to_encoded, employment_codes, 'employment_type')
+    num_regions = models.num_regions
+
+    if not prescaled:
+        _scale_features(X_raw[:, :27], models, out=out[:, :27])
+    out[:, 27] = X_raw[:, FEATURE_PLAN["ivl_column"]]
+    out[:, 28] = region_encoded
+    out[:, 29] = employment_encoded
+    out[:, 30:] = 0
+    in_range = region_encoded < num_regions
+    out[np.nonzero(in_range)[0], 30 + region_encoded[in_range]] = 1
+
+    return out, out[:, :30]
+
+def _parse_applicant(applicant_json_data):
+    user_inputs = applicant_json_data.copy()
+
+    user_inputs['gender_display'], user_inputs['gender_char'] = GENDER_MAP[user_inputs['gender_code']]
+    user_inputs['caste_group'] = CASTE_GROUP_MAP[user_inputs['caste_code']]
+    user_inputs['region'] = REGION_MAP[user_inputs['region_code']]
+    user_inputs['employment_type'] = EMPLOYMENT_TYPE_MAP[user_inputs['employment_code']]
+    user_inputs['consent_given'] = bool(int(user_inputs.get('consent_given', 1)))
+    user_inputs['document_verified'] = bool(int(user_inputs.get('document_verified', 1)))
+
+    applicant_profile_display = {
+        "age": user_inputs['age'],
+        "gender": user_inputs['gender_display'],
+        "region": user_inputs['region'],
+        "employment": user_inputs['employment_type'],
+        "monthly_income": user_inputs['monthly_income']
+    }
+    return user_inputs, applicant_profile_display
+
+FACTOR_RULES = FactorRuleEngine(FEATURE_INDEX)
+
+def _evaluate_factor_rules(X_raw, batch_predictions):
+    approved = []
+    for all_predictions in batch_predictions:
+        primary = all_predictions.get("Region-Aware XGBoost")
+        approved.append(primary is not None and primary["error"] is None and bool(primary["approved"]))
+    return FACTOR_RULES.evaluate(X_raw, approved)
+
+def _assemble_final_output(user_inputs, applicant_profile_display, factor_table, row, all_predictions, threshold, model_version):
+    recommendations = []
+    positive_factors_list = []
+    negative_factors_list = []
+
+    if "Region-Aware XGBoost" in all_predictions and all_predictions["Region-Aware XGBoost"]["error"] is None:
+        final_decision = all_predictions["Region-Aware XGBoost"]
+        positive_factors_list, negative_factors_list, recommendations = factor_table.row(row)
+    else:
+        final_decision = {"error": "Primary model failed to run"}
+
+    model_predictions_list = [v for v in all_predictions.values() if v.get("error") is None]
+    approved_count = sum(1 for p in model_predictions_list if p['approved'])
+    total_count = len(model_predictions_list)
+    unanimous = total_count > 0 and (approved_count == 0 or approved_count == total_count)
+
+    return {
+        "success": True,
+        "applicant_profile": applicant_profile_display,
+        "final_decision": {
+            "approved": final_decision.get('approved', False),
+            "credit_score": final_decision.get('score', 0),
+            "risk_category": final_decision.get('risk_category', 'Error'),
+            "default_risk": final_decision.get('default_risk', 1.0),
+            "approval_probability": final_decision.get('approval_probability', 0.0),
+            "threshold": threshold
+        },
+        "model_predictions": model_predictions_list,
+        "consensus": {
+            "approved_count": approved_count,
+            "total_count": total_count,
+            "unanimous": unanimous
+        },
+        "positive_factors": positive_factors_list,
+        "negative_factors": negative_factors_list,
+        "recommendations": recommendations,
+        "all_predictions": all_predictions,
+        "colour": final_decision.get('risk_color'),
+        "name": user_inputs.get('applicant_id'),
+        "model_version": model_version
+    }
+
+def _log_final_output(final_json_output):
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    final_decision = final_json_output["final_decision"]
+    logger.debug("📊 PREDICTION RESULTS".center(80, " "))
+
+    if final_decision['risk_category'] == 'Error':
+        logger.debug("❌ Final decision could not be made. Primary model failed.")
+        return
+
+    logger.debug(f"   Credit Score: {final_decision['credit_score']}")
+    logger.debug(f"   Risk: {final_decision['risk_category']}")
+    logger.debug(f"   Status: {'✅ APPROVED' if final_decision['approved'] else '❌ REJECTED'}")
+
+    logger.debug("🔍 SCORE FACTOR ANALYSIS".center(80, " "))
+
+    logger.debug("   ✅ Positive Factors (Leveraging Your Score)")
+    for factor in final_json_output["positive_factors"]:
+        logger.debug(f"     • {factor['text']}")
+    if not final_json_output["positive_factors"]:
+        logger.debug("     • No strong positive factors identified based on these rules.")
+
+    logger.debug("   ❌ Negative Factors (Degrading Your Score)")
+    for factor in final_json_output["negative_factors"]:
+        logger.debug(f"     • {factor['text']}")
+    if not final_json_output["negative_factors"]:
+        logger.debug("     • No strong negative factors identified. Keep up the good work!")
+
+    logger.debug("   Note: This is not an exhaustive list. Your score is calculated using a")
+    logger.debug("   comprehensive model. These are prominent factors identified by our analysis rules.")
+
+    logger.debug("💡 RECOMMENDATIONS".center(80, " "))
+    for rec in final_json_output["recommendations"]:
+        logger.debug(f"   {rec}")
+
+    logger.debug("%s", final_json_output)
+
+def _score_cache_key(user_inputs, threshold, model_version, explain=False):
+    raw_inputs = np.array([float(user_inputs[key]) for key in FEATURE_PLAN["input_keys"]])
+    codes = (user_inputs['region_code'], user_inputs['employment_code'])
+    return feature_key(raw_inputs, codes, model_version, threshold, "explain" if explain else "")
+
+def _decision_fields(final_json_output, started_at):
+    final_decision = final_json_output["final_decision"]
+    return {
+        "event": "prediction",
+        "duration_ms": round((time.perf_counter() - started_at) * 1000, 3),
+        "approved": final_decision["approved"],
+        "credit_score": final_decision["credit_score"],
+        "risk_category": final_decision["risk_category"],
+        "default_risk": round(final_decision["default_risk"], 6),
+        "threshold": final_decision["threshold"],
+        "models_ok": final_json_output["consensus"]["total_count"],
+        "unanimous": final_json_output["consensus"]["unanimous"],
+    }
+
+def run_multi_model_prediction(applicant_json_data, threshold=OPTIMAL_THRESHOLD, explain=False):
+    started_at = time.perf_counter()
+    timer = stage_timer()
+    logger.debug("🔮 PROCESSING PREDICTION FOR APPLICANT: %s", applicant_json_data.get('applicant_id', 'N/A'))
+
+    all_predictions = {}
+    models = MODEL_REGISTRY.active
+
+    try:
+        logger.debug("Step 1: Parsing Applicant JSON...")
+        user_inputs, applicant_profile_display = _parse_applicant(applicant_json_data)
+        timer.lap("parse")
+        logger.debug("✅ Applicant Profile: %s", applicant_profile_display)
+
+        cache_key = None
+        if SCORE_CACHE.enabled:
+            cache_key = _score_cache_key(user_inputs, threshold, models.version, explain)
+            cached_output = SCORE_CACHE.get(cache_key)
+            if cached_output is not None:
+                _serve_cached(cached_output, applicant_json_data, user_inputs, applicant_profile_display, threshold)
+                timer.lap("cache")
+                timer.finish()
+                increment("credx_predictions_total", (("path", "cache"),))
+                _log_final_output(cached_output)
+                logger.info("prediction", extra={"fields": dict(_decision_fields(cached_output, started_at), cache="hit")})
+                return cached_output
+
+        logger.debug("Step 2: Converting user inputs to model features...")
+        model_row = _model_row_buffer()
+        X_raw, ivl_status = convert_user_inputs_to_features(user_inputs, scaled_out=model_row, models=models)
+        timer.lap("features")
+        logger.debug("✅ Base feature engineering complete (%d features)", X_raw.shape[1])
+
+        logger.debug("Step 3: Building shared scaled feature block...")
+        try:
+            X_final_input_35, X_final_input_30 = _build_model_inputs(
+                X_raw, [user_inputs['region_code']], [user_inputs['employment_code']], models,
+                out=model_row, prescaled=True
+            )
+            shared_error = None
+            timer.lap("model_inputs")
+            logger.debug("✅ Shared feature block ready (%d features, Fair model view %d)", X_final_input_35.shape[1], X_final_input_30.shape[1])
+        except Exception as e:
+            shared_error = str(e)
+            logger.error(f"❌ Error building shared feature block: {e}")
+
+        outcomes = None
+        scored_models = [entry for entry in models.scoring_models() if entry[0]]
+        if CONCURRENT_MODELS and shared_error is None and len(scored_models) > 1:
+            outcomes = _run_models_concurrently(scored_models, X_final_input_35, X_final_input_30, threshold)
+            timer.lap("models")
+
+        for step, (model, model_name, expected_features, width) in enumerate(models.scoring_models(), start=4):
+            logger.debug("Step %d: Running %s...", step, model_name)
+            if not model:
+                logger.debug("⚠️ %s model not loaded. Skipping.", model_name)
+                continue
+            try:
+                if shared_error is not None:
+                    raise ValueError(shared_error)
+                if outcomes is None:
+                    result = _run_single_prediction(
+                        model, model_name, expected_features,
+                        X_final_input_35 if width == 35 else X_final_input_30, threshold
+                    )
+                    timer.lap("model", model_name)
+                else:
+                    result, error = outcomes[model_name]
+                    if error is not None:
+                        raise error
+                all_predictions[model_name] = result
+                logger.debug("✅ %s Complete. Score: %s", model_name, result['score'])
+
+            except Exception as e:
+                if outcomes is None:
+                    timer.lap("model", model_name)
+                increment("credx_model_errors_total", (("model", model_name),))
+                logger.error(f"❌ Error running {model_name}: {e}")
+                all_predictions[model_name] = {"model": model_name, "error": str(e), "feature_shape": [1, width]}
+
+        factor_table = _evaluate_factor_rules(X_raw, [all_predictions])
+        final_json_output = _assemble_final_output(
+            user_inputs, applicant_profile_display, factor_table, 0, all_predictions, threshold, models.version
+        )
+        timer.lap("factors")
+        if explain and shared_error is None:
+            final_json_output["explanation"] = _explain_models(models, model_row, [0], [all_predictions])[0]
+            timer.lap("explain")
+        if cache_key is not None and all(p.get("error") is None for p in all_predictions.values()):
+            SCORE_CACHE.put(cache_key, final_json_output)
+        _record_fairness(user_inputs, all_predictions)
+        _shadow_sample(applicant_json_data, all_predictions, threshold)
+        timer.finish()
+        increment("credx_predictions_total", (("path", "single"),))
+        _log_final_output(final_json_output)
+        logger.info("prediction", extra={"fields": dict(_decision_fields(final_json_output, started_at), ivl=ivl_status, cache="miss" if cache_key is not None else "off")})
+        return final_json_output
+
+    except Exception as e:
+        increment("credx_prediction_failures_total", (("path", "single"),))
+        logger.exception(f"❌ UNHANDLED ERROR in prediction pipeline: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "traceback": traceback.format_exc(),
+            "applicant_profile": applicant_json_data
+        }
+
+def _error_result(applicant_json_data, e):
+    return {
+        "success": False,
+        "error": str(e),
+        "traceback": traceback.format_exc(),
+        "applicant_profile": applicant_json_data
+    }
+
+def _serve_cached(cached_output, applicant_json_data, user_inputs, applicant_profile_display, threshold):
+    cached_output["applicant_profile"] = applicant_profile_display
+    cached_output["name"] = user_inputs.get('applicant_id')
+    _record_fairness(user_inputs, cached_output["all_predictions"])
+    _shadow_sample(applicant_json_data, cached_output["all_predictions"], threshold)
+    return cached_output
+
+def _cacheable(result):
+    return result.get("success") and all(p.get("error") is None for p in result["all_predictions"].values())
+
+def _batch_cache_lookup(applicants, parsed, results, threshold, explain, models):
+    # Cache hits are filled in here; a repeat of a row that still has to be scored waits for that row's result
+    misses, miss_keys, repeats, first_rows = [], [], [], {}
+    for entry in parsed:
+        i, user_inputs, applicant_profile_display, _ = entry
+        key = _score_cache_key(user_inputs, threshold, models.version, explain[i])
+        if key in first_rows:
+            repeats.append((key, first_rows[key], entry))
+            continue
+        cached_output = SCORE_CACHE.get(key)
+        if cached_output is not None:
+            results[i] = _serve_cached(cached_output, applicants[i], user_inputs, applicant_profile_display, threshold)
+            continue
+        first_rows[key] = i
+        misses.append(entry)
+        miss_keys.append(key)
+    return misses, miss_keys, repeats
+
+def _batch_cache_store(applicants, results, misses, miss_keys, repeats, threshold):
+    for (i, _, _, _), key in zip(misses, miss_keys):
+        if _cacheable(results[i]):
+            SCORE_CACHE.put(key, results[i])
+    for key, first, (i, user_inputs, applicant_profile_display, _) in repeats:
+        cached_output = SCORE_CACHE.get(key)
+        if cached_output is None and results[first].get("success"):
+            cached_output = copy.deepcopy(results[first])
+        if cached_output is not None:
+            results[i] = _serve_cached(cached_output, applicants[i], user_inputs, applicant_profile_display, threshold)
+        else:
+            results[i] = dict(results[first], applicant_profile=applicants[i])
+
+def _run_batch_chunk(applicants, threshold, explain, models):
+    timer = stage_timer()
+    results = [None] * len(applicants)
+
+    parsed = []
+    for i, applicant_json_data in enumerate(applicants):
+        try:
+            user_inputs, applicant_profile_display = _parse_applicant(applicant_json_data)
+            raw_inputs = [float(user_inputs[key]) for key in FEATURE_PLAN["input_keys"]]
+            parsed.append((i, user_inputs, applicant_profile_display, raw_inputs))
+        except Exception as e:
+            results[i] = _error_result(applicant_json_data, e)
+
+    if not parsed:
+        return results
+    timer.lap("batch_parse")
+
+    repeats = []
+    if SCORE_CACHE.enabled:
+        parsed, miss_keys, repeats = _batch_cache_lookup(applicants, parsed, results, threshold, explain, models)
+        timer.lap("batch_cache")
+        if not parsed:
+            return results
+
+    n_rows = len(parsed)
+    X_raw = _fill_feature_matrix(np.array([p[3] for p in parsed]), _new_feature_matrix(n_rows))
+    model_inputs = np.zeros((n_rows, len(final_35_features_order)), dtype=np.float32)
+    ivl_status = _apply_ivl(X_raw, _scale_features(X_raw[:, :27], models, out=model_inputs[:, :27]), "batch", models)
+    timer.lap("batch_features")
+
+    batch_predictions = [{} for _ in range(n_rows)]
+
+    try:
+        X_final_input_35, X_final_input_30 = _build_model_inputs(
+            X_raw, [p[1]['region_code'] for p in parsed], [p[1]['employment_code'] for p in parsed], models,
+            out=model_inputs, prescaled=True
+        )
+        shared_error = None
+    except Exception as e:
+        logger.error(f"❌ Error building batch feature matrix: {e}")
+        shared_error = str(e)
+    timer.lap("batch_model_inputs")
+
+    for model, model_name, expected_features, width in models.scoring_models():
+        if not model:
+            continue
+        try:
+            if shared_error is not None:
+                raise ValueError(shared_error)
+            feature_matrix = X_final_input_35 if width == 35 else X_final_input_30
+            model_results = _run_batch_prediction(model, model_name, expected_features, feature_matrix, threshold)
+        except Exception as e:
+            increment("credx_model_errors_total", (("model", model_name),), n_rows)
+            logger.error(f"❌ Error running {model_name} on batch: {e}")
+            model_results = [{"model": model_name, "error": str(e), "feature_shape": [1, width]} for _ in range(n_rows)]
+        for row_predictions, result in zip(batch_predictions, model_results):
+            row_predictions[model_name] = result
+        timer.lap("batch_model", model_name)
+
+    factor_table = _evaluate_factor_rules(X_raw, batch_predictions)
+    for row, ((i, user_inputs, applicant_profile_display, _), all_predictions) in enumerate(zip(parsed, batch_predictions)):
+        try:
+            results[i] = _assemble_final_output(
+                user_inputs, applicant_profile_display, factor_table, row, all_predictions, threshold, models.version
+            )
+        except Exception as e:
+            results[i] = _error_result(applicants[i], e)
+    _record_fairness_batch(parsed, batch_predictions)
+    _shadow_sample_batch(applicants, parsed, batch_predictions, threshold)
+    timer.lap("batch_factors")
+
+    explain_rows = [row for row, p in enumerate(parsed) if explain[p[0]] and results[p[0]].get("success")]
+    if explain_rows and shared_error is None:
+        for row, explanation in zip(explain_rows, _explain_models(models, model_inputs, explain_rows, batch_predictions)):
+            results[parsed[row][0]]["explanation"] = explanation
+        timer.lap("batch_explain")
+
+    if SCORE_CACHE.enabled:
+        _batch_cache_store(applicants, results, parsed, miss_keys, repeats, threshold)
+    return results
+
+def run_multi_model_prediction_batch(applicants_json_data, threshold=OPTIMAL_THRESHOLD, chunk_size=BATCH_CHUNK_SIZE, explain=False):
+    started_at = time.perf_counter()
+    applicants_json_data = list(applicants_json_data)
+    if isinstance(explain, bool):
+        explain = [explain] * len(applicants_json_data)
+    logger.debug("🔮 PROCESSING BATCH PREDICTION FOR %d APPLICANTS (chunk size %d)", len(applicants_json_data), chunk_size)
+
+    models = MODEL_REGISTRY.active
+    results = []
+    for start in range(0, len(applicants_json_data), chunk_size):
+        results.extend(_run_batch_chunk(
+            applicants_json_data[start:start + chunk_size], threshold, explain[start:start + chunk_size], models
+        ))
+
+    failed = sum(1 for r in results if not r.get("success"))
+    increment("credx_predictions_total", (("path", "batch"),), len(results) - failed)
+    increment("credx_prediction_failures_total", (("path", "batch"),), failed)
+    approved = sum(1 for r in results if r.get("success") and r["final_decision"]["approved"])
+    logger.info("batch_prediction", extra={"fields": {
+        "event": "batch_prediction",
+        "duration_ms": round((time.perf_counter() - started_at) * 1000, 3),
+        "count": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "approved": approved,
+        "threshold": threshold,
+        "chunk_size": chunk_size,
+    }})
+    return results
+
+APPLICANT_CODE_MAPS = (
+    ('gender_code', GENDER_MAP),
+    ('caste_code', CASTE_GROUP_MAP),
+    ('region_code', REGION_MAP),
+    ('employment_code', EMPLOYMENT_TYPE_MAP),
+)
+BOOLEAN_INPUT_KEYS = ('consent_given', 'document_verified')
+
+def _validate_applicant_columns(columns, n_rows, models):
+    error = np.full(n_rows, None, dtype=object)
+
+    for key in FEATURE_PLAN["input_keys"]:
+        missing = np.isnan(np.asarray(columns[key], dtype=float))
+        error[missing & (error == None)] = f"missing value for '{key}'"
+
+    for key, code_map in APPLICANT_CODE_MAPS:
+        codes = np.asarray(columns[key], dtype=float)
+        known = np.isin(codes, list(code_map))
+        error[~known & (error == None)] = f"unknown {key}"
+
+    for key, lookup in (('region_code', models.region_code_to_encoded), ('employment_code', models.employment_code_to_encoded)):
+        codes = np.nan_to_num(np.asarray(columns[key], dtype=float), nan=-1).astype(np.int64)
+        in_range = (codes >= 0) & (codes < len(lookup))
+        seen = in_range & (lookup[np.where(in_range, codes, 0)] >= 0)
+        error[~seen & (error == None)] = f"{key} is unseen by the label encoder"
+
+    return error
+
+def _applicant_input_matrix(columns, rows):
+    raw_inputs = np.column_stack([np.asarray(columns[key], dtype=float)[rows] for key in FEATURE_PLAN["input_keys"]])
+    for key in BOOLEAN_INPUT_KEYS:
+        position = FEATURE_PLAN["input_keys"].index(key)
+        raw_inputs[:, position] = np.trunc(raw_inputs[:, position]) != 0
+    return raw_inputs
+
+def score_applicant_columns(columns, threshold=OPTIMAL_THRESHOLD, models=None):
+    models = MODEL_REGISTRY.active if models is None else models
+    n_rows = len(columns['applicant_id'])
+    error = _validate_applicant_columns(columns, n_rows, models)
+    valid = np.flatnonzero(error == None)
+
+    output = {
+        "applicant_id": np.asarray(columns['applicant_id'], dtype=object),
+        "approved": np.zeros(n_rows, dtype=bool),
+        "credit_score": np.zeros(n_rows, dtype=np.int64),
+        "risk_category": np.full(n_rows, "Error", dtype=object),
+        "default_risk": np.ones(n_rows),
+        "approval_probability": np.zeros(n_rows),
+    }
+    for prefix in MODEL_COLUMN_PREFIXES.values():
+        output[f"{prefix}_score"] = np.zeros(n_rows, dtype=np.int64)
+        output[f"{prefix}_default_risk"] = np.full(n_rows, np.nan)
+        output[f"{prefix}_approved"] = np.zeros(n_rows, dtype=bool)
+    output["approved_count"] = np.zeros(n_rows, dtype=np.int64)
+    output["total_count"] = np.zeros(n_rows, dtype=np.int64)
+    output["unanimous"] = np.zeros(n_rows, dtype=bool)
+    output["error"] = error
+
+    if len(valid) == 0:
+        return output
+
+    raw_inputs = _applicant_input_matrix(columns, valid)
+    X_raw = _fill_feature_matrix(raw_inputs, _new_feature_matrix(len(valid)))
+    model_inputs = np.zeros((len(valid), len(final_35_features_order)), dtype=np.float32)
+    _apply_ivl(X_raw, _scale_features(X_raw[:, :27], models, out=model_inputs[:, :27]), "batch", models)
+    X_final_input_35, X_final_input_30 = _build_model_inputs(
+        X_raw,
+        np.asarray(columns['region_code'], dtype=float)[valid].astype(np.int64),
+        np.asarray(columns['employment_code'], dtype=float)[valid].astype(np.int64),
+        models, out=model_inputs, prescaled=True
+    )
+
+    approved_count = np.zeros(len(valid), dtype=np.int64)
+    total_count = 0
+    primary_ok = False
+    for model, model_name, expected_features, width in models.scoring_models():
+        if not model:
+            continue
+        feature_matrix = X_final_input_35 if width == 35 else X_final_input_30
+        try:
+            if feature_matrix.shape[1] != expected_features:
+                raise ValueError(f"Final feature shape {feature_matrix.shape[1]} does not match loaded model expectation {expected_features} for model '{model_name}'.")
+            pred_proba = model.predict_proba(feature_matrix)
+        except Exception as e:
+            increment("credx_model_errors_total", (("model", model_name),), len(valid))
+            logger.error(f"❌ Error running {model_name} on columns: {e}")
+            continue
+
+        default_probability = pred_proba[:, 1].astype(np.float64)
+        approval_probability = pred_proba[:, 0].astype(np.float64)
+        credit_score = (300 + (approval_probability * 550)).astype(np.int64)
+        is_approved = default_probability < threshold
+
+        prefix = MODEL_COLUMN_PREFIXES[model_name]
+        output[f"{prefix}_score"][valid] = credit_score
+        output[f"{prefix}_default_risk"][valid] = default_probability
+        output[f"{prefix}_approved"][valid] = is_approved
+        approved_count += is_approved
+        total_count += 1
+
+        if model is models.engine_region_aware:
+            primary_ok = True
+            output["approved"][valid] = is_approved
+            output["credit_score"][valid] = credit_score
+            output["risk_category"][valid] = np.select(
+                [credit_score >= min_score for min_score, _, _ in RISK_BANDS],
+                [risk_category for _, risk_category, _ in RISK_BANDS],
+                LOWEST_RISK_BAND[0]
+            )
+            output["default_risk"][valid] = default_probability
+            output["approval_probability"][valid] = approval_probability
+
+    if not primary_ok:
+        output["error"][valid] = "Primary model failed to run"
+    output["approved_count"][valid] = approved_count
+    output["total_count"][valid] = total_count
+    output["unanimous"][valid] = (total_count > 0) & ((approved_count == 0) | (approved_count == total_count))
+    return output
+
+def _expand_what_if(applicant_json_data, grid, scenarios):
+    input_keys = FEATURE_PLAN["input_keys"]
+    varied = sorted(set(grid).union(*[overrides.keys() for overrides in scenarios]))
+    unknown = [key for key in varied if key not in input_keys]
+    if unknown:
+        raise ValueError(f"cannot vary {unknown}; what-if inputs are {input_keys}")
+    empty = [key for key, values in grid.items() if len(values) == 0]
+    if empty:
+        raise ValueError(f"grid has no values for {empty}")
+
+    n_grid = int(np.prod([len(values) for values in grid.values()])) if grid else 0
+    n_scenarios = len(scenarios) + n_grid
+    if n_scenarios == 0:
+        raise ValueError("no scenarios: pass a grid and/or a list of scenarios")
+    if n_scenarios > WHAT_IF_MAX_SCENARIOS:
+        raise ValueError(f"{n_scenarios} scenarios requested; the limit is {WHAT_IF_MAX_SCENARIOS}")
+
+    # Row 0 is the applicant as submitted, then the explicit scenarios, then the grid in row-major order
+    n_rows = n_scenarios + 1
+    columns = {key: np.repeat(np.asarray([value]), n_rows) for key, value in applicant_json_data.items()}
+    for key in varied:
+        columns[key] = columns[key].astype(float)
+    for row, overrides in enumerate(scenarios, start=1):
+        for key, value in overrides.items():
+            columns[key][row] = value
+    if grid:
+        mesh = np.meshgrid(*[np.asarray(values, dtype=float) for values in grid.values()], indexing="ij")
+        for key, values in zip(grid, mesh):
+            columns[key][1 + len(scenarios):] = values.ravel()
+    return columns, varied
+
+def _what_if_values(values):
+    # Whole-number columns are echoed as ints, matching the integer ApplicantData fields
+    if np.array_equal(values, np.trunc(values)):
+        return values.astype(np.int64).tolist()
+    return values.tolist()
+
+def _what_if_outcomes(scored, scored_models):
+    columns = [scored[key].tolist() for key in ("approved", "credit_score", "risk_category", "default_risk", "approval_probability")]
+    model_columns = [
+        (model_name, scored[f"{prefix}_score"].tolist(), scored[f"{prefix}_default_risk"].tolist(), scored[f"{prefix}_approved"].tolist())
+        for model_name, prefix in scored_models
+    ]
+    outcomes = []
+    for row, (approved, credit_score, risk_category, default_risk, approval_probability) in enumerate(zip(*columns)):
+        outcomes.append({
+            "approved": approved,
+            "credit_score": credit_score,
+            "risk_category": risk_category,
+            "default_risk": default_risk,
+            "approval_probability": approval_probability,
+            "models": {
+                model_name: {"score": scores[row], "default_risk": risks[row], "approved": approvals[row]}
+                for model_name, scores, risks, approvals in model_columns
+            },
+        })
+    return outcomes
+
+def simulate_what_if(applicant_json_data, grid=None, scenarios=None, threshold=OPTIMAL_THRESHOLD):
+    started_at = time.perf_counter()
+    timer = stage_timer()
+    grid = dict(grid or {})
+    scenarios = [dict(overrides) for overrides in scenarios or []]
+
+    models = MODEL_REGISTRY.active
+    columns, varied = _expand_what_if(applicant_json_data, grid, scenarios)
+    n_rows = len(columns["applicant_id"])
+    timer.lap("whatif_expand")
+
+    # One vectorized pass through the scaler, the IVL and both boosters; hypothetical decisions are not recorded
+    scored = score_applicant_columns(columns, threshold, models)
+    timer.lap("whatif_model")
+    if scored["error"][0] is not None:
+        raise ValueError(f"applicant could not be scored: {scored['error'][0]}")
+
+    raw_inputs = _applicant_input_matrix(columns, slice(None))
+    changed = raw_inputs != raw_inputs[0]
+    n_changed = changed.sum(axis=1)
+    # Size of a change in standardized model-input space, used to rank decision flips
+    X_scaled = _scale_features(_fill_feature_matrix(raw_inputs, _new_feature_matrix(n_rows))[:, :27], models)
+    distance = np.abs(X_scaled - X_scaled[0]).sum(axis=1)
+
+    scored_models = [(name, prefix) for name, prefix in MODEL_COLUMN_PREFIXES.items()
+                     if not np.isnan(scored[f"{prefix}_default_risk"][0])]
+    outcomes = _what_if_outcomes(scored, scored_models)
+    base = outcomes[0]
+    varied_values = [_what_if_values(columns[key]) for key in varied]
+    varied_changed = changed[:, [FEATURE_PLAN["input_keys"].index(key) for key in varied]].tolist()
+    errors = scored["error"].tolist()
+
+    scenario_results = []
+    for row in range(1, n_rows):
+        changes = {key: values[row] for key, values, is_changed in zip(varied, varied_values, varied_changed[row]) if is_changed}
+        if errors[row] is not None:
+            scenario_results.append({"changes": changes, "error": errors[row]})
+            continue
+        outcome = outcomes[row]
+        outcome["changes"] = changes
+        outcome["score_delta"] = outcome["credit_score"] - base["credit_score"]
+        outcome["default_risk_delta"] = outcome["default_risk"] - base["default_risk"]
+        outcome["flips_decision"] = outcome["approved"] != base["approved"]
+        scenario_results.append(outcome)
+
+    flips = np.flatnonzero((scored["error"] == None) & (scored["approved"] != scored["approved"][0]))
+    smallest_flip = None
+    if len(flips):
+        # Fewest inputs changed first, then the smallest standardized distance
+        row = flips[np.lexsort((distance[flips], n_changed[flips]))[0]]
+        smallest_flip = dict(scenario_results[row - 1], scenario=int(row - 1), distance=float(distance[row]))
+    timer.lap("whatif_response")
+    timer.finish("whatif_total")
+
+    increment("credx_whatif_scenarios_total", (), n_rows - 1)
+    logger.info("what_if", extra={"fields": {
+        "event": "what_if",
+        "duration_ms": round((time.perf_counter() - started_at) * 1000, 3),
+        "scenarios": n_rows - 1,
+        "varied": varied,
+        "flips": len(flips),
+        "threshold": threshold,
+    }})
+    return {
+        "success": True,
+        "applicant_id": applicant_json_data.get("applicant_id"),
+        "threshold": threshold,
+        "model_version": models.version,
+        "varied": varied,
+        "count": n_rows - 1,
+        "base": base,
+        "scenarios": scenario_results,
+        "smallest_flip": smallest_flip,
+    }
+
+def _applicant_columns(applicants):
+    return {key: [applicant.get(key) for applicant in applicants] for key in applicants[0]}
+
+def _score_shadow(models, applicants, thresholds):
+    scored = score_applicant_columns(_applicant_columns(applicants), OPTIMAL_THRESHOLD, models)
+    default_risk = np.where(scored["error"] == None, scored["default_risk"], np.nan).astype(float)
+    # Decide against the threshold each request was served with, so custom-threshold traffic is compared like for like
+    return default_risk, default_risk < thresholds
+
+WARMUP_APPLICANTS = [
+    dict(TEST_APPLICANT_JSON_GOOD, region_code=region_code, employment_code=employment_code)
+    for region_code in REGION_MAP for employment_code in EMPLOYMENT_TYPE_MAP
+]
+
+def prepare_model_set(model_dir):
+    models = load_model_set(model_dir)
+    if models.feature_layout() != BOOT_MODELS.feature_layout():
+        raise ValueError(f"{model_dir} changes the model feature layout; that needs a restart")
+    if models.engine_fair_xgb is None and BOOT_MODELS.engine_fair_xgb is not None:
+        raise ValueError(f"{model_dir} has no usable Fair XGBoost model")
+    if models.engine_delphi is None and BOOT_MODELS.engine_delphi is not None:
+        raise ValueError(f"{model_dir} has no usable Delphi ensemble")
+
+    # Warm both the small-batch and the bulk path, and check the scores before taking traffic
+    for applicants in (WARMUP_APPLICANTS[:1], WARMUP_APPLICANTS):
+        scored = score_applicant_columns(_applicant_columns(applicants), OPTIMAL_THRESHOLD, models)
+        errors = [e for e in scored["error"] if e is not None]
+        if errors:
+            raise ValueError(f"{model_dir} failed its warm-up scoring: {errors[0]}")
+        for model, model_name, _, _ in models.scoring_models():
+            if not model:
+                continue
+            risk = scored[f"{MODEL_COLUMN_PREFIXES[model_name]}_default_risk"]
+            if not np.all((risk >= 0) & (risk <= 1)):
+                raise ValueError(f"{model_dir} produced default risks outside [0, 1] for {model_name}")
+    return models
+
+MODEL_REGISTRY = ModelRegistry(BOOT_MODELS, prepare_model_set, _score_shadow)
+logger.info(f"✅ Model registry ready (serving '{MODEL_REGISTRY.active.name}' {MODEL_REGISTRY.active.version}; versions under {MODEL_REGISTRY.root})")
+
+class NumpyJSONEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, np.bool_):
+            return bool(obj)
+        if isinstance(obj, np.integer):
+            return int(obj)
+        if isinstance(obj, np.floating):
+            return float(obj)
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        return super(NumpyJSONEncoder, self).default(obj)
+
+logger.info("✅ Custom JSON Encoder defined")
+
+if __name__ == "__main__":
+
+    display_section("🚀 RUNNING PREDICTION ON 'GOOD' TEST APPLICANT")
+
+    try:
+        good_result = run_multi_model_prediction(TEST_APPLICANT_JSON_GOOD)
+        
+        print("\n--- Final JSON Output (Good Applicant) ---")
+        print(json.dumps(good_result, indent=2, cls=NumpyJSONEncoder))
+
+    except Exception as e:
+        print(f"❌ Execution failed for 'Good' applicant: {e}")
+        print(traceback.format_exc())
+
+    display_section("🚀 RUNNING PREDICTION ON 'BAD' TEST APPLICANT")
+
+    try:
+        bad_result = run_multi_model_prediction(TEST_APPLICANT_JSON_BAD)
+
+        print("\n--- Final JSON Output (Bad Applicant) ---")
+        print(json.dumps(bad_result, indent=2, cls=NumpyJSONEncoder))
+
+    except Exception as e:
+        print(f"❌ Execution failed for 'Bad' applicant: {e}")
+        print(traceback.format_exc())
+
+    display_section("✅ SYSTEM READY")
+    print(f"🎉 System Initialized and Ready for JSON!")
+    print(f"   ✅ Primary model loaded: {'Region-Aware XGBoost' if MODEL_REGISTRY.active.model_region_aware else 'N/A'}")
+    print(f"   ✅ Comparison model loaded: {'Fair XGBoost' if MODEL_REGISTRY.active.model_fair_xgb else 'N/A'}")
+    print(f"   ✅ Function run_multi_model_prediction(json_data) is ready.")
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+
+from log_config import get_logger
+from tree_ensemble import CompiledTreeEnsemble
+
+logger = get_logger("artifacts")
+
+COMPILED_DIR_NAME = "compiled"
+MANIFEST_NAME = "manifest.json"
+PREPROCESSING_NAME = "preprocessing.npz"
+TREE_STORE_DIR_NAME = "trees"
+
+SOURCE_ARTIFACTS = [
+    "feature_scaler.pkl", "label_encoders.pkl", "xgb_region_aware.pkl", "fair_xgb.pkl", "income_verification_model.pkl",
+    "delphi_ensemble.pkl",
+]
+BOOSTER_ARTIFACTS = {"xgb_region_aware.pkl": "xgb_region_aware.ubj", "fair_xgb.pkl": "fair_xgb.ubj"}
+FOREST_ARTIFACTS = ["income_verification_model.pkl"]
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scaler_params_from_sklearn(scaler):
+    n_features = int(getattr(scaler, "n_features_in_", 0))
+    return {
+        "n_features_in": n_features,
+        "mean": np.asarray(scaler.mean_, dtype=np.float64) if scaler.with_mean else np.zeros(n_features),
+        "scale": np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_std else np.ones(n_features),
+    }
+
+
+def encoder_classes_from_sklearn(label_encoders):
+    return {name: [str(c) for c in encoder.classes_] for name, encoder in label_encoders.items()}
+
+
+def booster_iteration_range(booster):
+    try:
+        return (0, booster.best_iteration + 1)
+    except AttributeError:
+        return (0, 0)
+
+
+def tree_store_path(model_dir, source_name):
+    return Path(model_dir) / COMPILED_DIR_NAME / TREE_STORE_DIR_NAME / Path(source_name).stem
+
+
+def compile_artifacts(model_dir):
+    import joblib
+
+    model_dir = Path(model_dir)
+    compiled_dir = model_dir / COMPILED_DIR_NAME
+    compiled_dir.mkdir(exist_ok=True)
+
+    scaler = joblib.load(model_dir / "feature_scaler.pkl")
+    label_encoders = joblib.load(model_dir / "label_encoders.pkl")
+    scaler_params = scaler_params_from_sklearn(scaler)
+    encoder_classes = encoder_classes_from_sklearn(label_encoders)
+
+    arrays = {
+        "scaler_mean": scaler_params["mean"],
+        "scaler_scale": scaler_params["scale"],
+        "scaler_n_features_in": np.array(scaler_params["n_features_in"]),
+    }
+    for name, classes in encoder_classes.items():
+        arrays[f"classes__{name}"] = np.array(classes, dtype=str)
+    np.savez(compiled_dir / PREPROCESSING_NAME, **arrays)
+
+    for source_name, target_name in BOOSTER_ARTIFACTS.items():
+        source_path = model_dir / source_name
+        if source_path.exists():
+            model = joblib.load(source_path)
+            model.save_model(compiled_dir / target_name)
+            booster = model.get_booster()
+            try:
+                forest = CompiledTreeEnsemble.from_xgboost(booster, booster_iteration_range(booster))
+                forest.save(tree_store_path(model_dir, source_name))
+            except ValueError as e:
+                logger.warning(f"⚠️ Skipping tree store for {source_name}: {e}")
+
+    for source_name in FOREST_ARTIFACTS:
+        source_path = model_dir / source_name
+        if source_path.exists():
+            forest = joblib.load(source_path)
+            try:
+                CompiledTreeEnsemble.from_sklearn(forest.estimators_).save(tree_store_path(model_dir, source_name))
+            except (AttributeError, ValueError) as e:
+                logger.warning(f"⚠️ Skipping tree store for {source_name}: {e}")
+
+    manifest = {
+        "sources": {
+            name: file_sha256(model_dir / name)
+            for name in SOURCE_ARTIFACTS if (model_dir / name).exists()
+        },
+        "xgboost_version": xgb.__version__,
+    }
+    with open(compiled_dir / MANIFEST_NAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_compiled_artifacts(model_dir):
+    model_dir = Path(model_dir)
+    compiled_dir = model_dir / COMPILED_DIR_NAME
+    manifest_path = compiled_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    for name, digest in manifest["sources"].items():
+        source_path = model_dir / name
+        if source_path.exists() and file_sha256(source_path) != digest:
+            logger.warning(f"⚠️ Compiled artifacts are stale ({name} changed). Run `python artifact_cache.py` to rebuild.")
+            return None
+
+    with np.load(compiled_dir / PREPROCESSING_NAME) as arrays:
+        scaler_params = {
+            "n_features_in": int(arrays["scaler_n_features_in"]),
+            "mean": arrays["scaler_mean"],
+            "scale": arrays["scaler_scale"],
+        }
+        encoder_classes = {
+            key[len("classes__"):]: arrays[key].tolist()
+            for key in arrays.files if key.startswith("classes__")
+        }
+
+    models = {}
+    tree_stores = {}
+    for source_name, target_name in BOOSTER_ARTIFACTS.items():
+        target_path = compiled_dir / target_name
+        if target_path.exists():
+            model = xgb.XGBClassifier()
+            model.load_model(str(target_path))
+            models[source_name] = model
+    for source_name in list(BOOSTER_ARTIFACTS) + FOREST_ARTIFACTS:
+        store_path = tree_store_path(model_dir, source_name)
+        if (store_path / "meta.json").exists():
+            tree_stores[source_name] = store_path
+
+    return {
+        "manifest": manifest,
+        "scaler": scaler_params,
+        "encoder_classes": encoder_classes,
+        "models": models,
+        "tree_stores": tree_stores,
+    }
+
+
+if __name__ == "__main__":
+    model_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("./models")
+    manifest = compile_artifacts(model_dir)
+    print(f"✅ Compiled artifacts written to {model_dir / COMPILED_DIR_NAME}")
+    for name, digest in manifest["sources"].items():
+        print(f"   {name}: {digest[:12]}")
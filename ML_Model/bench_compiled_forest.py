@@ -0,0 +1,110 @@
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import FairModel
+
+PARITY_TOLERANCE = 2.5e-7
+
+
+def synthetic_feature_block(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n_rows, len(FairModel.final_35_features_order)), dtype=np.float32)
+    X[:, :27] = rng.normal(scale=1.5, size=(n_rows, 27))
+    X[:, 27] = rng.lognormal(mean=13, sigma=0.8, size=n_rows)
+    region_encoded = rng.integers(0, 5, size=n_rows)
+    X[:, 28] = region_encoded
+    X[:, 29] = rng.integers(0, 5, size=n_rows)
+    X[np.arange(n_rows), 30 + region_encoded] = 1
+    return X
+
+
+def time_per_call(fn, X, repeats):
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity and throughput check for the compiled tree backend.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--single-repeats", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024, 16384])
+    args = parser.parse_args()
+
+    X = synthetic_feature_block(args.rows)
+    failed = False
+
+    for model, model_name, width in (
+        (FairModel.MODEL_REGISTRY.active.model_region_aware, "Region-Aware XGBoost", 35),
+        (FairModel.MODEL_REGISTRY.active.model_fair_xgb, "Fair XGBoost", 30),
+    ):
+        if model is None:
+            continue
+        print(f"\n=== {model_name} ===")
+        booster_engine = FairModel.BoosterInferenceEngine(model)
+        compiled_engine = FairModel.CompiledForestEngine(model)
+        features = X[:, :width]
+
+        compiled_engine.max_compiled_rows = len(features)
+        reference = model.predict_proba(features)
+        compiled = compiled_engine.predict_proba(features)
+        max_diff = float(np.abs(reference - compiled).max())
+        exact = float((reference == compiled).all(axis=1).mean())
+        decisions = float(((reference[:, 1] < FairModel.OPTIMAL_THRESHOLD) == (compiled[:, 1] < FairModel.OPTIMAL_THRESHOLD)).mean())
+        print(f"Parity vs predict_proba: max |diff| {max_diff:.3e}, bit-exact rows {exact:.4%}, decision agreement {decisions:.4%}")
+        if max_diff > PARITY_TOLERANCE:
+            print(f"❌ Parity check failed (tolerance {PARITY_TOLERANCE:.1e})")
+            failed = True
+
+        hybrid_engine = FairModel.CompiledForestEngine(model)
+        print(f"{'batch':>8} {'predict_proba':>16} {'booster':>16} {'compiled':>16} {'hybrid':>16}   (rows/s)")
+        for batch_size in args.batch_sizes:
+            batch = np.ascontiguousarray(features[:batch_size])
+            repeats = max(1, args.single_repeats // batch_size)
+            rates = [
+                batch_size / time_per_call(fn, batch, repeats)
+                for fn in (model.predict_proba, booster_engine.predict_proba,
+                           compiled_engine.predict_proba, hybrid_engine.predict_proba)
+            ]
+            print(f"{batch_size:>8} " + " ".join(f"{rate:>16,.0f}" for rate in rates))
+
+    income_model = FairModel.get_income_model()
+    if income_model is not None:
+        print("\n=== Income Verification Forest ===")
+        compiled_engine = FairModel.IncomeVerificationEngine.from_model(income_model)
+        if compiled_engine.forest is None:
+            print("⚠️ Income model could not be flattened; nothing to compare.")
+        else:
+            compiled_engine.max_compiled_rows = args.rows
+            ivl_features = X[:, FairModel.FEATURE_PLAN["ivl_indices"]]
+            reference = income_model.predict(ivl_features)
+            compiled = compiled_engine.predict(ivl_features)
+            exact = float((reference == compiled).mean())
+            print(f"Parity vs RandomForest.predict: max |diff| {float(np.abs(reference - compiled).max()):.3e}, bit-exact rows {exact:.4%}")
+            if exact < 1.0:
+                print("❌ Parity check failed (income predictions must be bit-exact)")
+                failed = True
+
+            print(f"{'batch':>8} {'predict':>16} {'compiled':>16}   (rows/s)")
+            for batch_size in args.batch_sizes:
+                batch = np.ascontiguousarray(ivl_features[:batch_size])
+                repeats = max(1, args.single_repeats // batch_size)
+                rates = [
+                    batch_size / time_per_call(fn, batch, repeats)
+                    for fn in (income_model.predict, compiled_engine.predict)
+                ]
+                print(f"{batch_size:>8} " + " ".join(f"{rate:>16,.0f}" for rate in rates))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
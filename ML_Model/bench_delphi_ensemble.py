@@ -0,0 +1,148 @@
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import FairModel
+
+import inference_pool
+from bench_compiled_forest import synthetic_feature_block, time_per_call
+from delphi_ensemble import ENSEMBLE_ARTIFACT, VIEW_DEBIASED, DelphiEnsembleEngine, export_ensemble
+
+warnings.filterwarnings("ignore")
+
+# XGBoost members predict in float32, and the notebook accumulates their term in float32 too
+PARITY_TOLERANCE = 2.5e-7
+
+
+# Reference implementation copied from DelphiConsensusEnsemble.predict_proba in Final_Gem_Model.ipynb,
+# except that a failing member raises instead of being skipped, so parity is never checked against a degraded baseline
+def notebook_predict_proba(models, weights, X_data_dict):
+    first_key = list(models.keys())[0]
+    first_data = X_data_dict[first_key]
+    ensemble_pred = np.zeros(len(first_data))
+    total_weight = 0.0
+    for name, model in models.items():
+        if name in weights:
+            X_data = X_data_dict[name]
+            if hasattr(model, 'predict_proba'):
+                pred = model.predict_proba(X_data)[:, 1]
+            else:
+                pred = model.predict(X_data).flatten()
+            ensemble_pred += pred * weights[name]
+            total_weight += weights[name]
+    if total_weight == 0:
+        return np.zeros(len(first_data))
+    return ensemble_pred / total_weight
+
+
+def train_synthetic_ensemble(path, n_rows, seed=0):
+    import xgboost as xgb
+    from sklearn.decomposition import PCA
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    # Same member line-up and hyperparameters as STEP 9-11 of the notebook, fitted on synthetic Fair XGBoost inputs
+    rng = np.random.default_rng(seed)
+    X = synthetic_feature_block(n_rows, seed)[:, :30].astype(np.float64)
+    X[:, 27] = np.log(X[:, 27])
+    logits = X[:, :27] @ rng.normal(scale=0.4, size=27) + 0.3 * X[:, 28] - 0.5 * (X[:, 3] > 1)
+    y = (logits + rng.logistic(size=n_rows) > 1).astype(int)
+    pca = PCA(n_components=16, random_state=42).fit(X)
+
+    members = {
+        'Logistic_Regression': LogisticRegression(max_iter=1000, class_weight='balanced', random_state=42, solver='liblinear').fit(X, y),
+        'Random_Forest': RandomForestClassifier(n_estimators=100, max_depth=10, class_weight='balanced', random_state=42, n_jobs=-1).fit(X, y),
+        'XGBoost': xgb.XGBClassifier(n_estimators=100, max_depth=4, learning_rate=0.1, subsample=0.8, colsample_bytree=0.8,
+                                     random_state=42, n_jobs=-1, tree_method='hist', eval_metric='logloss').fit(X, y),
+        'HistGradientBoosting': HistGradientBoostingClassifier(max_iter=100, max_depth=5, learning_rate=0.1, random_state=42).fit(X, y),
+        'RF_on_Debiased': RandomForestClassifier(n_estimators=100, max_depth=8, min_samples_split=10, class_weight='balanced',
+                                                 random_state=42, n_jobs=-1).fit(pca.transform(X), y),
+    }
+    try:
+        from fairlearn.reductions import DemographicParity, ExponentiatedGradient
+        fairlearn_dp = ExponentiatedGradient(
+            estimator=LogisticRegression(max_iter=500, random_state=42, class_weight='balanced', solver='liblinear'),
+            constraints=DemographicParity(), max_iter=30, eps=0.1,
+        )
+        members['Fairlearn_DP'] = fairlearn_dp.fit(X, y, sensitive_features=rng.integers(0, 2, n_rows))
+    except ImportError:
+        print("ℹ️ Fairlearn not installed, synthetic ensemble built without it (optional)")
+
+    weights = rng.uniform(0.5, 1.5, len(members))
+    ensemble = SimpleNamespace(
+        models=members, weights=dict(zip(members, weights / weights.sum())),
+        fairness_weight=0.5, performance_weight=0.3, diversity_weight=0.2,
+    )
+    return export_ensemble(path, ensemble, FairModel.fair_30_features_order, {'RF_on_Debiased': VIEW_DEBIASED}, pca), pca
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity and latency check for the fused Delphi ensemble engine.")
+    parser.add_argument("--artifact", type=Path, default=Path("./models") / ENSEMBLE_ARTIFACT,
+                        help="Exported ensemble; a synthetic one is trained when it does not exist")
+    parser.add_argument("--train-rows", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024, 16384])
+    args = parser.parse_args()
+
+    pca = None
+    if args.artifact.exists():
+        artifact = joblib.load(args.artifact)
+        print(f"Loaded {args.artifact}")
+    else:
+        print(f"{args.artifact} not found; training a synthetic ensemble on {args.train_rows:,} rows")
+        with tempfile.TemporaryDirectory() as tmp:
+            artifact, pca = train_synthetic_ensemble(Path(tmp) / ENSEMBLE_ARTIFACT, args.train_rows)
+    engine = DelphiEnsembleEngine(artifact)
+    print(f"Members: {engine.describe()['members']}")
+    print(f"Fused into one matrix product: {engine.describe()['fused_linear']}; inference threads: {inference_pool.inference_threads()}")
+
+    X = synthetic_feature_block(args.rows, seed=1)[:, :30]
+    X[:, 27] = np.log(X[:, 27])
+
+    def reference(batch):
+        batch = batch.astype(np.float64)
+        views = {}
+        for name, view in artifact["views"].items():
+            if view == VIEW_DEBIASED:
+                components = artifact["pca"]["components"]
+                views[name] = pca.transform(batch) if pca is not None else (batch - artifact["pca"]["mean"]) @ components.T
+            else:
+                views[name] = batch
+        return notebook_predict_proba(artifact["members"], artifact["weights"], views)
+
+    failed = False
+    engine.max_compiled_rows = len(X)
+    expected = reference(X)
+    fused = engine.predict_default_proba(X)
+    max_diff = float(np.abs(expected - fused).max())
+    decisions = float(((expected < FairModel.OPTIMAL_THRESHOLD) == (fused < FairModel.OPTIMAL_THRESHOLD)).mean())
+    print(f"Parity vs the notebook's predict_proba: max |diff| {max_diff:.3e}, decision agreement {decisions:.4%}")
+    if max_diff > PARITY_TOLERANCE:
+        print(f"❌ Parity check failed (tolerance {PARITY_TOLERANCE:.1e})")
+        failed = True
+
+    hybrid = DelphiEnsembleEngine(artifact)
+    print(f"{'batch':>8} {'notebook':>14} {'fused':>14} {'speedup':>8}   (ms per call)")
+    for batch_size in args.batch_sizes:
+        batch = np.ascontiguousarray(X[:batch_size])
+        repeats = max(1, args.repeats // batch_size)
+        notebook_ms = time_per_call(reference, batch, repeats) * 1000
+        fused_ms = time_per_call(hybrid.predict_default_proba, batch, repeats) * 1000
+        print(f"{batch_size:>8} {notebook_ms:>14.3f} {fused_ms:>14.3f} {notebook_ms / fused_ms:>7.1f}x")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import recall_score, roc_auc_score
+
+import fairness_metrics
+
+ATTRIBUTE_GROUPS = {"gender": 2, "caste": 5, "region": 5, "employment": 5}
+
+
+# Reference implementations copied from Final_Gem_Model.ipynb
+def notebook_demographic_parity(y_pred, protected_attr):
+    groups = np.unique(protected_attr)
+    approval_rates = []
+    for group in groups:
+        mask = protected_attr == group
+        if mask.sum() > 0:
+            approval_rates.append(1 - y_pred[mask].mean())
+    return max(approval_rates) - min(approval_rates) if approval_rates else 0
+
+
+def notebook_equal_opportunity(y_pred, y_true, protected_attr):
+    groups = np.unique(protected_attr)
+    tpr_rates = []
+    for group in groups:
+        mask = (protected_attr == group) & (y_true == 1)
+        if mask.sum() > 0:
+            tpr_rates.append(y_pred[mask].mean())
+    return max(tpr_rates) - min(tpr_rates) if len(tpr_rates) > 1 else 0
+
+
+def notebook_disparate_impact(y_pred, protected_attr):
+    groups = np.unique(protected_attr)
+    approval_rates = []
+    for group in groups:
+        mask = protected_attr == group
+        if mask.sum() > 0:
+            approval_rates.append(1 - y_pred[mask].mean())
+    if len(approval_rates) >= 2:
+        min_rate = min(approval_rates)
+        max_rate = max(approval_rates)
+        return min_rate / max_rate if max_rate > 0 else 1.0
+    return 1.0
+
+
+def notebook_fairness_detailed(y_true, y_pred, y_prob, protected):
+    priv_mask = (protected == 1)
+    unpriv_mask = (protected == 0)
+    priv_rate = y_pred[priv_mask].mean()
+    unpriv_rate = y_pred[unpriv_mask].mean()
+    di = unpriv_rate / priv_rate if priv_rate > 0 else (1.0 if unpriv_rate == 0 else np.inf)
+    positive_mask = (y_true == 1)
+    priv_positive = priv_mask & positive_mask
+    unpriv_positive = unpriv_mask & positive_mask
+    priv_tpr = y_pred[priv_positive].mean() if priv_positive.sum() > 0 else 0
+    unpriv_tpr = y_pred[unpriv_positive].mean() if unpriv_positive.sum() > 0 else 0
+    priv_auc = roc_auc_score(y_true[priv_mask], y_prob[priv_mask]) if priv_mask.sum() > 0 and len(np.unique(y_true[priv_mask])) > 1 else 0.5
+    unpriv_auc = roc_auc_score(y_true[unpriv_mask], y_prob[unpriv_mask]) if unpriv_mask.sum() > 0 and len(np.unique(y_true[unpriv_mask])) > 1 else 0.5
+    return {
+        'Privileged Rate': priv_rate, 'Unprivileged Rate': unpriv_rate, 'Disparate Impact': di,
+        'Statistical Parity Diff': unpriv_rate - priv_rate, 'Equal Opportunity Diff': unpriv_tpr - priv_tpr,
+        'Privileged AUC': priv_auc, 'Unprivileged AUC': unpriv_auc,
+    }
+
+
+def notebook_delphi_fairness_score(y_pred, y_true, protected_attr):
+    pred_df = pd.DataFrame({'pred': y_pred, 'true': y_true, 'protected': protected_attr})
+    approval_rate_0 = pred_df[pred_df['protected'] == 0]['pred'].mean()
+    approval_rate_1 = pred_df[pred_df['protected'] == 1]['pred'].mean()
+    dpd = abs(approval_rate_1 - approval_rate_0)
+    positive_class = pred_df[pred_df['true'] == 1]
+    if len(positive_class) > 0:
+        tpr_0 = positive_class[positive_class['protected'] == 0]['pred'].mean() if (positive_class['protected'] == 0).sum() > 0 else 0
+        tpr_1 = positive_class[positive_class['protected'] == 1]['pred'].mean() if (positive_class['protected'] == 1).sum() > 0 else 0
+        eod = abs(tpr_1 - tpr_0)
+    else:
+        eod = 0
+    return max(0, 1 - (dpd + eod) / 2), dpd, eod
+
+
+def synthetic_evaluation_set(n_rows, n_models, seed=0):
+    rng = np.random.default_rng(seed)
+    protected = {name: rng.integers(0, n, n_rows) for name, n in ATTRIBUTE_GROUPS.items()}
+    y_true = (rng.random(n_rows) < 0.3).astype(np.int64)
+    model_scores = {}
+    for m in range(n_models):
+        noise = rng.normal(0, 0.25 + 0.05 * m, n_rows) + 0.02 * protected["region"]
+        # Rounding creates tied scores, which exercises the AUC tie handling
+        model_scores[f"model_{m}"] = np.clip(0.3 + 0.4 * y_true + noise, 0, 1).round(3)
+    return y_true, model_scores, protected
+
+
+def check_parity(n_rows=20000):
+    y_true, model_scores, protected = synthetic_evaluation_set(n_rows, 3, seed=1)
+    thresholds = [0.3, 0.5, 0.7]
+    groups, summary = fairness_metrics.evaluate_fairness(y_true, model_scores, protected, thresholds)
+    worst = 0.0
+
+    for model_name, scores in model_scores.items():
+        for threshold in thresholds:
+            y_pred = (scores >= threshold).astype(int)
+            for attribute, labels in protected.items():
+                row = summary[(summary.model == model_name) & (summary.attribute == attribute) & (summary.threshold == threshold)].iloc[0]
+                worst = max(worst,
+                            abs(row.demographic_parity_difference - notebook_demographic_parity(y_pred, labels)),
+                            abs(row.equal_opportunity_difference - notebook_equal_opportunity(y_pred, y_true, labels)),
+                            abs(row.disparate_impact - notebook_disparate_impact(y_pred, labels)))
+                for group in np.unique(labels):
+                    mask = labels == group
+                    g = groups[(groups.model == model_name) & (groups.attribute == attribute) &
+                               (groups.threshold == threshold) & (groups.group == group)].iloc[0]
+                    worst = max(worst,
+                                abs(g.approval_rate - (1 - y_pred[mask].mean())),
+                                abs(g.tpr - recall_score(y_true[mask], y_pred[mask])),
+                                abs(g.auc - roc_auc_score(y_true[mask], scores[mask])))
+
+        y_pred = (scores >= 0.5).astype(int)
+        binary = (protected["gender"] == 1).astype(int)
+        reference = notebook_fairness_detailed(y_true, y_pred, scores, binary)
+        vectorized = fairness_metrics.binary_fairness_report(y_true, y_pred, scores, binary)
+        worst = max(worst, max(abs(reference[key] - vectorized[key]) for key in reference))
+        worst = max(worst, max(abs(a - b) for a, b in zip(
+            notebook_delphi_fairness_score(y_pred, y_true, binary), fairness_metrics.delphi_fairness_score(y_pred, y_true, binary)
+        )))
+    return worst
+
+
+def notebook_loop_seconds(y_true, model_scores, protected, thresholds):
+    start = time.perf_counter()
+    for scores in model_scores.values():
+        for threshold in thresholds:
+            y_pred = (scores >= threshold).astype(int)
+            for labels in protected.values():
+                notebook_demographic_parity(y_pred, labels)
+                notebook_equal_opportunity(y_pred, y_true, labels)
+                notebook_disparate_impact(y_pred, labels)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check fairness_metrics against the notebook implementations and time it.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--models", type=int, default=5)
+    parser.add_argument("--thresholds", type=int, default=50)
+    parser.add_argument("--reference-thresholds", type=int, default=3, help="Thresholds timed for the notebook loops")
+    args = parser.parse_args()
+
+    worst = check_parity()
+    print(f"{'✅' if worst < 1e-9 else '❌'} parity with the notebook and sklearn: max abs difference {worst:.2e}")
+
+    y_true, model_scores, protected = synthetic_evaluation_set(args.rows, args.models)
+    thresholds = np.linspace(0.05, 0.95, args.thresholds)
+
+    start = time.perf_counter()
+    groups, summary = fairness_metrics.evaluate_fairness(y_true, model_scores, protected, thresholds)
+    vectorized = time.perf_counter() - start
+    print(f"evaluate_fairness: {args.rows:,} rows x {args.models} models x {args.thresholds} thresholds x "
+          f"{len(protected)} attributes in {vectorized:.2f}s ({len(groups):,} group rows)")
+
+    reference_thresholds = thresholds[:args.reference_thresholds]
+    reference = notebook_loop_seconds(y_true, model_scores, protected, reference_thresholds)
+    per_threshold = reference / len(reference_thresholds)
+    print(f"notebook loops:    {per_threshold:.2f}s per threshold without AUC "
+          f"(~{per_threshold * args.thresholds:.0f}s for {args.thresholds} thresholds)")
+
+
+if __name__ == "__main__":
+    main()
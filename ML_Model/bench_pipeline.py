@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("CREDX_LOG_LEVEL", "WARNING")
+
+import FairModel
+from bench_startup import measure_cold_start
+from response_schema import encode_result
+
+SECTIONS = ["cold_start", "single", "batch", "http"]
+
+# (field, low, high) drawn uniformly; ints are inclusive
+INT_RANGES = [
+    ("age", 21, 65), ("monthly_income", 5000, 300000), ("avg_balance", 0, 500000),
+    ("utility_payment_score", 0, 100), ("rent_payment_score", 0, 100), ("upi_transactions", 0, 300),
+    ("upi_avg_amount", 50, 5000), ("mobile_recharge_freq", 0, 10), ("merchant_diversity", 0, 10),
+    ("credit_lines", 0, 10), ("credit_tenure_months", 0, 240), ("missed_payments", 0, 12),
+    ("avg_days_past_due", 0, 90),
+]
+FLOAT_RANGES = [
+    ("income_stability", 0.0, 1.0), ("savings_ratio", 0.0, 0.6), ("expense_income_ratio", 0.1, 1.2),
+    ("digital_wallet_usage", 0.0, 100.0), ("credit_utilization", 0.0, 1.0),
+]
+CODE_MAPS = [
+    ("gender_code", FairModel.GENDER_MAP), ("caste_code", FairModel.CASTE_GROUP_MAP),
+    ("region_code", FairModel.REGION_MAP), ("employment_code", FairModel.EMPLOYMENT_TYPE_MAP),
+]
+
+
+def synthetic_population(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {"applicant_id": [f"BENCH-{i:07d}" for i in range(n_rows)]}
+    for name, code_map in CODE_MAPS:
+        columns[name] = rng.choice(sorted(code_map), n_rows).tolist()
+    # The pipeline reads these as 0/1 flags, so both the consenting and the non-consenting path get exercised
+    for name in FairModel.BOOLEAN_INPUT_KEYS:
+        columns[name] = rng.integers(0, 2, n_rows).tolist()
+    for name, low, high in INT_RANGES:
+        columns[name] = rng.integers(low, high + 1, n_rows).tolist()
+    for name, low, high in FLOAT_RANGES:
+        columns[name] = rng.uniform(low, high, n_rows).round(4).tolist()
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def _percentiles_ms(seconds):
+    seconds = np.asarray(seconds) * 1000
+    return {
+        "p50_ms": float(np.percentile(seconds, 50)),
+        "p95_ms": float(np.percentile(seconds, 95)),
+        "p99_ms": float(np.percentile(seconds, 99)),
+        "mean_ms": float(seconds.mean()),
+    }
+
+
+def bench_single(population, warmup=50):
+    for applicant in population[:warmup]:
+        FairModel.run_multi_model_prediction(applicant)
+    FairModel.SCORE_CACHE.clear()
+
+    latencies = []
+    for applicant in population:
+        start = time.perf_counter()
+        encode_result(FairModel.run_multi_model_prediction(applicant))
+        latencies.append(time.perf_counter() - start)
+    return _percentiles_ms(latencies)
+
+
+def bench_batch(population, batch_sizes, min_rows):
+    results = {}
+    for batch_size in batch_sizes:
+        batches = [population[i:i + batch_size] for i in range(0, len(population) - batch_size + 1, batch_size)]
+        if not batches:
+            continue
+        FairModel.run_multi_model_prediction_batch(batches[0])
+        rows = 0
+        start = time.perf_counter()
+        while rows < min_rows:
+            for batch in batches:
+                [encode_result(result) for result in FairModel.run_multi_model_prediction_batch(batch)]
+                rows += len(batch)
+                if rows >= min_rows:
+                    break
+        results[str(batch_size)] = {"rows_per_s": rows / (time.perf_counter() - start)}
+    return results
+
+
+async def _http_load(app, population, concurrency, n_requests):
+    import httpx
+
+    latencies = []
+    payloads = iter(population[i % len(population)] for i in range(n_requests))
+
+    async def client_loop(client):
+        for payload in payloads:
+            start = time.perf_counter()
+            response = await client.post("/submit", json=payload)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f"/submit answered {response.status_code}: {response.text[:200]}")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for payload in population[:20]:
+            await client.post("/submit", json=payload)
+        start = time.perf_counter()
+        await asyncio.gather(*[client_loop(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return dict(_percentiles_ms(latencies), requests_per_s=n_requests / elapsed)
+
+
+def bench_http(population, concurrency_levels, n_requests):
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        raise SystemExit("The http section needs httpx (`pip install httpx`); skip it with --sections.")
+    import main
+
+    results = {}
+    for concurrency in concurrency_levels:
+        FairModel.SCORE_CACHE.clear()
+        results[str(concurrency)] = asyncio.run(_http_load(main.app, population, concurrency, n_requests))
+    return results
+
+
+# Metric name suffix → whether a larger value is better
+METRIC_DIRECTIONS = {"_per_s": True, "_ms": False, "_s": False}
+
+
+def flatten_metrics(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def _higher_is_better(name):
+    for suffix, higher in METRIC_DIRECTIONS.items():
+        if name.endswith(suffix):
+            return higher
+    return None
+
+
+def compare(baseline, current, tolerance):
+    baseline_metrics = flatten_metrics(baseline["results"])
+    current_metrics = flatten_metrics(current["results"])
+    regressions = []
+
+    print(f"{'metric':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name in sorted(set(baseline_metrics) & set(current_metrics)):
+        higher = _higher_is_better(name)
+        if higher is None:
+            continue
+        before, after = baseline_metrics[name], current_metrics[name]
+        change = (after - before) / before if before else 0.0
+        regressed = change < -tolerance if higher else change > tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<40} {before:>12.3f} {after:>12.3f} {change:>+8.1%}{'  ❌' if regressed else ''}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} metric(s) regressed by more than {tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"✅ No metric regressed by more than {tolerance:.0%}")
+    return 0
+
+
+def run(args):
+    population = synthetic_population(args.rows, args.seed)
+    results = {}
+
+    if "cold_start" in args.sections:
+        print("⏱️  cold start ...", file=sys.stderr)
+        results["cold_start"] = measure_cold_start(use_cache=True, runs=args.cold_start_runs)
+    if "single" in args.sections:
+        print("⏱️  single-row latency ...", file=sys.stderr)
+        results["single"] = bench_single(population)
+    if "batch" in args.sections:
+        print("⏱️  batch throughput ...", file=sys.stderr)
+        results["batch"] = bench_batch(population, args.batch_sizes, args.rows)
+    if "http" in args.sections:
+        print("⏱️  HTTP load ...", file=sys.stderr)
+        results["http"] = bench_http(population, args.concurrency, args.http_requests)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "backend": FairModel.INFERENCE_BACKEND,
+            "model_version": FairModel.MODEL_REGISTRY.active.version,
+            "rows": args.rows,
+            "seed": args.seed,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scoring pipeline: cold start, single-row latency, batch throughput and HTTP load."
+    )
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=SECTIONS)
+    parser.add_argument("--rows", type=int, default=2000, help="Synthetic applicants per section")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64, 256, 1024])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--http-requests", type=int, default=1000)
+    parser.add_argument("--cold-start-runs", type=int, default=3)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression (default 0.10)")
+    parser.add_argument("--compare-only", metavar="CURRENT", help="Compare this results file with --compare without benchmarking")
+    args = parser.parse_args()
+
+    if args.compare_only:
+        if not args.compare:
+            parser.error("--compare-only needs --compare")
+        with open(args.compare) as f, open(args.compare_only) as g:
+            sys.exit(compare(json.load(f), json.load(g), args.tolerance))
+
+    current = run(args)
+    print(json.dumps(current["results"], indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            sys.exit(compare(json.load(f), current, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import time
+
+import FairModel
+from bench_pipeline import synthetic_population
+from main import APPLICANT_FIELDS
+from response_schema import encode_result
+from scoring_pool import ScoringPool
+
+
+def in_process_rows_per_second(applicants, chunk_size):
+    start = time.perf_counter()
+    for offset in range(0, len(applicants), chunk_size):
+        results = FairModel.run_multi_model_prediction_batch(applicants[offset:offset + chunk_size])
+        [encode_result(result) for result in results]
+    return len(applicants) / (time.perf_counter() - start)
+
+
+def pool_rows_per_second(applicants, processes, chunk_size, pin_cpus):
+    pool = ScoringPool(APPLICANT_FIELDS, processes=processes, pin_cpus=pin_cpus, chunk_size=chunk_size)
+    try:
+        pool.score_batch(applicants[:processes * chunk_size])
+        start = time.perf_counter()
+        pool.score_batch(applicants)
+        return len(applicants) / (time.perf_counter() - start)
+    finally:
+        pool.close()
+
+
+def main():
+    cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    parser = argparse.ArgumentParser(description="Throughput of the process-pool scoring backend against in-process scoring.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--processes", type=int, nargs="+", default=sorted({1, 2, 4, cpu_count}))
+    parser.add_argument("--pin", action="store_true", help="Pin each worker to one CPU")
+    parser.add_argument("--json", help="Write the measurements to this file")
+    args = parser.parse_args()
+
+    applicants = synthetic_population(args.rows)
+    baseline = in_process_rows_per_second(applicants, args.chunk_size)
+    results = {"cpu_count": cpu_count, "rows": args.rows, "in_process": baseline, "pool": {}}
+
+    print(f"{'mode':<16} {'rows/s':>12} {'speedup':>9}   ({args.rows} rows, chunk {args.chunk_size}, {cpu_count} CPUs)")
+    print(f"{'in-process':<16} {baseline:>12,.0f} {1.0:>8.2f}x")
+    for processes in args.processes:
+        rate = pool_rows_per_second(applicants, processes, args.chunk_size, args.pin)
+        results["pool"][processes] = rate
+        print(f"{f'pool x{processes}':<16} {rate:>12,.0f} {rate / baseline:>8.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
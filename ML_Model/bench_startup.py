@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = (
+    "import time; t0 = time.perf_counter(); import numpy, joblib, xgboost; t1 = time.perf_counter(); "
+    "import FairModel; t2 = time.perf_counter(); print(t1 - t0, t2 - t1)"
+)
+
+
+def measure_cold_start(use_cache, runs):
+    env = dict(os.environ, CREDX_ARTIFACT_CACHE="1" if use_cache else "0", PYTHONWARNINGS="ignore")
+    library_times, load_times, process_times = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            env=env, capture_output=True, text=True, check=True
+        )
+        process_times.append(time.perf_counter() - start)
+        library_time, load_time = map(float, completed.stdout.strip().splitlines()[-1].split())
+        library_times.append(library_time)
+        load_times.append(load_time)
+    return {
+        "library_import_median_s": statistics.median(library_times),
+        "artifact_load_median_s": statistics.median(load_times),
+        "artifact_load_min_s": min(load_times),
+        "process_median_s": statistics.median(process_times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the FairModel scoring module.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        "pickles": measure_cold_start(use_cache=False, runs=args.runs),
+        "compiled": measure_cold_start(use_cache=True, runs=args.runs),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'artifacts':<10} {'libraries':>11} {'load median':>13} {'load min':>10} {'process':>10}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['library_import_median_s']:>10.3f}s {r['artifact_load_median_s']:>12.3f}s "
+              f"{r['artifact_load_min_s']:>9.3f}s {r['process_median_s']:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
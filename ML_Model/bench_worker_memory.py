@@ -0,0 +1,107 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from FairModel import TEST_APPLICANT_JSON_GOOD
+
+# ApplicantData declares merchant_diversity as an int
+PAYLOAD = dict(TEST_APPLICANT_JSON_GOOD, merchant_diversity=1)
+
+
+def _smaps_rollup(pid):
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0])
+    return {
+        "rss_mb": fields["Rss"] / 1024,
+        "pss_mb": fields["Pss"] / 1024,
+        "uss_mb": (fields["Private_Clean"] + fields["Private_Dirty"]) / 1024,
+    }
+
+
+def _children(pid):
+    children_file = Path(f"/proc/{pid}/task/{pid}/children")
+    return [int(p) for p in children_file.read_text().split()]
+
+
+def _post(port, payload):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/submit",
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.status
+
+
+def measure(workers, port, preload, warmup_requests, startup_timeout):
+    command = [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port)]
+    if not preload:
+        command.append("--no-preload")
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        deadline = time.time() + startup_timeout
+        while True:
+            try:
+                _post(port, PAYLOAD)
+                break
+            except (urllib.error.URLError, ConnectionError):
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError("Server did not come up")
+                time.sleep(0.5)
+
+        while len(_children(server.pid)) < workers:
+            time.sleep(0.2)
+        for _ in range(warmup_requests):
+            _post(port, PAYLOAD)
+        time.sleep(1.0)
+
+        return {
+            "parent": _smaps_rollup(server.pid),
+            "workers": [_smaps_rollup(pid) for pid in _children(server.pid)],
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _summarise(label, result):
+    workers = result["workers"]
+    mean = {key: sum(w[key] for w in workers) / len(workers) for key in ("rss_mb", "pss_mb", "uss_mb")}
+    total_pss = result["parent"]["pss_mb"] + sum(w["pss_mb"] for w in workers)
+    print(f"{label:<22} {mean['rss_mb']:>10.1f} {mean['pss_mb']:>10.1f} {mean['uss_mb']:>10.1f} {total_pss:>12.1f}")
+    return {"per_worker_mean": mean, "total_pss_mb": total_pss, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-worker memory with and without the preloaded model store.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--warmup-requests", type=int, default=50)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--json", help="Write the raw measurements to this file")
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        sys.exit("This measurement needs Linux /proc/<pid>/smaps_rollup.")
+
+    print(f"{'mode':<22} {'RSS/worker':>10} {'PSS/worker':>10} {'USS/worker':>10} {'total PSS':>12}   (MB, {args.workers} workers)")
+    results = {
+        "per_worker_load": _summarise("per-worker load", measure(args.workers, args.port, False, args.warmup_requests, args.startup_timeout)),
+        "preloaded_store": _summarise("preloaded store (fork)", measure(args.workers, args.port + 1, True, args.warmup_requests, args.startup_timeout)),
+    }
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import pandas as pd
+
+import FairModel
+from scoring_pool import init_scoring_worker
+
+INPUT_COLUMNS = ["applicant_id"] + sorted(
+    set(FairModel.FEATURE_PLAN["input_keys"]) | {key for key, _ in FairModel.APPLICANT_CODE_MAPS}
+)
+
+
+def _file_format(path, override=None):
+    if override:
+        return override
+    suffix = Path(path).suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix == ".csv":
+        return "csv"
+    raise SystemExit(f"Cannot infer the format of {path}; pass --input-format/--output-format.")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as err:
+        raise SystemExit("Parquet support needs pyarrow (`pip install pyarrow`).") from err
+    return pyarrow
+
+
+def iter_input_chunks(path, file_format, chunk_size, skip_rows=0):
+    if file_format == "csv":
+        skip = (lambda line: 0 < line <= skip_rows) if skip_rows else None
+        yield from pd.read_csv(path, chunksize=chunk_size, skiprows=skip, dtype={"applicant_id": str})
+        return
+
+    pyarrow = _import_pyarrow()
+    skipped = 0
+    for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        if skipped < skip_rows:
+            skipped += batch.num_rows
+            continue
+        yield batch.to_pandas()
+
+
+def score_chunk(columns, threshold):
+    return FairModel.score_applicant_columns(columns, threshold)
+
+
+class CsvOutput:
+
+    def __init__(self, path, resume_offset):
+        self.path = Path(path)
+        mode = "r+" if resume_offset else "w"
+        self._file = open(self.path, mode, newline="", encoding="utf-8")
+        self._file.truncate(resume_offset)
+        self._file.seek(resume_offset)
+        self._write_header = resume_offset == 0
+
+    def write(self, frame, chunk_index):
+        frame.to_csv(self._file, header=self._write_header, index=False)
+        self._write_header = False
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {"output_bytes": self._file.tell()}
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetOutput:
+
+    def __init__(self, path, resume_chunks):
+        self.pyarrow = _import_pyarrow()
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        for part in self.path.glob("part-*.parquet"):
+            if int(part.stem.split("-")[1]) >= resume_chunks:
+                part.unlink()
+
+    def write(self, frame, chunk_index):
+        table = self.pyarrow.Table.from_pandas(frame, preserve_index=False)
+        self.pyarrow.parquet.write_table(table, self.path / f"part-{chunk_index:06d}.parquet")
+        return {}
+
+    def close(self):
+        pass
+
+
+def _input_fingerprint(path):
+    stat = Path(path).stat()
+    return {"input": str(Path(path).resolve()), "input_size": stat.st_size, "input_mtime_ns": stat.st_mtime_ns}
+
+
+def _write_checkpoint(path, state):
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _load_checkpoint(checkpoint_path, expected):
+    with open(checkpoint_path) as f:
+        state = json.load(f)
+    for key, value in expected.items():
+        if state.get(key) != value:
+            raise SystemExit(f"Checkpoint {checkpoint_path} was written for a different run ({key} changed). Delete it to start over.")
+    return state
+
+
+def run(args):
+    input_format = _file_format(args.input, args.input_format)
+    output_format = _file_format(args.output, args.output_format)
+    checkpoint_path = Path(args.checkpoint or f"{args.output}.checkpoint.json")
+
+    run_config = dict(_input_fingerprint(args.input), output=str(Path(args.output).resolve()),
+                      chunk_size=args.chunk_size, threshold=args.threshold)
+    if checkpoint_path.exists() and not args.resume:
+        raise SystemExit(f"Found checkpoint {checkpoint_path}. Pass --resume to continue, or delete it to start over.")
+    state = _load_checkpoint(checkpoint_path, run_config) if args.resume and checkpoint_path.exists() else dict(
+        run_config, rows_done=0, chunks_done=0, output_bytes=0
+    )
+
+    if output_format == "csv":
+        output = CsvOutput(args.output, state["output_bytes"])
+    else:
+        output = ParquetOutput(args.output, state["chunks_done"])
+
+    pool = None
+    if args.workers > 1:
+        context = multiprocessing.get_context("fork")
+        pool = context.Pool(args.workers, initializer=init_scoring_worker, initargs=(context.Value("i", 0), args.pin))
+
+    resumed_rows = state["rows_done"]
+    if resumed_rows:
+        print(f"↩️  Resuming after {resumed_rows:,} rows ({state['chunks_done']} chunks)")
+
+    started_at = time.perf_counter()
+    pending = deque()
+
+    def write_result(result):
+        frame = pd.DataFrame(result)
+        state.update(output.write(frame, state["chunks_done"]))
+        state["rows_done"] += len(frame)
+        state["chunks_done"] += 1
+        _write_checkpoint(checkpoint_path, state)
+        scored = state["rows_done"] - resumed_rows
+        elapsed = time.perf_counter() - started_at
+        print(f"   {state['rows_done']:>12,} rows written  {scored / elapsed:>10,.0f} rows/s", file=sys.stderr)
+
+    try:
+        for chunk in iter_input_chunks(args.input, input_format, args.chunk_size, state["rows_done"]):
+            missing = [name for name in INPUT_COLUMNS if name not in chunk.columns]
+            if missing:
+                raise SystemExit(f"Input is missing required columns: {missing}")
+            columns = {name: chunk[name].to_numpy() for name in INPUT_COLUMNS}
+
+            if pool is None:
+                write_result(score_chunk(columns, args.threshold))
+                continue
+            pending.append(pool.apply_async(score_chunk, (columns, args.threshold)))
+            if len(pending) >= 2 * args.workers:
+                write_result(pending.popleft().get())
+
+        while pending:
+            write_result(pending.popleft().get())
+    finally:
+        output.close()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    elapsed = time.perf_counter() - started_at
+    scored = state["rows_done"] - resumed_rows
+    checkpoint_path.unlink(missing_ok=True)
+    print(f"✅ Scored {scored:,} rows in {elapsed:.1f}s ({scored / elapsed if elapsed else 0:,.0f} rows/s) → {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python credx_score.py",
+        description="Score a CSV or Parquet file of applicants in fixed-size chunks with every loaded model."
+    )
+    parser.add_argument("input", help="CSV or Parquet file with one ApplicantData row per line")
+    parser.add_argument("output", help="Output .csv file, or .parquet directory of part files")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes (1 scores in-process)")
+    parser.add_argument("--pin", action="store_true", help="Pin each scoring process to one CPU")
+    parser.add_argument("--threshold", type=float, default=FairModel.OPTIMAL_THRESHOLD)
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint left by an interrupted run")
+    parser.add_argument("--checkpoint", help="Checkpoint path (default: <output>.checkpoint.json)")
+    parser.add_argument("--input-format", choices=["csv", "parquet"])
+    parser.add_argument("--output-format", choices=["csv", "parquet"])
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import time
+
+import numpy as np
+import xgboost as xgb
+
+from artifact_cache import booster_iteration_range
+from inference_pool import run_isolated
+from log_config import get_logger
+from metrics import increment, observe
+from tree_ensemble import CompiledTreeEnsemble
+
+logger = get_logger("ensemble")
+
+ENSEMBLE_ARTIFACT = "delphi_ensemble.pkl"
+ARTIFACT_FORMAT = 1
+
+# Member feature views: the Fair XGBoost inputs, or their PCA projection (the notebook's RF on Debiased)
+VIEW_FAIR = "fair"
+VIEW_DEBIASED = "debiased"
+
+
+def export_ensemble(path, ensemble, feature_order, member_views=None, pca=None):
+    import joblib
+
+    # A plain dict, so serving can load it without the notebook's DelphiConsensusEnsemble class
+    member_views = member_views or {}
+    names = [name for name in ensemble.models if name in ensemble.weights]
+    views = {name: member_views.get(name, VIEW_FAIR) for name in names}
+    if pca is None and VIEW_DEBIASED in views.values():
+        raise ValueError("Members on the debiased view need the PCA that produced it")
+
+    artifact = {
+        "format": ARTIFACT_FORMAT,
+        "feature_order": list(feature_order),
+        "members": {name: ensemble.models[name] for name in names},
+        "weights": {name: float(ensemble.weights[name]) for name in names},
+        "views": views,
+        "pca": None,
+        "weighting": {
+            "fairness": ensemble.fairness_weight,
+            "performance": ensemble.performance_weight,
+            "diversity": ensemble.diversity_weight,
+        },
+    }
+    if pca is not None:
+        artifact["pca"] = {
+            "mean": np.asarray(pca.mean_, dtype=np.float64),
+            "components": np.asarray(pca.components_, dtype=np.float64),
+            "explained_variance": np.asarray(pca.explained_variance_, dtype=np.float64),
+            "whiten": bool(pca.whiten),
+        }
+    joblib.dump(artifact, path)
+    return artifact
+
+
+def _is_binary(model):
+    classes = getattr(model, "classes_", None)
+    return classes is not None and [int(c) for c in classes] == [0, 1]
+
+
+def _is_logistic(model):
+    from sklearn.linear_model import LogisticRegression
+    return isinstance(model, LogisticRegression) and _is_binary(model) and model.coef_.shape[0] == 1
+
+
+def _linear_member(model):
+    # (coefficients, intercepts, vote weights) for members that reduce to one matrix product, else None
+    if _is_logistic(model):
+        return np.asarray(model.coef_, dtype=np.float64), np.asarray(model.intercept_, dtype=np.float64), None
+
+    # Fairlearn's ExponentiatedGradient: P(default) is the weighted vote of its predictors' hard predictions
+    predictors = getattr(model, "predictors_", None)
+    weights = getattr(model, "weights_", None)
+    if predictors is None or weights is None:
+        return None
+    used = [(predictor, float(weight)) for predictor, weight in zip(list(predictors), np.asarray(weights)) if weight != 0]
+    if not used or not all(_is_logistic(predictor) for predictor, _ in used):
+        return None
+    return (
+        np.vstack([predictor.coef_ for predictor, _ in used]).astype(np.float64),
+        np.concatenate([predictor.intercept_ for predictor, _ in used]).astype(np.float64),
+        np.array([weight for _, weight in used]),
+    )
+
+
+class DelphiEnsembleEngine:
+    max_compiled_rows = 256
+
+    def __init__(self, artifact, nthread=0):
+        if artifact.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported Delphi ensemble artifact format: {artifact.get('format')}")
+        self.feature_order = list(artifact["feature_order"])
+        self.n_features = len(self.feature_order)
+        self.member_names = list(artifact["weights"])
+        if not self.member_names:
+            raise ValueError("Delphi ensemble has no weighted members")
+        self.weights = np.array([artifact["weights"][name] for name in self.member_names], dtype=np.float64)
+        self.weighting = artifact.get("weighting", {})
+        self.boosters = []
+
+        # Every linear piece (the PCA projection and the logistic members) becomes columns of one projection matrix,
+        # so a batch needs a single matrix product for all of them
+        columns = []
+        offsets = []
+        self.debiased_columns = None
+        pca = artifact.get("pca")
+        if pca is not None:
+            projection = pca["components"].T
+            if pca["whiten"]:
+                projection = projection / np.sqrt(pca["explained_variance"])
+            self.debiased_columns = slice(0, projection.shape[1])
+            columns.append(projection)
+            offsets.append(pca["mean"] @ projection)
+
+        self.linear_members = []
+        self.called_members = []
+        width = sum(c.shape[1] for c in columns)
+        for row, name in enumerate(self.member_names):
+            model = artifact["members"][name]
+            view = artifact["views"].get(name, VIEW_FAIR)
+            if view not in (VIEW_FAIR, VIEW_DEBIASED):
+                raise ValueError(f"Unknown feature view '{view}' for member '{name}'")
+            if view == VIEW_DEBIASED and self.debiased_columns is None:
+                raise ValueError(f"Member '{name}' uses the debiased view but the artifact has no PCA")
+
+            linear = _linear_member(model) if view == VIEW_FAIR else None
+            if linear is not None:
+                coef, intercept, vote_weights = linear
+                columns.append(coef.T)
+                offsets.append(-intercept)
+                self.linear_members.append((row, slice(width, width + coef.shape[0]), vote_weights))
+                width += coef.shape[0]
+            else:
+                self.called_members.append((row, name, view, self._member_predictor(model, nthread)))
+
+        self.projection = np.hstack(columns) if columns else None
+        self.offset = np.concatenate(offsets) if columns else None
+        if self.projection is not None and self.projection.shape[0] != self.n_features:
+            raise ValueError(f"Delphi ensemble projection expects {self.projection.shape[0]} features, artifact lists {self.n_features}")
+
+    def _member_predictor(self, model, nthread):
+        from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+        if isinstance(model, xgb.XGBModel):
+            booster = model.get_booster()
+            if nthread > 0:
+                booster.set_param({"nthread": nthread})
+            self.boosters.append(booster)
+            iteration_range = booster_iteration_range(booster)
+            return lambda X: booster.inplace_predict(
+                np.asarray(X, dtype=np.float32), iteration_range=iteration_range, validate_features=False
+            )
+
+        if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)) and _is_binary(model):
+            # The ensemble already runs members side by side, so the forest's own joblib threads only add overhead
+            model.n_jobs = 1
+            try:
+                forest = CompiledTreeEnsemble.from_sklearn(model.estimators_, class_index=1)
+            except (AttributeError, ValueError) as e:
+                logger.warning(f"⚠️ Could not flatten {type(model).__name__}: {e}. Using its predict_proba().")
+                forest = None
+
+            def predict_forest(X):
+                if forest is None or X.shape[0] > self.max_compiled_rows:
+                    return model.predict_proba(X)[:, 1]
+                leaves = forest.leaf_values(np.asarray(X, dtype=np.float32))
+                return np.cumsum(leaves, axis=1)[:, -1] / forest.n_trees
+            return predict_forest
+
+        if hasattr(model, "predict_proba"):
+            return lambda X: model.predict_proba(X)[:, 1]
+        return lambda X: model.predict(X)
+
+    def set_nthread(self, nthread):
+        for booster in self.boosters:
+            booster.set_param({"nthread": nthread})
+
+    def _run_member(self, name, predict, X):
+        started_at = time.perf_counter()
+        proba = np.asarray(predict(X), dtype=np.float64).reshape(-1)
+        observe("ensemble_member", time.perf_counter() - started_at, name)
+        if proba.shape[0] != X.shape[0]:
+            raise ValueError(f"returned {proba.shape[0]} predictions for {X.shape[0]} rows")
+        return proba
+
+    def predict_default_proba(self, X):
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Delphi ensemble expects {self.n_features} features, got {X.shape[1]}")
+        n_rows = X.shape[0]
+        member_proba = np.zeros((len(self.member_names), n_rows))
+        ok = np.ones(len(self.member_names), dtype=bool)
+
+        fused = X @ self.projection - self.offset if self.projection is not None else None
+        views = {VIEW_FAIR: X}
+        if self.debiased_columns is not None:
+            views[VIEW_DEBIASED] = fused[:, self.debiased_columns]
+
+        calls = [
+            lambda name=name, predict=predict, view=view: self._run_member(name, predict, views[view])
+            for _, name, view, predict in self.called_members
+        ]
+        # The caller thread computes the linear members after handing the rest to the pool
+        calls.append(lambda: self._linear_proba(fused, member_proba))
+
+        outcomes = run_isolated(calls[-1:] + calls[:-1])
+        linear_error = outcomes[0][1]
+        for (row, name, _, _), (proba, error) in zip(self.called_members, outcomes[1:]):
+            if error is None:
+                member_proba[row] = proba
+                continue
+            ok[row] = False
+            increment("credx_ensemble_member_errors_total", (("member", name),))
+            logger.error(f"❌ Delphi ensemble member {name} failed: {error}")
+        if linear_error is not None:
+            for row, _, _ in self.linear_members:
+                ok[row] = False
+                increment("credx_ensemble_member_errors_total", (("member", self.member_names[row]),))
+            logger.error(f"❌ Delphi ensemble linear members failed: {linear_error}")
+
+        # Same renormalisation as the notebook: members that failed drop out of the weighted average
+        weights = np.where(ok, self.weights, 0.0)
+        total_weight = weights.sum()
+        if total_weight <= 0:
+            raise ValueError("Every Delphi ensemble member failed")
+        return (weights @ member_proba) / total_weight
+
+    def _linear_proba(self, fused, member_proba):
+        for row, columns, vote_weights in self.linear_members:
+            logits = fused[:, columns]
+            if vote_weights is None:
+                member_proba[row] = 1.0 / (1.0 + np.exp(-logits[:, 0]))
+            else:
+                member_proba[row] = (logits > 0) @ vote_weights
+
+    def predict_proba(self, X):
+        default_proba = self.predict_default_proba(X)
+        pred_proba = np.empty((default_proba.shape[0], 2))
+        pred_proba[:, 0] = 1 - default_proba
+        pred_proba[:, 1] = default_proba
+        return pred_proba
+
+    def describe(self):
+        return {
+            "members": {name: round(float(weight), 6) for name, weight in zip(self.member_names, self.weights)},
+            "fused_linear": [self.member_names[row] for row, _, _ in self.linear_members],
+            "weighting": self.weighting,
+        }
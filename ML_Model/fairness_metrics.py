@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+# Conventions follow the training notebook: y_true == 1 and y_pred == 1 mean default,
+# a model predicts default when its score is >= threshold, and approval = 1 - predicted default.
+
+
+def encode_groups(labels):
+    values, codes = np.unique(np.asarray(labels), return_inverse=True)
+    return codes.reshape(-1), values
+
+
+def group_rates(y_pred, groups, y_true=None, n_groups=None):
+    y_pred = np.asarray(y_pred, dtype=float)
+    groups = np.asarray(groups, dtype=np.int64)
+    n_groups = int(groups.max()) + 1 if n_groups is None else n_groups
+
+    count = np.bincount(groups, minlength=n_groups)
+    predicted = np.bincount(groups, weights=y_pred, minlength=n_groups)
+    rates = {"count": count, "predicted_rate": _divide(predicted, count)}
+    rates["approval_rate"] = 1 - rates["predicted_rate"]
+
+    if y_true is not None:
+        y_true = np.asarray(y_true, dtype=np.int64)
+        by_label = groups * 2 + y_true
+        label_count = np.bincount(by_label, minlength=2 * n_groups).reshape(n_groups, 2)
+        label_predicted = np.bincount(by_label, weights=y_pred, minlength=2 * n_groups).reshape(n_groups, 2)
+        rates["positives"] = label_count[:, 1]
+        rates["actual_rate"] = _divide(label_count[:, 1], count)
+        rates["tpr"] = _divide(label_predicted[:, 1], label_count[:, 1])
+        rates["fpr"] = _divide(label_predicted[:, 0], label_count[:, 0])
+    return rates
+
+
+def _small_codes(groups, n_groups):
+    # Stable sorts of 16-bit keys use radix sort
+    return groups.astype(np.int16) if n_groups < 2 ** 15 else groups
+
+
+def group_auc(y_true, scores, groups, n_groups=None, score_order=None):
+    y_true = np.asarray(y_true, dtype=float)
+    scores = np.asarray(scores, dtype=float)
+    groups = np.asarray(groups, dtype=np.int64)
+    n_groups = int(groups.max()) + 1 if n_groups is None else n_groups
+
+    # Mann-Whitney U per group from one sort by (group, score); tied scores share their average rank.
+    # Pass score_order (argsort of scores) to reuse one score sort across attributes.
+    if score_order is None:
+        score_order = np.argsort(scores, kind="stable")
+    order = score_order[np.argsort(_small_codes(groups, n_groups)[score_order], kind="stable")]
+    g, s, y = groups[order], scores[order], y_true[order]
+    n = len(s)
+    new_run = np.ones(n, dtype=bool)
+    new_run[1:] = (g[1:] != g[:-1]) | (s[1:] != s[:-1])
+    run_starts = np.flatnonzero(new_run)
+    run_ends = np.append(run_starts[1:], n)
+    run_of = np.cumsum(new_run) - 1
+    group_starts = np.searchsorted(g, np.arange(n_groups))
+    ranks = (run_starts[run_of] + run_ends[run_of] + 1) / 2 - group_starts[g]
+
+    n_pos = np.bincount(g, weights=y, minlength=n_groups)
+    n_neg = np.bincount(g, minlength=n_groups) - n_pos
+    rank_sum = np.bincount(g, weights=ranks * y, minlength=n_groups)
+    auc = _divide(rank_sum - n_pos * (n_pos + 1) / 2, n_pos * n_neg)
+    # Same fallback as the notebook when a group has a single class
+    auc[(n_pos == 0) | (n_neg == 0)] = 0.5
+    return auc
+
+
+def _divide(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def _spread(rates, valid):
+    rates = np.where(valid, rates, np.nan)
+    n_valid = valid.sum(axis=0)
+    with np.errstate(all="ignore"):
+        highest = np.nanmax(np.where(n_valid > 0, rates, 0), axis=0)
+        lowest = np.nanmin(np.where(n_valid > 0, rates, 0), axis=0)
+    return lowest, highest, n_valid
+
+
+def demographic_parity_difference(y_pred, protected_attr):
+    codes, _ = encode_groups(protected_attr)
+    rates = group_rates(y_pred, codes)
+    approval = rates["approval_rate"][rates["count"] > 0]
+    return approval.max() - approval.min() if len(approval) else 0
+
+
+def equal_opportunity_difference(y_pred, y_true, protected_attr):
+    codes, _ = encode_groups(protected_attr)
+    rates = group_rates(y_pred, codes, y_true)
+    tpr = rates["tpr"][rates["positives"] > 0]
+    return tpr.max() - tpr.min() if len(tpr) > 1 else 0
+
+
+def disparate_impact(y_pred, protected_attr):
+    codes, _ = encode_groups(protected_attr)
+    rates = group_rates(y_pred, codes)
+    approval = rates["approval_rate"][rates["count"] > 0]
+    if len(approval) >= 2:
+        return approval.min() / approval.max() if approval.max() > 0 else 1.0
+    return 1.0
+
+
+def binary_fairness_report(y_true, y_pred, y_prob, protected):
+    protected = np.asarray(protected, dtype=np.int64)
+    rates = group_rates(y_pred, protected, y_true, n_groups=2)
+    auc = group_auc(y_true, y_prob, protected, n_groups=2)
+    unpriv_rate, priv_rate = rates["predicted_rate"]
+    unpriv_tpr, priv_tpr = np.nan_to_num(rates["tpr"])
+
+    di = unpriv_rate / priv_rate if priv_rate > 0 else (1.0 if unpriv_rate == 0 else np.inf)
+    return {
+        'Privileged Rate': priv_rate,
+        'Unprivileged Rate': unpriv_rate,
+        'Disparate Impact': di,
+        'Statistical Parity Diff': unpriv_rate - priv_rate,
+        'Equal Opportunity Diff': unpriv_tpr - priv_tpr,
+        'Privileged AUC': auc[1],
+        'Unprivileged AUC': auc[0],
+    }
+
+
+def delphi_fairness_score(y_pred, y_true, protected_attr):
+    protected_attr = np.asarray(protected_attr, dtype=np.int64)
+    rates = group_rates(y_pred, protected_attr, y_true, n_groups=2)
+    dpd = abs(rates["predicted_rate"][1] - rates["predicted_rate"][0])
+    if rates["positives"].sum() > 0:
+        tpr = np.where(rates["positives"] > 0, np.nan_to_num(rates["tpr"]), 0)
+        eod = abs(tpr[1] - tpr[0])
+    else:
+        eod = 0
+    return max(0, 1 - (dpd + eod) / 2), dpd, eod
+
+
+def evaluate_fairness(y_true, model_scores, protected, thresholds=0.5, min_group_size=1, with_auc=True):
+    y_true = np.asarray(y_true, dtype=np.int64)
+    thresholds = np.unique(np.atleast_1d(np.asarray(thresholds, dtype=float)))
+    n_thresholds = len(thresholds)
+
+    attributes = []
+    offset = 0
+    for name, labels in protected.items():
+        codes, values = encode_groups(labels)
+        attributes.append((name, codes, values, offset))
+        offset += len(values)
+    n_groups = offset
+    # One segment per (attribute group, true label), stacked over all attributes
+    segments = np.concatenate([(codes + start) * 2 + y_true for _, codes, _, start in attributes])
+
+    group_frames = []
+    summary_frames = []
+    for model_name, scores in model_scores.items():
+        scores = np.asarray(scores, dtype=float)
+        score_order = np.argsort(scores, kind="stable") if with_auc else None
+        # Number of thresholds at or below each score: the model predicts default at thresholds[j] iff j < bins
+        bins = np.tile(np.searchsorted(thresholds, scores, side="right"), len(attributes))
+        histogram = np.bincount(
+            segments * (n_thresholds + 1) + bins, minlength=n_groups * 2 * (n_thresholds + 1)
+        ).reshape(n_groups, 2, n_thresholds + 1)
+        predicted = np.cumsum(histogram[..., ::-1], axis=-1)[..., ::-1][..., 1:]
+        label_count = histogram.sum(axis=-1)
+
+        count = label_count.sum(axis=1)[:, None]
+        positives = label_count[:, 1][:, None]
+        approval_rate = 1 - _divide(predicted.sum(axis=1), count)
+        tpr = _divide(predicted[:, 1], positives)
+        fpr = _divide(predicted[:, 0], label_count[:, 0][:, None])
+
+        for name, codes, values, start in attributes:
+            rows = slice(start, start + len(values))
+            auc = group_auc(y_true, scores, codes, len(values), score_order) if with_auc else np.full(len(values), np.nan)
+            group_frames.append(pd.DataFrame({
+                "model": model_name,
+                "attribute": name,
+                "group": np.repeat(values, n_thresholds),
+                "threshold": np.tile(thresholds, len(values)),
+                "count": np.repeat(count[rows, 0], n_thresholds),
+                "positives": np.repeat(positives[rows, 0], n_thresholds),
+                "approval_rate": approval_rate[rows].ravel(),
+                "tpr": tpr[rows].ravel(),
+                "fpr": fpr[rows].ravel(),
+                "auc": np.repeat(auc, n_thresholds),
+            }))
+
+            sized = np.broadcast_to(count[rows] >= min_group_size, approval_rate[rows].shape)
+            low_approval, high_approval, n_valid = _spread(approval_rate[rows], sized)
+            low_tpr, high_tpr, n_tpr = _spread(tpr[rows], sized & (positives[rows] > 0))
+            with np.errstate(all="ignore"):
+                di = np.where((n_valid >= 2) & (high_approval > 0), low_approval / high_approval, 1.0)
+            summary_frames.append(pd.DataFrame({
+                "model": model_name,
+                "attribute": name,
+                "threshold": thresholds,
+                "groups": n_valid,
+                "demographic_parity_difference": np.where(n_valid > 0, high_approval - low_approval, 0.0),
+                "equal_opportunity_difference": np.where(n_tpr > 1, high_tpr - low_tpr, 0.0),
+                "disparate_impact": di,
+            }))
+
+    return pd.concat(group_frames, ignore_index=True), pd.concat(summary_frames, ignore_index=True)
@@ -0,0 +1,238 @@
+import math
+import mmap
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from log_config import get_logger
+
+FAIRNESS_MONITOR_ENABLED = os.environ.get("CREDX_FAIRNESS_MONITOR", "1") != "0"
+FAIRNESS_WINDOWS = [int(w) for w in os.environ.get("CREDX_FAIRNESS_WINDOWS", "300,3600,86400").split(",") if w.strip()]
+FAIRNESS_BUCKET_SECONDS = int(os.environ.get("CREDX_FAIRNESS_BUCKET_SECONDS", "60"))
+FAIRNESS_MIN_SAMPLES = int(os.environ.get("CREDX_FAIRNESS_MIN_SAMPLES", "30"))
+FAIRNESS_DI_THRESHOLD = float(os.environ.get("CREDX_FAIRNESS_DI_THRESHOLD", "0.8"))
+FAIRNESS_DPD_THRESHOLD = float(os.environ.get("CREDX_FAIRNESS_DPD_THRESHOLD", "0.10"))
+FAIRNESS_FLUSH_INTERVAL = float(os.environ.get("CREDX_FAIRNESS_FLUSH_INTERVAL", "1.0"))
+
+logger = get_logger("fairness")
+
+# Per-model decision flags; errored models are not counted
+DECISION_ERROR = -1
+DECISION_REJECTED = 0
+DECISION_APPROVED = 1
+
+
+def _shared_array(shape, dtype):
+    dtype = np.dtype(dtype)
+    size = max(1, int(np.prod(shape)) * dtype.itemsize)
+    # Anonymous shared mapping: processes forked after this point update the same counters
+    buffer = mmap.mmap(-1, size)
+    return np.frombuffer(buffer, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+
+class FairnessMonitor:
+
+    def __init__(self, models, attributes, windows=FAIRNESS_WINDOWS, bucket_seconds=FAIRNESS_BUCKET_SECONDS,
+                 min_samples=FAIRNESS_MIN_SAMPLES, di_threshold=FAIRNESS_DI_THRESHOLD,
+                 dpd_threshold=FAIRNESS_DPD_THRESHOLD, flush_interval=FAIRNESS_FLUSH_INTERVAL,
+                 enabled=FAIRNESS_MONITOR_ENABLED):
+        self.models = list(models)
+        self.attributes = [(name, dict(labels)) for name, labels in attributes]
+        self.windows = sorted(windows)
+        self.bucket_seconds = bucket_seconds
+        self.min_samples = min_samples
+        self.di_threshold = di_threshold
+        self.dpd_threshold = dpd_threshold
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+
+        # Every (attribute, code) pair gets one column in the counter arrays
+        self.group_labels = []
+        self.attribute_slices = []
+        self.code_lookups = []
+        for name, labels in self.attributes:
+            start = len(self.group_labels)
+            lookup = np.full(max(labels) + 1, -1, dtype=np.int64)
+            for code, label in sorted(labels.items()):
+                lookup[code] = len(self.group_labels)
+                self.group_labels.append(label)
+            self.attribute_slices.append((name, slice(start, len(self.group_labels))))
+            self.code_lookups.append(lookup)
+        self.n_groups = len(self.group_labels)
+
+        self.n_slots = max(1, math.ceil(max(self.windows, default=bucket_seconds) / bucket_seconds))
+        # counts[slot, model, group] = (decisions, approvals); slot_buckets[slot] = bucket number it holds
+        self._counts = _shared_array((self.n_slots, len(self.models), self.n_groups, 2), np.int64)
+        self._slot_buckets = _shared_array((self.n_slots,), np.int64)
+        self._slot_buckets[:] = -1
+        self._lock = multiprocessing.get_context("fork").Lock()
+
+        self._pending = deque()
+        self._flusher = None
+        if self.enabled:
+            self._start_flusher()
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start_flusher(self):
+        self._flusher = threading.Thread(target=self._flush_loop, name="credx-fairness", daemon=True)
+        self._flusher.start()
+
+    def _after_fork(self):
+        # Records queued in the parent belong to the parent; the child flushes only its own
+        self._pending = deque()
+        self._start_flusher()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.exception(f"❌ Fairness monitor flush failed: {e}")
+
+    def record(self, codes, decisions):
+        if self.enabled:
+            self._pending.append((time.time(), codes, decisions))
+
+    def record_batch(self, codes, decisions):
+        if self.enabled and len(codes):
+            self._pending.append((time.time(), np.asarray(codes, dtype=np.int64), np.asarray(decisions, dtype=np.int64)))
+
+    def _group_columns(self, codes):
+        columns = np.empty(codes.shape, dtype=np.int64)
+        for i, lookup in enumerate(self.code_lookups):
+            attribute_codes = codes[:, i]
+            known = (attribute_codes >= 0) & (attribute_codes < len(lookup))
+            columns[:, i] = np.where(known, lookup[np.where(known, attribute_codes, 0)], -1)
+        return columns
+
+    def flush(self):
+        items = []
+        while self._pending:
+            try:
+                items.append(self._pending.popleft())
+            except IndexError:
+                break
+        if not items:
+            return
+
+        singles = [item for item in items if not isinstance(item[1], np.ndarray)]
+        blocks = [item for item in items if isinstance(item[1], np.ndarray)]
+        times = [np.full(len(codes), timestamp) for timestamp, codes, _ in blocks]
+        codes = [codes for _, codes, _ in blocks]
+        decisions = [decisions for _, _, decisions in blocks]
+        if singles:
+            times.append(np.array([timestamp for timestamp, _, _ in singles]))
+            codes.append(np.array([c for _, c, _ in singles], dtype=np.int64).reshape(len(singles), -1))
+            decisions.append(np.array([d for _, _, d in singles], dtype=np.int64).reshape(len(singles), -1))
+
+        buckets = (np.concatenate(times) // self.bucket_seconds).astype(np.int64)
+        group_columns = self._group_columns(np.concatenate(codes))
+        decisions = np.concatenate(decisions)
+
+        with self._lock:
+            for bucket in np.unique(buckets):
+                slot = bucket % self.n_slots
+                if self._slot_buckets[slot] > bucket:
+                    continue
+                if self._slot_buckets[slot] != bucket:
+                    self._counts[slot] = 0
+                    self._slot_buckets[slot] = bucket
+                in_bucket = buckets == bucket
+                for model_index in range(len(self.models)):
+                    model_decisions = decisions[in_bucket, model_index]
+                    counted = model_decisions != DECISION_ERROR
+                    groups = group_columns[in_bucket][counted]
+                    approved = np.broadcast_to((model_decisions[counted] == DECISION_APPROVED)[:, None], groups.shape)
+                    known = groups >= 0
+                    self._counts[slot, model_index, :, 0] += np.bincount(groups[known], minlength=self.n_groups)
+                    self._counts[slot, model_index, :, 1] += np.bincount(
+                        groups[known], weights=approved[known], minlength=self.n_groups
+                    ).astype(np.int64)
+
+    def window_counts(self, window_seconds, now=None):
+        now = time.time() if now is None else now
+        current = int(now // self.bucket_seconds)
+        oldest = current - math.ceil(window_seconds / self.bucket_seconds) + 1
+        with self._lock:
+            slot_buckets = self._slot_buckets.copy()
+            counts = self._counts.copy()
+        live = (slot_buckets >= oldest) & (slot_buckets <= current)
+        return counts[live].sum(axis=0)
+
+    def _attribute_report(self, counts, labels):
+        decisions, approvals = counts[:, 0], counts[:, 1]
+        groups = {}
+        eligible = []
+        for column, label in enumerate(labels):
+            if decisions[column] == 0:
+                continue
+            rate = approvals[column] / decisions[column]
+            groups[label] = {"decisions": int(decisions[column]), "approvals": int(approvals[column]), "approval_rate": float(rate)}
+            if decisions[column] >= self.min_samples:
+                eligible.append((rate, label))
+
+        report = {"groups": groups, "disparate_impact": None, "demographic_parity_difference": None}
+        if len(eligible) >= 2:
+            (low_rate, low_group), (high_rate, high_group) = min(eligible), max(eligible)
+            report.update(
+                disparate_impact=float(low_rate / high_rate) if high_rate > 0 else 1.0,
+                demographic_parity_difference=float(high_rate - low_rate),
+                lowest_group=low_group,
+                highest_group=high_group,
+            )
+        return report
+
+    def report(self, now=None):
+        self.flush()
+        now = time.time() if now is None else now
+        windows = {}
+        alerts = []
+        for window in self.windows:
+            counts = self.window_counts(window, now)
+            window_report = {}
+            for model_index, model_name in enumerate(self.models):
+                model_report = {}
+                for attribute, columns in self.attribute_slices:
+                    attribute_report = self._attribute_report(counts[model_index, columns], self.group_labels[columns])
+                    model_report[attribute] = attribute_report
+                    alert = self._alert(window, model_name, attribute, attribute_report)
+                    if alert is not None:
+                        alerts.append(alert)
+                window_report[model_name] = model_report
+            windows[f"{window}s"] = window_report
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "min_samples": self.min_samples,
+            "thresholds": {"disparate_impact": self.di_threshold, "demographic_parity_difference": self.dpd_threshold},
+            "windows": windows,
+            "alerts": alerts,
+        }
+
+    def _alert(self, window, model_name, attribute, attribute_report):
+        di = attribute_report["disparate_impact"]
+        dpd = attribute_report["demographic_parity_difference"]
+        if di is None:
+            return None
+        reasons = []
+        if di < self.di_threshold:
+            reasons.append(f"disparate impact {di:.3f} < {self.di_threshold}")
+        if dpd > self.dpd_threshold:
+            reasons.append(f"demographic parity difference {dpd:.3f} > {self.dpd_threshold}")
+        if not reasons:
+            return None
+        return {
+            "window": f"{window}s",
+            "model": model_name,
+            "attribute": attribute,
+            "disparate_impact": di,
+            "demographic_parity_difference": dpd,
+            "lowest_group": attribute_report["lowest_group"],
+            "highest_group": attribute_report["highest_group"],
+            "reasons": reasons,
+        }
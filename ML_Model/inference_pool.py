@@ -0,0 +1,58 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+INFERENCE_THREADS = int(os.environ.get("CREDX_INFERENCE_THREADS", "0"))
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def inference_threads():
+    return INFERENCE_THREADS if INFERENCE_THREADS > 0 else (os.cpu_count() or 1)
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+def get_executor():
+    global _executor
+    if inference_threads() <= 1:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=inference_threads(), thread_name_prefix="credx-infer", initializer=_mark_worker
+                )
+    return _executor
+
+
+def _call(fn):
+    try:
+        return fn(), None
+    except Exception as e:
+        return None, e
+
+
+def run_isolated(calls):
+    # Runs zero-argument calls concurrently and returns (result, exception) per call, in order.
+    # The caller runs the first one itself; calls made from a pool thread run inline so nested use cannot deadlock.
+    executor = get_executor()
+    if executor is None or len(calls) < 2 or getattr(_worker, "active", False):
+        return [_call(fn) for fn in calls]
+    futures = [executor.submit(_call, fn) for fn in calls[1:]]
+    return [_call(calls[0])] + [future.result() for future in futures]
+
+
+def _after_fork():
+    # Pool threads do not survive fork; the child builds its own pool on first use
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,82 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+LOG_LEVEL = os.environ.get("CREDX_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("CREDX_LOG_FORMAT", "json").lower()
+
+ROOT_LOGGER_NAME = "credx"
+
+_queue_handler = None
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+
+    def format(self, record):
+        message = record.getMessage()
+        fields = getattr(record, "fields", None)
+        if fields:
+            message += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return message
+
+
+def _start_listener():
+    global _listener
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler)
+    _listener.start()
+
+
+def shutdown_logging():
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def configure_logging():
+    global _queue_handler
+    if _queue_handler is not None:
+        return
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+
+    _queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    root.addHandler(_queue_handler)
+    _start_listener()
+
+    atexit.register(shutdown_logging)
+    if hasattr(os, "register_at_fork"):
+        # The listener thread does not survive fork(); give each child its own
+        os.register_at_fork(after_in_child=_start_listener)
+
+
+def get_logger(name):
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
@@ -1,10 +1,24 @@
 import uvicorn
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Union
 from fastapi import FastAPI
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
-from FairModel import run_multi_model_prediction
+from FairModel import (
+    FAIRNESS_MONITOR, MODEL_REGISTRY, run_multi_model_prediction, run_multi_model_prediction_batch, simulate_what_if
+)
+from log_config import get_logger
+from metrics import render_metrics
+from micro_batcher import ASYNC_SUBMIT, MicroBatcher, QueueFull
+from response_schema import (
+    BatchScoringResult, CredXJSONResponse, ScoringError, ScoringResult, WhatIfResult, encode_batch, encode_result
+)
+from scoring_pool import SCORING_POOL_PROCESSES, ScoringPool
+
+logger = get_logger("api")
 
 class ApplicantData(BaseModel):
     applicant_id: str
@@ -34,7 +48,53 @@ class ApplicantData(BaseModel):
     document_verified: int
 
 
-app = FastAPI()
+class WhatIfRequest(BaseModel):
+    applicant: ApplicantData
+    grid: Dict[str, List[float]] = {}
+    scenarios: List[Dict[str, float]] = []
+
+
+APPLICANT_FIELDS = [(name, field.annotation) for name, field in ApplicantData.model_fields.items()]
+scoring_pool = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global scoring_pool
+    # Forked here rather than at import: a pool created before serve.py forks its workers loses its handler threads
+    if SCORING_POOL_PROCESSES > 0 and scoring_pool is None:
+        scoring_pool = ScoringPool(APPLICANT_FIELDS)
+    # The pointer poller and shadow thread run in serving processes only, never in scoring pool or CLI children
+    MODEL_REGISTRY.start()
+    yield
+    await scoring_queue.close()
+    if scoring_pool is not None:
+        scoring_pool.close()
+        scoring_pool = None
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+# Requests are (applicant, compact, explain) tuples; results come back as encoded JSON bytes
+def score_requests(requests):
+    applicants = [applicant for applicant, _, _ in requests]
+    compact = [row_compact for _, row_compact, _ in requests]
+    explain = [row_explain for _, _, row_explain in requests]
+    if scoring_pool is not None:
+        return scoring_pool.score_batch(applicants, compact, explain)
+    if len(applicants) == 1:
+        results = [run_multi_model_prediction(applicants[0], explain=explain[0])]
+    else:
+        results = run_multi_model_prediction_batch(applicants, explain=explain)
+    return [encode_result(result, row_compact) for result, row_compact in zip(results, compact)]
+
+
+def score_request(request):
+    return score_requests([request])[0]
+
+
+scoring_queue = MicroBatcher(score_request, score_requests, concurrency=max(1, SCORING_POOL_PROCESSES))
 
 origins = [
     "http://localhost",
@@ -50,21 +110,25 @@ app.add_middleware(
 )
 
 
-@app.post("/submit")
-def handle_form_submission(data: ApplicantData):
+@app.post("/submit", response_model=Union[ScoringResult, ScoringError], response_class=CredXJSONResponse)
+async def handle_form_submission(data: ApplicantData, compact: bool = False, explain: bool = False):
     
     applicant_dict = data.model_dump()
-    print(applicant_dict)
-    print("-------------------------------")
-
-    print("--- Model Result ---")
+    logger.debug("%s", applicant_dict)
 
-    result = run_multi_model_prediction(applicant_dict)
-        
-    print(result)
-    print("--------------------")
+    if not ASYNC_SUBMIT:
+        result = await run_in_threadpool(score_request, (applicant_dict, compact, explain))
+    else:
+        try:
+            result = await scoring_queue.submit((applicant_dict, compact, explain))
+        except QueueFull as e:
+            return JSONResponse(
+                status_code=429,
+                content={"success": False, "error": str(e)},
+                headers={"Retry-After": "1"}
+            )
 
-    return jsonable_encoder(result)
+    return CredXJSONResponse(result)
 
     return {
             "success": False,
@@ -73,6 +137,86 @@ def handle_form_submission(data: ApplicantData):
     }
 
 
+def score_batch_response(data, compact, explain):
+    applicant_dicts = [applicant.model_dump() for applicant in data]
+    logger.debug("--- Batch Model Result (%d applicants) ---", len(applicant_dicts))
+
+    if scoring_pool is not None:
+        encoded_results = scoring_pool.score_batch(applicant_dicts, compact, explain)
+    else:
+        results = run_multi_model_prediction_batch(applicant_dicts, explain=explain)
+        encoded_results = [encode_result(result, compact) for result in results]
+
+    return CredXJSONResponse(encode_batch(encoded_results))
+
+
+@app.post("/submit/batch", response_model=BatchScoringResult, response_class=CredXJSONResponse)
+def handle_batch_submission(data: List[ApplicantData], compact: bool = False, explain: bool = False):
+    return score_batch_response(data, compact, explain)
+
+
+@app.post("/explain/batch", response_model=BatchScoringResult, response_class=CredXJSONResponse)
+def handle_batch_explanation(data: List[ApplicantData], compact: bool = False):
+    return score_batch_response(data, compact, explain=True)
+
+
+@app.post("/what-if", response_model=WhatIfResult, response_class=CredXJSONResponse)
+def handle_what_if(data: WhatIfRequest):
+    try:
+        result = simulate_what_if(data.applicant.model_dump(), data.grid, data.scenarios)
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"success": False, "error": str(e)})
+    return CredXJSONResponse(result)
+
+
+@app.get("/fairness")
+def handle_fairness():
+    return FAIRNESS_MONITOR.report()
+
+
+@app.get("/fairness/alerts")
+def handle_fairness_alerts():
+    alerts = FAIRNESS_MONITOR.report()["alerts"]
+    return {"alerting": bool(alerts), "count": len(alerts), "alerts": alerts}
+
+
+def registry_action(action, *args):
+    try:
+        return action(*args)
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"success": False, "error": str(e)})
+
+
+@app.get("/models")
+def handle_models():
+    return MODEL_REGISTRY.status()
+
+
+@app.post("/models/shadow")
+def handle_models_shadow(version: str):
+    return registry_action(MODEL_REGISTRY.request_shadow, version)
+
+
+@app.delete("/models/shadow")
+def handle_models_shadow_stop():
+    return registry_action(MODEL_REGISTRY.request_shadow, None)
+
+
+@app.post("/models/promote")
+def handle_models_promote(version: Optional[str] = None):
+    return registry_action(MODEL_REGISTRY.request_promote, version)
+
+
+@app.post("/models/rollback")
+def handle_models_rollback():
+    return registry_action(MODEL_REGISTRY.request_rollback)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def handle_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
 
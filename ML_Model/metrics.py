@@ -0,0 +1,199 @@
+import bisect
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.environ.get("CREDX_METRICS", "1") != "0"
+
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+    def merge(self, counts, total, count):
+        with self._lock:
+            self.counts = [a + b for a, b in zip(self.counts, counts)]
+            self.total += total
+            self.count += count
+
+    def quantile(self, q, counts=None, count=None):
+        if counts is None:
+            counts, _, count = self.snapshot()
+        if count == 0:
+            return float("nan")
+        rank = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count > 0:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.stage_durations = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe_stage(self, stage, seconds, model=None):
+        key = (stage, model)
+        histogram = self.stage_durations.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stage_durations.setdefault(key, Histogram())
+        histogram.observe(seconds)
+
+    def increment(self, name, labels=(), amount=1):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def take_delta(self):
+        # Everything recorded since the last call, so a forked scoring worker can report into the parent's registry
+        with self._lock:
+            stage_durations, counters = self.stage_durations, self.counters
+            self.stage_durations, self.counters = {}, {}
+        return {key: histogram.snapshot() for key, histogram in stage_durations.items()}, counters
+
+    def merge(self, delta):
+        stage_durations, counters = delta
+        for key, (counts, total, count) in stage_durations.items():
+            with self._lock:
+                histogram = self.stage_durations.setdefault(key, Histogram())
+            histogram.merge(counts, total, count)
+        for (name, labels), amount in counters.items():
+            self.increment(name, labels, amount)
+
+    def render(self):
+        lines = [
+            "# HELP credx_stage_duration_seconds Time spent in each scoring stage.",
+            "# TYPE credx_stage_duration_seconds histogram",
+        ]
+        quantile_lines = [
+            "# HELP credx_stage_duration_quantile_seconds p50/p95/p99 per stage, estimated from the histogram buckets.",
+            "# TYPE credx_stage_duration_quantile_seconds gauge",
+        ]
+        with self._lock:
+            stage_durations = list(self.stage_durations.items())
+            counters = list(self.counters.items())
+        for (stage, model), histogram in sorted(stage_durations, key=lambda item: (item[0][0], item[0][1] or "")):
+            labels = _format_labels(stage=stage, model=model)
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'credx_stage_duration_seconds_bucket{_format_labels(stage=stage, model=model, le=repr(bound))} {cumulative}')
+            lines.append(f'credx_stage_duration_seconds_bucket{_format_labels(stage=stage, model=model, le="+Inf")} {count}')
+            lines.append(f"credx_stage_duration_seconds_sum{labels} {total}")
+            lines.append(f"credx_stage_duration_seconds_count{labels} {count}")
+            for q in QUANTILES:
+                value = histogram.quantile(q, counts, count)
+                quantile_lines.append(f"credx_stage_duration_quantile_seconds{_format_labels(stage=stage, model=model, quantile=str(q))} {value}")
+
+        counter_names = sorted({name for (name, _), _ in counters})
+        counter_lines = []
+        for name in counter_names:
+            counter_lines.append(f"# TYPE {name} counter")
+            for (counter_name, labels), value in sorted(counters):
+                if counter_name == name:
+                    counter_lines.append(f"{name}{_format_labels(**dict(labels))} {value}")
+
+        return "\n".join(lines + quantile_lines + counter_lines) + "\n"
+
+
+def _format_labels(**labels):
+    pairs = [f'{key}="{_escape(value)}"' for key, value in labels.items() if value is not None]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class StageTimer:
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.started_at = self.last = time.perf_counter()
+
+    def lap(self, stage, model=None):
+        now = time.perf_counter()
+        self.registry.observe_stage(stage, now - self.last, model)
+        self.last = now
+
+    def finish(self, stage="total"):
+        now = time.perf_counter()
+        self.registry.observe_stage(stage, now - self.started_at)
+        self.last = now
+
+
+class NullStageTimer:
+
+    def lap(self, stage, model=None):
+        pass
+
+    def finish(self, stage="total"):
+        pass
+
+
+REGISTRY = MetricsRegistry()
+_NULL_TIMER = NullStageTimer()
+
+
+def stage_timer():
+    if METRICS_ENABLED:
+        return StageTimer(REGISTRY)
+    return _NULL_TIMER
+
+
+def observe(stage, seconds, model=None):
+    if METRICS_ENABLED:
+        REGISTRY.observe_stage(stage, seconds, model)
+
+
+def increment(name, labels=(), amount=1):
+    if METRICS_ENABLED:
+        REGISTRY.increment(name, labels, amount)
+
+
+def take_delta():
+    if METRICS_ENABLED:
+        return REGISTRY.take_delta()
+    return {}, {}
+
+
+def merge_delta(delta):
+    if METRICS_ENABLED:
+        REGISTRY.merge(delta)
+
+
+def render_metrics():
+    return REGISTRY.render()
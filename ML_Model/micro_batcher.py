@@ -0,0 +1,127 @@
+import asyncio
+import contextlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from log_config import get_logger
+from metrics import increment, observe
+
+ASYNC_SUBMIT = os.environ.get("CREDX_ASYNC_SUBMIT", "1") != "0"
+QUEUE_DEPTH = int(os.environ.get("CREDX_QUEUE_DEPTH", "1024"))
+MAX_BATCH_SIZE = int(os.environ.get("CREDX_MAX_BATCH_SIZE", "64"))
+MAX_BATCH_WAIT_MS = float(os.environ.get("CREDX_MAX_BATCH_WAIT_MS", "2"))
+
+logger = get_logger("batcher")
+
+
+class QueueFull(Exception):
+    pass
+
+
+class MicroBatcher:
+
+    def __init__(self, score_one, score_batch, queue_depth=QUEUE_DEPTH,
+                 max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_BATCH_WAIT_MS, concurrency=1):
+        self.score_one = score_one
+        self.score_batch = score_batch
+        self.queue_depth = queue_depth
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.concurrency = max(1, concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="credx-inference")
+        self._loop = None
+        self._queue = None
+        self._batch_ready = None
+        self._slots = None
+        self._worker = None
+        # The loop only keeps weak references to tasks, so in-flight dispatches are held here until they finish
+        self._dispatches = set()
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(self.queue_depth)
+        self._batch_ready = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._worker = loop.create_task(self._run())
+
+    async def submit(self, payload):
+        self._ensure_started()
+        future = self._loop.create_future()
+        try:
+            self._queue.put_nowait((payload, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            increment("credx_queue_rejections_total")
+            raise QueueFull(f"Scoring queue is full ({self.queue_depth} pending requests)")
+        if self._queue.qsize() >= self.max_batch_size:
+            self._batch_ready.set()
+        return await future
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        if self.max_wait > 0 and self._queue.qsize() < self.max_batch_size - 1:
+            self._batch_ready.clear()
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    def _score(self, payloads):
+        if len(payloads) == 1:
+            return [self.score_one(payloads[0])]
+        return self.score_batch(payloads)
+
+    async def _dispatch(self, batch):
+        try:
+            results = await self._loop.run_in_executor(self._executor, self._score, [p for p, _, _ in batch])
+        except Exception as e:
+            logger.exception(f"❌ Micro-batch of {len(batch)} failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            batch = await self._next_batch()
+            started_at = time.perf_counter()
+            for _, _, enqueued_at in batch:
+                observe("queue_wait", started_at - enqueued_at)
+            increment("credx_micro_batches_total")
+            increment("credx_micro_batch_items_total", amount=len(batch))
+            task = self._loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatch_done)
+
+    def _dispatch_done(self, task):
+        self._dispatches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ Micro-batch dispatch failed: {task.exception()}")
+
+    async def close(self):
+        # Stop forming batches, reject what is still queued and wait for the dispatched batches to finish
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._worker
+        self._worker = None
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(QueueFull("Scoring queue is shutting down"))
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
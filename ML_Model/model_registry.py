@@ -0,0 +1,379 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from log_config import get_logger
+from metrics import increment
+from score_cache import artifact_fingerprint
+
+MODEL_REGISTRY_ROOT = Path(os.environ.get("CREDX_MODEL_REGISTRY_ROOT", "./models/versions"))
+MODEL_REGISTRY_POLL_INTERVAL = float(os.environ.get("CREDX_MODEL_REGISTRY_POLL_INTERVAL", "5"))
+SHADOW_SAMPLE_RATE = float(os.environ.get("CREDX_SHADOW_SAMPLE_RATE", "0.05"))
+SHADOW_QUEUE_DEPTH = int(os.environ.get("CREDX_SHADOW_QUEUE_DEPTH", "1024"))
+SHADOW_BATCH_SIZE = int(os.environ.get("CREDX_SHADOW_BATCH_SIZE", "256"))
+
+logger = get_logger("registry")
+
+# Pointer files under the registry root name the version every process should serve and shadow-score
+ACTIVE_POINTER = "ACTIVE"
+SHADOW_POINTER = "SHADOW"
+
+
+def _new_shadow_stats(candidate):
+    return {
+        "version": candidate.version if candidate is not None else None,
+        "compared": 0,
+        "errors": 0,
+        "dropped": 0,
+        "agreements": 0,
+        "approved_active": 0,
+        "approved_candidate": 0,
+        "abs_risk_diff_sum": 0.0,
+        "max_abs_risk_diff": 0.0,
+    }
+
+
+class ModelRegistry:
+
+    def __init__(self, boot, prepare, shadow_scorer, root=MODEL_REGISTRY_ROOT, poll_interval=MODEL_REGISTRY_POLL_INTERVAL,
+                 shadow_rate=SHADOW_SAMPLE_RATE, shadow_queue_depth=SHADOW_QUEUE_DEPTH, shadow_batch_size=SHADOW_BATCH_SIZE):
+        # prepare(path) loads, validates and warms a model set; shadow_scorer(model_set, applicants) returns
+        # (default_risk, approved) arrays with NaN risk for rows it could not score
+        self.boot = boot
+        self.active = boot
+        self.previous = None
+        self.candidate = None
+        self.root = Path(root)
+        self.poll_interval = poll_interval
+        self.shadow_rate = shadow_rate
+        self.shadow_queue_depth = shadow_queue_depth
+        self.shadow_batch_size = shadow_batch_size
+        self._prepare = prepare
+        self._shadow_scorer = shadow_scorer
+
+        # Guards loads and swaps only; requests read self.active once without taking it
+        self._lock = threading.RLock()
+        self._sets = {}
+        self._loading = set()
+        self._failed = {}
+        self.history = deque(maxlen=50)
+
+        self._shadow_queue = deque()
+        self._shadow_wakeup = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._shadow_stats = _new_shadow_stats(None)
+        self._started = False
+
+        # A restarted worker comes up on the promoted version before it serves traffic
+        active_name = self._read_pointer(ACTIVE_POINTER)
+        if active_name is not None:
+            try:
+                self._activate(self._load(active_name))
+            except Exception as e:
+                self._failed[active_name] = (str(e), self._stamp(active_name))
+                logger.exception(f"❌ Could not load pinned model version '{active_name}': {e}. Serving '{boot.name}'.")
+
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def start(self):
+        # Only serving processes poll the pointers and shadow-score; scoring pool and CLI workers use follow()
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._shadow_loop, name="credx-shadow", daemon=True).start()
+        if self.poll_interval > 0:
+            threading.Thread(target=self._poll_loop, name="credx-registry", daemon=True).start()
+        self.sync()
+
+    def _after_fork(self):
+        # Threads, background loads and queued shadow rows do not survive fork; a serving child calls start() again
+        self._lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self._loading = set()
+        self._shadow_queue = deque()
+        self._shadow_wakeup = threading.Event()
+        self._started = False
+        self.candidate = None
+        self._shadow_stats = _new_shadow_stats(None)
+
+    def follow(self, name):
+        # Serve the version the API process names (None for the boot set), loading it here when needed
+        with self._lock:
+            if name is None:
+                self._activate(self.boot)
+                return
+            if self.active is not self.boot and self.active.name == name:
+                return
+            loaded = self._sets.get(name)
+            if loaded is None and self.previous is not None and self.previous is not self.boot and self.previous.name == name:
+                loaded = self.previous
+            if loaded is None:
+                try:
+                    loaded = self._load(name)
+                except Exception as e:
+                    logger.exception(f"❌ Could not load model version '{name}': {e}. Serving '{self.active.name}'.")
+                    return
+            self._sets = {name: loaded}
+            self._activate(loaded)
+
+    def serving_name(self):
+        active = self.active
+        return None if active is self.boot else active.name
+
+    def _poll_loop(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.sync()
+            except Exception as e:
+                logger.exception(f"❌ Model registry sync failed: {e}")
+
+    def version_path(self, name):
+        path = (self.root / str(name)).resolve()
+        if not name or path.parent != self.root.resolve() or not path.is_dir():
+            raise ValueError(f"Unknown model version '{name}': expected a directory under {self.root}")
+        return path
+
+    def versions(self):
+        if not self.root.is_dir():
+            return []
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def _read_pointer(self, pointer):
+        try:
+            return (self.root / pointer).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_pointer(self, pointer, name):
+        path = self.root / pointer
+        if name is None:
+            path.unlink(missing_ok=True)
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{pointer}.{os.getpid()}.tmp")
+        tmp_path.write_text(f"{name}\n")
+        os.replace(tmp_path, path)
+
+    def _event(self, event, name, **fields):
+        self.history.append(dict(time=time.time(), event=event, name=name, **fields))
+
+    def _load(self, name):
+        started_at = time.perf_counter()
+        model_set = self._prepare(self.version_path(name))
+        seconds = time.perf_counter() - started_at
+        increment("credx_model_loads_total", (("result", "ok"),))
+        logger.info(f"✅ Model version '{name}' ({model_set.version}) loaded, validated and warmed in {seconds:.2f}s")
+        self._event("loaded", name, version=model_set.version, seconds=round(seconds, 3))
+        return model_set
+
+    def _stamp(self, name):
+        try:
+            return artifact_fingerprint(self.version_path(name))
+        except (OSError, ValueError):
+            return None
+
+    def _load_in_background(self, name):
+        # A failed version is retried once its files change
+        if name in self._loading or (name in self._failed and self._failed[name][1] == self._stamp(name)):
+            return
+        self._loading.add(name)
+
+        def load():
+            try:
+                model_set = self._load(name)
+            except Exception as e:
+                increment("credx_model_loads_total", (("result", "failed"),))
+                logger.exception(f"❌ Model version '{name}' failed to load: {e}")
+                with self._lock:
+                    self._loading.discard(name)
+                    self._failed[name] = (str(e), self._stamp(name))
+                    self._event("failed", name, error=str(e))
+                return
+            with self._lock:
+                self._loading.discard(name)
+                self._sets[name] = model_set
+            # The pointers may have moved while it loaded; sync decides where the new set goes
+            self.sync()
+
+        threading.Thread(target=load, name=f"credx-load-{name}", daemon=True).start()
+
+    def _activate(self, model_set):
+        if model_set is self.active:
+            return
+        # One attribute store: requests that already read the old set finish on it, new requests see the new one
+        self.previous, self.active = self.active, model_set
+        if self.candidate is model_set:
+            self._set_candidate(None)
+        increment("credx_model_swaps_total")
+        self._event("activated", model_set.name, version=model_set.version, previous=self.previous.name)
+        logger.info(f"🔁 Serving model version '{model_set.name}' ({model_set.version}), previously '{self.previous.name}'")
+
+    def _set_candidate(self, model_set):
+        self.candidate = model_set
+        with self._stats_lock:
+            self._shadow_stats = _new_shadow_stats(model_set)
+        self._shadow_queue.clear()
+        if model_set is not None:
+            self._event("shadowing", model_set.name, version=model_set.version)
+            logger.info(f"👥 Shadow-scoring model version '{model_set.name}' ({model_set.version}) on {self.shadow_rate:.1%} of traffic")
+
+    def sync(self):
+        active_name = self._read_pointer(ACTIVE_POINTER)
+        shadow_name = self._read_pointer(SHADOW_POINTER)
+        with self._lock:
+            if active_name is None:
+                self._activate(self.boot)
+            elif self.active is self.boot or active_name != self.active.name:
+                loaded = self._sets.get(active_name)
+                if self.candidate is not None and self.candidate.name == active_name:
+                    loaded = self.candidate
+                elif self.previous is not None and self.previous.name == active_name and self.previous is not self.boot:
+                    loaded = self.previous
+                if loaded is not None:
+                    self._activate(loaded)
+                else:
+                    self._load_in_background(active_name)
+
+            if shadow_name is None or shadow_name == active_name:
+                if self.candidate is not None:
+                    self._set_candidate(None)
+            elif self.candidate is None or self.candidate.name != shadow_name:
+                loaded = self._sets.get(shadow_name)
+                if loaded is not None:
+                    self._set_candidate(loaded)
+                else:
+                    self._load_in_background(shadow_name)
+
+            # Keep only the sets that can be served or rolled back to
+            keep = {id(s) for s in (self.active, self.previous, self.candidate)}
+            self._sets = {name: s for name, s in self._sets.items() if id(s) in keep or name in self._loading}
+
+    def request_shadow(self, name):
+        if name is not None:
+            self.version_path(name)
+            self._failed.pop(name, None)
+        self._write_pointer(SHADOW_POINTER, name)
+        self.sync()
+        return self.status()
+
+    def request_promote(self, name=None):
+        if name is None:
+            if self.candidate is None:
+                raise ValueError("No candidate to promote: shadow a version first or name one")
+            name = self.candidate.name
+        self.version_path(name)
+        self._failed.pop(name, None)
+        if self._read_pointer(SHADOW_POINTER) == name:
+            self._write_pointer(SHADOW_POINTER, None)
+        self._write_pointer(ACTIVE_POINTER, name)
+        self.sync()
+        return self.status()
+
+    def request_rollback(self):
+        if self.previous is None:
+            raise ValueError("No previous model version to roll back to")
+        self._write_pointer(ACTIVE_POINTER, None if self.previous is self.boot else self.previous.name)
+        self.sync()
+        return self.status()
+
+    def shadow_sampled(self):
+        return self._started and self.candidate is not None and random.random() < self.shadow_rate
+
+    def shadow_rows(self, n_rows):
+        if not self._started or self.candidate is None or n_rows == 0:
+            return ()
+        return np.flatnonzero(np.random.random(n_rows) < self.shadow_rate)
+
+    def shadow_enqueue(self, items):
+        room = self.shadow_queue_depth - len(self._shadow_queue)
+        if room < len(items):
+            with self._stats_lock:
+                self._shadow_stats["dropped"] += len(items) - max(room, 0)
+            items = items[:max(room, 0)]
+        if items:
+            self._shadow_queue.extend(items)
+            self._shadow_wakeup.set()
+
+    def _shadow_loop(self):
+        while True:
+            self._shadow_wakeup.wait()
+            self._shadow_wakeup.clear()
+            while self._shadow_queue:
+                items = []
+                while self._shadow_queue and len(items) < self.shadow_batch_size:
+                    try:
+                        items.append(self._shadow_queue.popleft())
+                    except IndexError:
+                        break
+                candidate = self.candidate
+                if candidate is None or not items:
+                    continue
+                try:
+                    self._compare(candidate, items)
+                except Exception as e:
+                    logger.exception(f"❌ Shadow scoring of '{candidate.name}' failed: {e}")
+                    with self._stats_lock:
+                        if self._shadow_stats["version"] == candidate.version:
+                            self._shadow_stats["errors"] += len(items)
+
+    def _compare(self, candidate, items):
+        applicants, thresholds, active_risk, active_approved = zip(*items)
+        candidate_risk, candidate_approved = self._shadow_scorer(candidate, list(applicants), np.asarray(thresholds, dtype=float))
+        active_risk = np.asarray(active_risk, dtype=float)
+        active_approved = np.asarray(active_approved, dtype=bool)
+        scored = ~np.isnan(candidate_risk)
+        risk_diff = np.abs(candidate_risk[scored] - active_risk[scored])
+
+        with self._stats_lock:
+            stats = self._shadow_stats
+            if stats["version"] != candidate.version:
+                return
+            stats["compared"] += int(scored.sum())
+            stats["errors"] += int((~scored).sum())
+            stats["agreements"] += int((candidate_approved[scored] == active_approved[scored]).sum())
+            stats["approved_active"] += int(active_approved[scored].sum())
+            stats["approved_candidate"] += int(candidate_approved[scored].sum())
+            stats["abs_risk_diff_sum"] += float(risk_diff.sum())
+            if len(risk_diff):
+                stats["max_abs_risk_diff"] = max(stats["max_abs_risk_diff"], float(risk_diff.max()))
+        increment("credx_shadow_comparisons_total", (), int(scored.sum()))
+
+    def shadow_report(self):
+        with self._stats_lock:
+            stats = dict(self._shadow_stats)
+        compared = stats["compared"]
+        return {
+            "version": stats["version"],
+            "sample_rate": self.shadow_rate,
+            "compared": compared,
+            "errors": stats["errors"],
+            "dropped": stats["dropped"],
+            "queued": len(self._shadow_queue),
+            "decision_agreement": stats["agreements"] / compared if compared else None,
+            "approval_rate_active": stats["approved_active"] / compared if compared else None,
+            "approval_rate_candidate": stats["approved_candidate"] / compared if compared else None,
+            "mean_abs_default_risk_diff": stats["abs_risk_diff_sum"] / compared if compared else None,
+            "max_abs_default_risk_diff": stats["max_abs_risk_diff"] if compared else None,
+        }
+
+    def status(self):
+        return {
+            "active": self.active.describe(),
+            "previous": self.previous.describe() if self.previous is not None else None,
+            "candidate": self.candidate.describe() if self.candidate is not None else None,
+            "boot": self.boot.describe(),
+            "pointers": {"active": self._read_pointer(ACTIVE_POINTER), "shadow": self._read_pointer(SHADOW_POINTER)},
+            "versions": self.versions(),
+            "loading": sorted(self._loading),
+            "failed": {name: error for name, (error, _) in self._failed.items()},
+            "shadow": self.shadow_report(),
+            "history": list(self.history),
+        }
@@ -0,0 +1,164 @@
+import json
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+
+from FairModel import NumpyJSONEncoder
+from metrics import observe
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ApplicantProfile(BaseModel):
+    age: int
+    gender: str
+    region: str
+    employment: str
+    monthly_income: int
+
+
+class FinalDecision(BaseModel):
+    approved: bool
+    credit_score: int
+    risk_category: str
+    default_risk: float
+    approval_probability: float
+    threshold: float
+
+
+class ModelPrediction(BaseModel):
+    model: str
+    score: Optional[int] = None
+    approved: Optional[bool] = None
+    default_risk: Optional[float] = None
+    approval_probability: Optional[float] = None
+    risk_category: Optional[str] = None
+    risk_color: Optional[str] = None
+    feature_shape: Optional[List[int]] = None
+    error: Optional[str] = None
+
+
+class Consensus(BaseModel):
+    approved_count: int
+    total_count: int
+    unanimous: bool
+
+
+class ScoreFactor(BaseModel):
+    text: str
+    type: str
+
+
+class ModelExplanation(BaseModel):
+    base_value: Optional[float] = None
+    contributions: Optional[Dict[str, float]] = None
+    error: Optional[str] = None
+
+
+class ScoringResult(BaseModel):
+    success: bool
+    applicant_profile: ApplicantProfile
+    final_decision: FinalDecision
+    model_predictions: List[ModelPrediction]
+    consensus: Consensus
+    positive_factors: List[ScoreFactor]
+    negative_factors: List[ScoreFactor]
+    recommendations: List[str]
+    all_predictions: Optional[Dict[str, ModelPrediction]] = None
+    colour: Optional[str] = None
+    name: Optional[str] = None
+    model_version: Optional[str] = None
+    explanation: Optional[Dict[str, ModelExplanation]] = None
+
+
+class ScoringError(BaseModel):
+    success: bool
+    error: str
+    traceback: Optional[str] = None
+    applicant_profile: Dict[str, Any]
+
+
+class BatchScoringResult(BaseModel):
+    success: bool
+    count: int
+    results: List[Union[ScoringResult, ScoringError]]
+
+
+class WhatIfModelScore(BaseModel):
+    score: int
+    default_risk: float
+    approved: bool
+
+
+class WhatIfScenario(BaseModel):
+    changes: Dict[str, float]
+    approved: Optional[bool] = None
+    credit_score: Optional[int] = None
+    risk_category: Optional[str] = None
+    default_risk: Optional[float] = None
+    approval_probability: Optional[float] = None
+    models: Optional[Dict[str, WhatIfModelScore]] = None
+    score_delta: Optional[int] = None
+    default_risk_delta: Optional[float] = None
+    flips_decision: Optional[bool] = None
+    error: Optional[str] = None
+
+
+class WhatIfFlip(WhatIfScenario):
+    scenario: int
+    distance: float
+
+
+class WhatIfResult(BaseModel):
+    success: bool
+    applicant_id: Optional[str] = None
+    threshold: float
+    model_version: str
+    varied: List[str]
+    count: int
+    base: WhatIfScenario
+    scenarios: List[WhatIfScenario]
+    smallest_flip: Optional[WhatIfFlip] = None
+
+
+def compact_result(result):
+    if not result.get("success"):
+        return result
+    compact = {key: value for key, value in result.items() if key != "all_predictions"}
+    compact["model_predictions"] = [
+        {key: value for key, value in prediction.items() if key != "feature_shape"}
+        for prediction in result["model_predictions"]
+    ]
+    return compact
+
+
+def dumps(content):
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content, cls=NumpyJSONEncoder, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def encode_result(result, compact=False):
+    started_at = time.perf_counter()
+    encoded = dumps(compact_result(result) if compact else result)
+    observe("encode", time.perf_counter() - started_at)
+    return encoded
+
+
+def encode_batch(encoded_results):
+    return b'{"success":true,"count":%d,"results":[%b]}' % (len(encoded_results), b",".join(encoded_results))
+
+
+class CredXJSONResponse(JSONResponse):
+
+    def render(self, content):
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from metrics import increment
+
+SCORE_CACHE_SIZE = int(os.environ.get("CREDX_SCORE_CACHE_SIZE", "10000"))
+SCORE_CACHE_TTL = float(os.environ.get("CREDX_SCORE_CACHE_TTL", "300"))
+SCORE_CACHE_CHECK_INTERVAL = float(os.environ.get("CREDX_SCORE_CACHE_CHECK_INTERVAL", "5"))
+
+
+def artifact_fingerprint(model_dir):
+    entries = []
+    for path in sorted(Path(model_dir).iterdir()):
+        if path.is_file():
+            stat = path.stat()
+            entries.append(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256("\n".join(entries).encode()).hexdigest()
+
+
+def feature_key(raw_inputs, codes, model_version, threshold, variant=""):
+    digest = hashlib.blake2b(digest_size=16)
+    # Adding 0.0 folds -0.0 into 0.0 so equivalent payloads share a key
+    digest.update((raw_inputs + 0.0).tobytes())
+    digest.update(repr((tuple(codes), model_version, float(threshold), variant)).encode())
+    return digest.digest()
+
+
+class ScoringCache:
+
+    def __init__(self, model_dir, max_size=SCORE_CACHE_SIZE, ttl=SCORE_CACHE_TTL, check_interval=SCORE_CACHE_CHECK_INTERVAL):
+        self.model_dir = Path(model_dir)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.enabled = max_size > 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = artifact_fingerprint(self.model_dir) if self.enabled else None
+        self._next_check = time.monotonic() + check_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_artifacts(self, now):
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        fingerprint = artifact_fingerprint(self.model_dir)
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self.invalidations += 1
+            self._entries.clear()
+            increment("credx_score_cache_invalidations_total")
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._check_artifacts(now)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                payload = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                payload = None
+        increment("credx_score_cache_requests_total", (("result", "hit" if payload is not None else "miss"),))
+        return pickle.loads(payload) if payload is not None else None
+
+    def put(self, key, result):
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,123 @@
+import operator
+from itertools import compress
+
+import numpy as np
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+DERIVED_FEATURES = {
+    'repayment_history_score': lambda f: np.maximum(0, 100 - (f['missed_payments'] * 5 + f['avg_days_past_due'] * 0.5)) / 100,
+    'digital_payment_score': lambda f: (
+        f['upi_txn_count'] / 100 * 0.4 +
+        (f['upi_avg_txn_size'] / 10000) * 0.3 +
+        f['digital_wallet_usage'] * 0.3
+    ),
+}
+
+# (feature, operator, threshold, text); "{value}" is replaced by int(feature value)
+POSITIVE_FACTOR_RULES = [
+    ('repayment_history_score', '>', 0.8, "Excellent payment history (few to no missed payments)"),
+    ('credit_utilization_ratio', '<', 0.3, "Low credit utilization (using < 30% of available credit)"),
+    ('savings_ratio', '>', 0.2, "Good savings ratio (saving > 20% of income)"),
+    ('digital_payment_score', '>', 0.5, "Strong digital payment activity"),
+    ('income_stability', '>', 0.5, "Stable income source"),
+    ('credit_tenure_months', '>', 36, "Established credit history ( > 3 years)"),
+]
+
+NEGATIVE_FACTOR_RULES = [
+    ('missed_payments', '>', 0, "{value} missed payments recorded"),
+    ('credit_utilization_ratio', '>', 0.7, "High credit utilization (using > 70% of available credit)"),
+    ('avg_days_past_due', '>', 0, "Accounts previously {value} days past due"),
+    ('savings_ratio', '<', 0.1, "Low savings ratio (saving < 10% of income)"),
+    ('credit_tenure_months', '<', 12, "Limited credit history ( < 1 year)"),
+]
+
+# (applies when approved, condition or None, text)
+RECOMMENDATION_RULES = [
+    (False, None, "• Focus on improving payment history (make all payments on time)"),
+    (False, None, "• Reduce credit utilization ratio (ideally below 30%)"),
+    (False, ('savings_ratio', '<', 0.15), "• Increase savings ratio and build an emergency fund"),
+    (False, ('credit_tenure_months', '<', 24), "• Continue building a positive credit history over time"),
+    (True, None, "• Maintain your excellent payment discipline"),
+    (True, None, "• Continue responsible credit usage"),
+    (True, ('credit_utilization_ratio', '>', 0.3), "• Consider keeping credit utilization low (below 30%) for optimal score"),
+    (True, None, "• Monitor your credit report regularly for any inaccuracies"),
+]
+
+
+class FactorRuleEngine:
+
+    def __init__(self, feature_index, positive_rules=POSITIVE_FACTOR_RULES, negative_rules=NEGATIVE_FACTOR_RULES,
+                 recommendation_rules=RECOMMENDATION_RULES, derived_features=DERIVED_FEATURES):
+        self.derived_features = derived_features
+        self.factor_rules = [(rule, "positive") for rule in positive_rules] + [(rule, "negative") for rule in negative_rules]
+        self.recommendation_rules = list(recommendation_rules)
+
+        conditions = [(feature, op, threshold) for (feature, op, threshold, _), _ in self.factor_rules]
+        conditions += [condition for _, condition, _ in self.recommendation_rules]
+
+        # Derived features are computed from the base columns, so every input they read is a base column too
+        referenced = {condition[0] for condition in conditions if condition is not None}
+        base_features = sorted((referenced - set(derived_features)) | {
+            'missed_payments', 'avg_days_past_due', 'upi_txn_count', 'upi_avg_txn_size', 'digital_wallet_usage'
+        })
+        self.base_columns = np.array([feature_index[name] for name in base_features])
+        self.value_index = {name: i for i, name in enumerate(base_features + list(derived_features))}
+
+        # One comparison per operator over all rules that use it; unconditional rules stay True
+        self.compiled = []
+        for op_name, op in OPERATORS.items():
+            positions = [i for i, condition in enumerate(conditions) if condition is not None and condition[1] == op_name]
+            if positions:
+                self.compiled.append((
+                    op,
+                    np.array(positions),
+                    np.array([self.value_index[conditions[i][0]] for i in positions]),
+                    np.array([conditions[i][2] for i in positions], dtype=float),
+                ))
+        self.n_factor_rules = len(self.factor_rules)
+        self.recommendation_approved = np.array([applies for applies, _, _ in self.recommendation_rules], dtype=bool)
+
+    def evaluate(self, feature_matrix, approved):
+        feature_matrix = np.asarray(feature_matrix)
+        n_rows = feature_matrix.shape[0]
+        n_base = len(self.base_columns)
+
+        values = np.empty((n_rows, len(self.value_index)))
+        values[:, :n_base] = feature_matrix[:, self.base_columns]
+        named = {name: values[:, i] for name, i in self.value_index.items()}
+        for offset, derive in enumerate(self.derived_features.values()):
+            values[:, n_base + offset] = derive(named)
+
+        mask = np.ones((n_rows, self.n_factor_rules + len(self.recommendation_rules)), dtype=bool)
+        for op, positions, value_columns, thresholds in self.compiled:
+            mask[:, positions] = op(values[:, value_columns], thresholds)
+        approved = np.asarray(approved, dtype=bool).reshape(-1, 1)
+        mask[:, self.n_factor_rules:] &= approved == self.recommendation_approved
+        return FactorTable(self, values, mask)
+
+
+class FactorTable:
+
+    def __init__(self, engine, values, mask):
+        self.engine = engine
+        self.values = values
+        self.mask = mask
+        self._rows = None
+
+    def row(self, i):
+        if self._rows is None:
+            self._rows = self.mask.tolist()
+        fired = self._rows[i]
+        n_factor_rules = self.engine.n_factor_rules
+
+        positive_factors_list = []
+        negative_factors_list = []
+        for (feature, _, _, text), factor_type in compress(self.engine.factor_rules, fired[:n_factor_rules]):
+            if "{value}" in text:
+                text = text.format(value=int(self.values[i, self.engine.value_index[feature]]))
+            factor = {"text": text, "type": factor_type}
+            (positive_factors_list if factor_type == "positive" else negative_factors_list).append(factor)
+
+        recommendations = [text for _, _, text in compress(self.engine.recommendation_rules, fired[n_factor_rules:])]
+        return positive_factors_list, negative_factors_list, recommendations
@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+import FairModel
+import inference_pool
+import metrics
+from log_config import get_logger
+from response_schema import encode_result
+
+SCORING_POOL_PROCESSES = int(os.environ.get("CREDX_SCORING_POOL", "0"))
+SCORING_POOL_PIN = os.environ.get("CREDX_SCORING_POOL_PIN", "0") != "0"
+SCORING_POOL_CHUNK_SIZE = int(os.environ.get("CREDX_SCORING_POOL_CHUNK_SIZE", "256"))
+
+logger = get_logger("pool")
+
+FIELD_DTYPES = {int: "i8", float: "f8", bool: "?"}
+
+
+def applicants_to_records(applicants, fields):
+    dtype = []
+    for name, field_type in fields:
+        if field_type is str:
+            width = max((len(str(a[name])) for a in applicants), default=1)
+            dtype.append((name, f"U{max(width, 1)}"))
+        else:
+            dtype.append((name, FIELD_DTYPES[field_type]))
+    return np.array([tuple(a[name] for name, _ in fields) for a in applicants], dtype=dtype)
+
+
+def records_to_applicants(records):
+    names = records.dtype.names
+    return [dict(zip(names, row)) for row in records.tolist()]
+
+
+def init_scoring_worker(next_index, pin_cpus):
+    with next_index.get_lock():
+        index = next_index.value
+        next_index.value += 1
+
+    if pin_cpus and hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+
+    # Model versions loaded later in this worker get single-threaded boosters too
+    FairModel.XGB_NTHREAD = 1
+    inference_pool.INFERENCE_THREADS = 1
+    for engine in (FairModel.MODEL_REGISTRY.active.engine_region_aware, FairModel.MODEL_REGISTRY.active.engine_fair_xgb):
+        if isinstance(engine, FairModel.BoosterInferenceEngine):
+            engine.booster.set_param({"nthread": 1})
+    if FairModel.MODEL_REGISTRY.active.engine_delphi is not None:
+        FairModel.MODEL_REGISTRY.active.engine_delphi.set_nthread(1)
+    FairModel.get_income_engine()
+    # Drop the copy of the parent's metrics inherited at fork; workers only report what they record themselves
+    metrics.take_delta()
+
+
+def _score_records(records, threshold, compact, explain, model_version):
+    FairModel.MODEL_REGISTRY.follow(model_version)
+    applicants = records_to_applicants(records)
+    if len(applicants) == 1:
+        results = [FairModel.run_multi_model_prediction(applicants[0], threshold, explain=bool(explain[0]))]
+    else:
+        results = FairModel.run_multi_model_prediction_batch(applicants, threshold, explain=explain.tolist())
+    encoded = [encode_result(result, row_compact) for result, row_compact in zip(results, compact.tolist())]
+    # The parent samples shadow comparisons, since only the API process runs the shadow thread
+    primaries = []
+    for result in results:
+        primary = result.get("all_predictions", {}).get("Region-Aware XGBoost")
+        ok = primary is not None and primary.get("error") is None
+        primaries.append((primary["default_risk"], primary["approved"]) if ok else None)
+    return encoded, primaries, metrics.take_delta()
+
+
+class ScoringPool:
+
+    def __init__(self, fields, processes=SCORING_POOL_PROCESSES, pin_cpus=SCORING_POOL_PIN,
+                 chunk_size=SCORING_POOL_CHUNK_SIZE, threshold=FairModel.OPTIMAL_THRESHOLD):
+        self.fields = list(fields)
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.threshold = threshold
+        context = multiprocessing.get_context("fork")
+        # Workers fork from the loaded parent, so they start with every model warm
+        self._pool = context.Pool(processes, initializer=init_scoring_worker, initargs=(context.Value("i", 0), pin_cpus))
+        logger.info(f"✅ Scoring pool started ({processes} processes{', pinned' if pin_cpus else ''}, chunk size {chunk_size})")
+
+    def score_one(self, applicant, compact=False, explain=False):
+        return self.score_batch([applicant], compact, explain)[0]
+
+    def score_batch(self, applicants, compact=False, explain=False):
+        records = applicants_to_records(applicants, self.fields)
+        compact = np.broadcast_to(np.asarray(compact, dtype=bool), len(records))
+        explain = np.broadcast_to(np.asarray(explain, dtype=bool), len(records))
+        model_version = FairModel.MODEL_REGISTRY.serving_name()
+        chunks = [
+            (records[start:start + self.chunk_size], self.threshold,
+             compact[start:start + self.chunk_size], explain[start:start + self.chunk_size], model_version)
+            for start in range(0, len(records), self.chunk_size)
+        ]
+        encoded = []
+        primaries = []
+        for chunk_results, chunk_primaries, metrics_delta in self._pool.starmap(_score_records, chunks, chunksize=1):
+            encoded.extend(chunk_results)
+            primaries.extend(chunk_primaries)
+            metrics.merge_delta(metrics_delta)
+
+        shadow_items = [
+            (applicants[row], self.threshold, *primaries[row])
+            for row in FairModel.MODEL_REGISTRY.shadow_rows(len(applicants)) if primaries[row] is not None
+        ]
+        if shadow_items:
+            FairModel.MODEL_REGISTRY.shadow_enqueue(shadow_items)
+        return encoded
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
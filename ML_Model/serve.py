@@ -0,0 +1,113 @@
+import argparse
+import os
+import signal
+import socket
+import sys
+
+import uvicorn
+
+from log_config import get_logger, shutdown_logging
+
+logger = get_logger("serve")
+
+
+def _bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _load_app():
+    import main
+    return main.app
+
+
+def _preload_model_store():
+    app = _load_app()
+    import FairModel
+    FairModel.get_income_engine()
+    return app
+
+
+def _run_worker(sock, app, log_level):
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if app is None:
+        app = _load_app()
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host, port, workers, preload=True, log_level="warning"):
+    for variable in ("CREDX_XGB_NTHREAD", "CREDX_INFERENCE_THREADS"):
+        if variable not in os.environ:
+            os.environ[variable] = str(max(1, (os.cpu_count() or 1) // workers))
+
+    sock = _bind_socket(host, port)
+    app = _preload_model_store() if preload else None
+    logger.info(f"🚀 Serving on http://{host}:{port} with {workers} workers "
+                f"({'models preloaded in parent, shared copy-on-write' if preload else 'models loaded per worker'})")
+    sys.stdout.flush()
+
+    children = set()
+    shutting_down = False
+
+    def spawn_worker():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(sock, app, log_level)
+            finally:
+                shutdown_logging()
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(workers):
+        spawn_worker()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not shutting_down:
+            logger.warning(f"⚠️ Worker {pid} exited with status {status}. Restarting.")
+            spawn_worker()
+
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork server for the CredX scoring API.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("CREDX_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--no-preload", action="store_true", help="Load the models in every worker instead of once in the parent")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py needs os.fork; use `python main.py` on this platform.")
+    serve(args.host, args.port, args.workers, preload=not args.no_preload, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
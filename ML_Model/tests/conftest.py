@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# The service modules are flat files that load ./models relative to ML_Model
+ML_MODEL_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ML_MODEL_DIR))
+os.chdir(ML_MODEL_DIR)
+os.environ.setdefault("CREDX_LOG_LEVEL", "WARNING")
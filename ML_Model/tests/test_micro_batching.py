@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+import pytest
+
+import FairModel
+import main
+import metrics
+from bench_pipeline import synthetic_population
+
+
+async def _submit_all(payloads):
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://credx") as client:
+            return await asyncio.gather(*[client.post("/submit", json=payload) for payload in payloads])
+
+
+def test_concurrent_duplicate_submits_hit_the_cache():
+    if not main.ASYNC_SUBMIT or not FairModel.SCORE_CACHE.enabled:
+        pytest.skip("needs the micro-batched /submit and the score cache")
+    FairModel.SCORE_CACHE.clear()
+    applicants = synthetic_population(150, seed=23)
+    batches = metrics.REGISTRY.counters.get(("credx_micro_batches_total", ()), 0)
+    hits = FairModel.SCORE_CACHE.hits
+
+    responses = asyncio.run(_submit_all(applicants + applicants))
+
+    assert all(response.status_code == 200 for response in responses)
+    assert metrics.REGISTRY.counters.get(("credx_micro_batches_total", ()), 0) > batches
+    assert FairModel.SCORE_CACHE.hits - hits >= len(applicants)
+    first, second = responses[:len(applicants)], responses[len(applicants):]
+    assert [r.content for r in first] == [r.content for r in second]
@@ -0,0 +1,133 @@
+import json
+
+import numpy as np
+import pytest
+
+import FairModel
+from bench_compiled_forest import PARITY_TOLERANCE, synthetic_feature_block
+from bench_pipeline import synthetic_population
+from tree_ensemble import CompiledTreeEnsemble
+
+XGB_MODELS = [("Region-Aware XGBoost", "model_region_aware", 35), ("Fair XGBoost", "model_fair_xgb", 30)]
+
+
+def _decisions(default_risk):
+    return np.asarray(default_risk) < FairModel.OPTIMAL_THRESHOLD
+
+
+def _comparable(result):
+    result = dict(result)
+    result.pop("model_version", None)
+    return json.dumps(result, sort_keys=True, default=float)
+
+
+@pytest.fixture(scope="module")
+def population():
+    return synthetic_population(300, seed=11)
+
+
+@pytest.mark.parametrize("model_name, attribute, width", XGB_MODELS)
+def test_compiled_forest_matches_booster(model_name, attribute, width):
+    model = getattr(FairModel.MODEL_REGISTRY.active, attribute)
+    if model is None:
+        pytest.skip(f"{model_name} is not loaded")
+    X = synthetic_feature_block(5000, seed=3)[:, :width]
+    compiled = FairModel.CompiledForestEngine(model)
+    compiled.max_compiled_rows = len(X)
+
+    reference = FairModel.BoosterInferenceEngine(model).predict_proba(X)[:, 1]
+    compiled_risk = compiled.predict_proba(X)[:, 1]
+    assert np.array_equal(_decisions(compiled_risk), _decisions(reference))
+    assert np.abs(compiled_risk - reference).max() <= PARITY_TOLERANCE
+    assert np.abs(reference - model.predict_proba(X)[:, 1]).max() <= PARITY_TOLERANCE
+
+
+def test_compiled_sklearn_forests_match_predict():
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+    rng = np.random.default_rng(5)
+    X = rng.normal(size=(2000, 8))
+    y = X[:, 0] - 0.5 * X[:, 1] ** 2 + rng.normal(scale=0.3, size=2000)
+
+    regressor = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(X, y)
+    forest = CompiledTreeEnsemble.from_sklearn(regressor.estimators_)
+    np.testing.assert_allclose(forest.leaf_values(X).mean(axis=1), regressor.predict(X), rtol=0, atol=1e-9)
+
+    classifier = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0).fit(X, y > 0)
+    forest = CompiledTreeEnsemble.from_sklearn(classifier.estimators_, class_index=1)
+    np.testing.assert_allclose(forest.leaf_values(X).mean(axis=1), classifier.predict_proba(X)[:, 1], rtol=0, atol=1e-9)
+
+
+def test_batch_matches_single(population):
+    single = [FairModel.run_multi_model_prediction(dict(applicant)) for applicant in population]
+    batch = FairModel.run_multi_model_prediction_batch([dict(applicant) for applicant in population], chunk_size=64)
+    assert all(result["success"] for result in single)
+    assert [_comparable(result) for result in batch] == [_comparable(result) for result in single]
+
+
+def test_cache_hit_matches_fresh_result(population, monkeypatch):
+    if not FairModel.SCORE_CACHE.enabled:
+        pytest.skip("score cache disabled")
+    applicant = dict(population[0], applicant_id="CACHE-FIRST")
+    FairModel.run_multi_model_prediction(applicant)
+
+    # Same model inputs under another id: answered from the cache, but echoing this request
+    repeat = dict(applicant, applicant_id="CACHE-REPEAT")
+    hits = FairModel.SCORE_CACHE.hits
+    cached = FairModel.run_multi_model_prediction(dict(repeat))
+    assert FairModel.SCORE_CACHE.hits == hits + 1
+
+    monkeypatch.setattr(FairModel.SCORE_CACHE, "enabled", False)
+    fresh = FairModel.run_multi_model_prediction(dict(repeat))
+    assert cached["name"] == "CACHE-REPEAT"
+    assert _comparable(cached) == _comparable(fresh)
+
+
+@pytest.fixture(scope="module")
+def delphi_ensemble(tmp_path_factory):
+    from bench_delphi_ensemble import train_synthetic_ensemble
+
+    return train_synthetic_ensemble(tmp_path_factory.mktemp("delphi") / "delphi_ensemble.pkl", 3000)
+
+
+@pytest.mark.parametrize("max_compiled_rows", [0, 1 << 20])
+def test_delphi_ensemble_matches_notebook_reference(delphi_ensemble, max_compiled_rows):
+    from bench_delphi_ensemble import PARITY_TOLERANCE as ENSEMBLE_TOLERANCE, notebook_predict_proba
+    from delphi_ensemble import VIEW_DEBIASED, DelphiEnsembleEngine
+
+    artifact, pca = delphi_ensemble
+    X = synthetic_feature_block(2000, seed=9)[:, :30]
+    X[:, 27] = np.log(X[:, 27])
+    X_reference = X.astype(np.float64)
+    views = {
+        name: pca.transform(X_reference) if view == VIEW_DEBIASED else X_reference
+        for name, view in artifact["views"].items()
+    }
+    reference = notebook_predict_proba(artifact["members"], artifact["weights"], views)
+
+    engine = DelphiEnsembleEngine(artifact)
+    engine.max_compiled_rows = max_compiled_rows
+    fused = engine.predict_default_proba(X)
+    assert np.array_equal(_decisions(fused), _decisions(reference))
+    assert np.abs(fused - reference).max() <= ENSEMBLE_TOLERANCE
+
+
+def test_batch_cache_hits_match_fresh_results(monkeypatch):
+    if not FairModel.SCORE_CACHE.enabled:
+        pytest.skip("score cache disabled")
+    FairModel.SCORE_CACHE.clear()
+    applicants = synthetic_population(40, seed=17)
+    # Every applicant twice in one batch, the second time under another id
+    batch = applicants + [dict(applicant, applicant_id=f"{applicant['applicant_id']}-AGAIN") for applicant in applicants]
+
+    hits = FairModel.SCORE_CACHE.hits
+    first = FairModel.run_multi_model_prediction_batch([dict(a) for a in batch])
+    assert FairModel.SCORE_CACHE.hits - hits == len(applicants)
+    second = FairModel.run_multi_model_prediction_batch([dict(a) for a in batch])
+    assert FairModel.SCORE_CACHE.hits - hits == 3 * len(applicants)
+
+    monkeypatch.setattr(FairModel.SCORE_CACHE, "enabled", False)
+    fresh = FairModel.run_multi_model_prediction_batch([dict(a) for a in batch])
+    assert [result["name"] for result in first] == [a["applicant_id"] for a in batch]
+    assert [_comparable(r) for r in first] == [_comparable(r) for r in fresh]
+    assert [_comparable(r) for r in second] == [_comparable(r) for r in fresh]
@@ -0,0 +1,149 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+ARRAY_NAMES = ("roots", "left", "right", "default_child", "feature", "threshold", "value")
+
+
+class CompiledTreeEnsemble:
+
+    def __init__(self, trees, split_rule="<"):
+        if split_rule not in ("<", "<="):
+            raise ValueError(f"Unsupported split rule: {split_rule}")
+
+        node_counts = [len(tree["left"]) for tree in trees]
+        offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.int64)
+
+        left, right, default_child, feature, threshold, value = [], [], [], [], [], []
+        max_depth = 0
+        for offset, tree in zip(offsets, trees):
+            node_ids = np.arange(len(tree["left"]), dtype=np.int64) + offset
+            tree_left = np.asarray(tree["left"], dtype=np.int64)
+            tree_right = np.asarray(tree["right"], dtype=np.int64)
+            is_leaf = tree_left < 0
+
+            left.append(np.where(is_leaf, node_ids, tree_left + offset))
+            right.append(np.where(is_leaf, node_ids, tree_right + offset))
+            default_child.append(np.where(np.asarray(tree["default_left"], dtype=bool), left[-1], right[-1]))
+            feature.append(np.where(is_leaf, 0, tree["feature"]).astype(np.int64))
+            threshold.append(np.asarray(tree["threshold"]))
+            value.append(np.asarray(tree["value"]))
+            max_depth = max(max_depth, _tree_depth(tree_left, tree_right))
+
+        self._set_arrays({
+            "roots": offsets,
+            "left": np.concatenate(left),
+            "right": np.concatenate(right),
+            "default_child": np.concatenate(default_child),
+            "feature": np.concatenate(feature),
+            "threshold": np.concatenate(threshold),
+            "value": np.concatenate(value),
+        }, max_depth, split_rule)
+
+    def _set_arrays(self, arrays, max_depth, split_rule):
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.n_trees = len(self.roots)
+        self.max_depth = max_depth
+        self.split_rule = split_rule
+
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        with open(directory / "meta.json", "w") as f:
+            json.dump({"max_depth": self.max_depth, "split_rule": self.split_rule}, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        directory = Path(directory)
+        with open(directory / "meta.json") as f:
+            meta = json.load(f)
+        ensemble = cls.__new__(cls)
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        ensemble._set_arrays(arrays, meta["max_depth"], meta["split_rule"])
+        return ensemble
+
+    @classmethod
+    def from_xgboost(cls, booster, iteration_range=(0, 0)):
+        model = json.loads(booster.save_raw(raw_format="json"))
+        gradient_booster = model["learner"]["gradient_booster"]
+        if gradient_booster["name"] != "gbtree":
+            raise ValueError(f"Only gbtree boosters can be compiled, got '{gradient_booster['name']}'")
+
+        tree_param = gradient_booster["model"]["gbtree_model_param"]
+        if int(tree_param.get("num_parallel_tree", 1)) != 1 or any(gradient_booster["model"]["tree_info"]):
+            raise ValueError("Only single-output boosters with one tree per round can be compiled")
+
+        start, end = iteration_range
+        raw_trees = gradient_booster["model"]["trees"]
+        raw_trees = raw_trees[start:end if end > 0 else len(raw_trees)]
+
+        trees = []
+        for raw_tree in raw_trees:
+            if any(raw_tree.get("split_type", [])):
+                raise ValueError("Categorical splits are not supported by the compiled backend")
+            trees.append({
+                "left": raw_tree["left_children"],
+                "right": raw_tree["right_children"],
+                "default_left": raw_tree["default_left"],
+                "feature": raw_tree["split_indices"],
+                "threshold": np.asarray(raw_tree["split_conditions"], dtype=np.float32),
+                "value": np.asarray(raw_tree["split_conditions"], dtype=np.float32),
+            })
+        return cls(trees, split_rule="<")
+
+    @classmethod
+    def from_sklearn(cls, estimators, class_index=None):
+        trees = []
+        for estimator in estimators:
+            tree = estimator.tree_
+            if tree.value.shape[1] != 1 or (class_index is None and tree.value.shape[2] != 1):
+                raise ValueError("Only single-output regression trees can be compiled")
+            if class_index is None:
+                value = tree.value[:, 0, 0]
+            else:
+                # Leaf probability of one class, normalized the way DecisionTreeClassifier.predict_proba does
+                totals = tree.value[:, 0, :].sum(axis=1)
+                value = tree.value[:, 0, class_index] / np.where(totals == 0, 1, totals)
+            trees.append({
+                "left": tree.children_left,
+                "right": tree.children_right,
+                "default_left": getattr(tree, "missing_go_to_left", np.ones(tree.node_count, dtype=bool)),
+                "feature": tree.feature,
+                "threshold": np.asarray(tree.threshold, dtype=np.float64),
+                "value": np.asarray(value, dtype=np.float64),
+            })
+        return cls(trees, split_rule="<=")
+
+    def apply(self, X):
+        n_rows = X.shape[0]
+        rows = np.arange(n_rows)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees))
+        has_missing = np.isnan(X).any()
+
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            if self.split_rule == "<":
+                go_left = x < self.threshold[nodes]
+            else:
+                go_left = x <= self.threshold[nodes]
+            next_nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            if has_missing:
+                next_nodes = np.where(np.isnan(x), self.default_child[nodes], next_nodes)
+            nodes = next_nodes
+        return nodes
+
+    def leaf_values(self, X):
+        return self.value[self.apply(X)]
+
+
+def _tree_depth(left, right):
+    depth = np.zeros(len(left), dtype=np.int64)
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+    return int(depth.max()) if len(depth) else 0